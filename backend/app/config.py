@@ -7,18 +7,70 @@ from typing import Optional
 # Google Maps API Anahtarı
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY', '')
 
+# Google Maps istek bütçesi
+GOOGLE_MAPS_QPS = float(os.getenv('GOOGLE_MAPS_QPS', '10'))  # Saniyedeki maksimum API çağrısı (0: sınırsız)
+PLACE_DETAILS_CONCURRENCY = int(os.getenv('PLACE_DETAILS_CONCURRENCY', '8'))  # Eşzamanlı Place Details çağrısı
+SWEEP_CONCURRENCY = int(os.getenv('SWEEP_CONCURRENCY', '16'))  # Tüm şehir taramasında eşzamanlı API çağrısı
+GRID_SEARCH_CONCURRENCY = int(os.getenv('GRID_SEARCH_CONCURRENCY', '8'))  # Izgara aramasında eşzamanlı Text Search çağrısı
+GRID_SEARCH_MAX_DEPTH = int(os.getenv('GRID_SEARCH_MAX_DEPTH', '4'))  # Dolan bir hücrenin en fazla kaç kez bölüneceği
+
+# Place Details önbelleği
+PLACE_DETAILS_CACHE_TTL = int(os.getenv('PLACE_DETAILS_CACHE_TTL', str(60 * 60 * 24 * 7)))  # Saniye (0: kapalı)
+PLACE_DETAILS_CACHE_SIZE = int(os.getenv('PLACE_DETAILS_CACHE_SIZE', '10000'))  # Bellekteki LRU kayıt sayısı
+
+# Text Search önbelleği
+TEXT_SEARCH_CACHE_TTL = int(os.getenv('TEXT_SEARCH_CACHE_TTL', str(60 * 60 * 24)))  # Saniye (0: kapalı)
+TEXT_SEARCH_CACHE_SIZE = int(os.getenv('TEXT_SEARCH_CACHE_SIZE', '1000'))
+
 # Veritabanı
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./crm_data.db')
 
+# Bağlantı havuzu (senkron ve async engine'in her biri için ayrı)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))  # Havuzda açık tutulan bağlantı
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))  # Yoğunlukta açılabilecek ek bağlantı
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))  # Boş bağlantı bekleme süresi (saniye)
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')  # Kopmuş bağlantıları kullanmadan önce yakala
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))  # Bu süreden eski bağlantılar yenilenir (saniye, -1: kapalı)
+
+# SQLite bağlantı ayarları (her bağlantı açılışında PRAGMA olarak uygulanır)
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')  # WAL: okuyucular yazanları bloklamaz
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # WAL ile NORMAL: commit başına fsync yok
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))  # Kilit için bekleme süresi
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', str(64 * 1024)))  # Bağlantı başına sayfa önbelleği
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # Bellek eşlemeli okuma (bayt, 0: kapalı)
+
+# Arka plan arama işleri
+SEARCH_JOB_WORKERS = int(os.getenv('SEARCH_JOB_WORKERS', '2'))  # Aynı anda çalışan arama işi
+SEARCH_JOB_LEASE_SECONDS = int(os.getenv('SEARCH_JOB_LEASE_SECONDS', '300'))  # Bu süre sinyal vermeyen iş yeniden kuyruğa alınır
+SEARCH_JOB_HEARTBEAT_INTERVAL = int(os.getenv('SEARCH_JOB_HEARTBEAT_INTERVAL', '30'))  # Çalışan işin sinyal (heartbeat_at) yazma aralığı (saniye)
+
+# Dışa aktarma
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))  # Veritabanından parça parça okunan satır
+EXPORT_SPOOL_MAX_SIZE = int(os.getenv('EXPORT_SPOOL_MAX_SIZE', str(8 * 1024 * 1024)))  # Bu boyutu aşan dosya diske taşınır (bayt)
+EXPORT_CHUNK_SIZE = 64 * 1024  # Yanıtta gönderilen parça boyutu (bayt)
+ILETISIM_TAMAMLAMA_MAX = int(os.getenv('ILETISIM_TAMAMLAMA_MAX', '500'))  # Export'ta telefon/web'i tamamlanacak en fazla firma
+
+# /api/config yanıtının tarayıcıda tekrar sorulmadan kullanılacağı süre (saniye)
+CONFIG_CACHE_MAX_AGE = int(os.getenv('CONFIG_CACHE_MAX_AGE', '3600'))
+
+# Bu süreyi aşan firma listesi/export sorguları uyarı olarak loglanır (ms)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '500'))
+
 # JWT Secret Key
 SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 gün
 
+# Doğrulanmış kullanıcı önbelleği (her istekteki users sorgusunu atlar)
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '30'))  # Saniye (0: kapalı)
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', '10000'))
+
 # Kredi sistemi
 YENI_KULLANICI_KREDI = 50
 SORGU_BASINA_KREDI = 1
 EXCEL_KREDI = 0  # Ücretsiz
+CREDIT_HOLD_TTL = int(os.getenv('CREDIT_HOLD_TTL', '3600'))  # Kapatılmayan rezervasyonun iade edileceği süre (saniye)
+CREDIT_HOLD_SWEEP_INTERVAL = int(os.getenv('CREDIT_HOLD_SWEEP_INTERVAL', '300'))  # Süresi dolan rezervasyonların arka planda iade aralığı (saniye)
 
 # Türkiye şehirleri listesi
 TURKIYE_SEHIRLERI = [
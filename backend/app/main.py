@@ -2,13 +2,18 @@
 FastAPI main application
 """
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.templating import Jinja2Templates
-from app.models.database import init_db
-from app.routes import auth, dashboard, search, companies, admin, excel, theme
+from app.models.database import init_db, async_engine, SessionLocal
+from app.routes import auth, dashboard, search, companies, admin, excel, export, theme
 from app.routes.config import router as config_router
+from app.services.job_service import JobService
+from app.services.credit_service import CreditService
+from app.services.cache_service import place_details_cache, text_search_cache
+import asyncio
 import os
 import logging
 
@@ -25,9 +30,7 @@ logger.info("=" * 50)
 logger.info("🔐 CONFIG KONTROLÜ")
 logger.info(f"SECRET_KEY ayarlandı mı: {bool(config.SECRET_KEY)}")
 logger.info(f"SECRET_KEY uzunluk: {len(config.SECRET_KEY) if config.SECRET_KEY else 0}")
-if config.SECRET_KEY:
-    logger.info(f"SECRET_KEY başlangıcı: {config.SECRET_KEY[:10]}...")
-else:
+if not config.SECRET_KEY:
     logger.error("❌ SECRET_KEY YOK! Railway'de environment variable ekleyin!")
 logger.info("=" * 50)
 
@@ -54,10 +57,61 @@ app.include_router(search.router)
 app.include_router(companies.router)
 app.include_router(admin.router)
 app.include_router(excel.router)
+app.include_router(export.router)
 app.include_router(config_router)
 app.include_router(theme.router)
 
 
+def _suresi_dolan_rezervasyonlari_iade_et():
+    db = SessionLocal()
+    try:
+        CreditService.sweep_expired_holds(db)
+    finally:
+        db.close()
+
+
+async def _periyodik(gorev, aralik: int, ad: str):
+    """Senkron bakım görevini istek yolunun dışında, aralıklarla threadpool'da çalıştır"""
+    while True:
+        await asyncio.sleep(aralik)
+        try:
+            await run_in_threadpool(gorev)
+        except Exception:
+            logger.exception(f"{ad} başarısız")
+
+
+# Startup'ta başlatılan asyncio görevleri (referansı tutulmayan görev toplanabilir)
+_arka_plan_gorevleri = set()
+
+
+@app.on_event("startup")
+async def startup():
+    """Yarım kalan arama işlerini kuyruğa geri al, eski önbellek kayıtlarını ve kredi rezervasyonlarını temizle"""
+    _suresi_dolan_rezervasyonlari_iade_et()
+    JobService.resume_pending_jobs()
+    _arka_plan_gorevleri.add(asyncio.create_task(_periyodik(
+        _suresi_dolan_rezervasyonlari_iade_et, config.CREDIT_HOLD_SWEEP_INTERVAL, "Kredi rezervasyonu iadesi"
+    )))
+    # Sinyali kesilen (takılan) işler süreç yeniden başlamadan da kuyruğa geri alınır
+    _arka_plan_gorevleri.add(asyncio.create_task(_periyodik(
+        JobService.requeue_stale_jobs, config.SEARCH_JOB_HEARTBEAT_INTERVAL, "Arama işi sinyal kontrolü"
+    )))
+    place_details_cache.suresi_dolanlari_sil()
+    text_search_cache.suresi_dolanlari_sil()
+    # Async engine'in ilk bağlantısı (dialect başlatma) istekler gelmeden açılır;
+    # aynı anda gelen ilk istekler bu adımda birbirini bekleyip kilitlenebiliyor
+    async with async_engine.connect():
+        pass
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for gorev in _arka_plan_gorevleri:
+        gorev.cancel()
+    JobService.shutdown()
+    await async_engine.dispose()
+
+
 @app.get("/health")
 async def health():
     """Health check"""
@@ -1,23 +1,101 @@
 """
 SQLAlchemy database models
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, event, Column, Integer, BigInteger, String, Float, Date, DateTime, ForeignKey, Text, Boolean, Index
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from datetime import datetime
 import app.config as config
 
 Base = declarative_base()
 
+# Her SQLite bağlantısı açılırken çalıştırılan PRAGMA'lar
+SQLITE_PRAGMALARI = [
+    f"journal_mode={config.SQLITE_JOURNAL_MODE}",
+    f"synchronous={config.SQLITE_SYNCHRONOUS}",
+    f"busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}",
+    f"cache_size={-config.SQLITE_CACHE_SIZE_KB}",  # Negatif değer: KiB
+    f"mmap_size={config.SQLITE_MMAP_SIZE}",
+]
+
+
+def _sqlite_pragmalari(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMALARI:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+
+def engine_ayarlari(url: str) -> dict:
+    """create_engine / create_async_engine için config'ten havuz ayarları"""
+    ayarlar = {
+        'pool_pre_ping': config.DB_POOL_PRE_PING,
+        'pool_recycle': config.DB_POOL_RECYCLE,
+    }
+    # Bellek içi SQLite tek bağlantılı havuz kullanır; boyut ayarı yoktur
+    if not (url.startswith('sqlite') and (':memory:' in url or url.rstrip('/').endswith(':'))):
+        ayarlar.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+    return ayarlar
+
+
+def sqlite_ayarla(sync_engine):
+    """SQLite engine'ine bağlantı açılışında PRAGMA'ları uygulayan dinleyiciyi ekle"""
+    if sync_engine.dialect.name == 'sqlite':
+        event.listen(sync_engine, 'connect', _sqlite_pragmalari)
+
+
 # Database engine
 if config.DATABASE_URL.startswith('sqlite'):
-    engine = create_engine(config.DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_engine(
+        config.DATABASE_URL, connect_args={"check_same_thread": False},
+        **engine_ayarlari(config.DATABASE_URL)
+    )
 else:
-    engine = create_engine(config.DATABASE_URL)
+    engine = create_engine(config.DATABASE_URL, **engine_ayarlari(config.DATABASE_URL))
+sqlite_ayarla(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def dialect_insert(model):
+    """
+    Veritabanının kendi INSERT'ü (on_conflict_do_update/on_conflict_do_nothing için)
+
+    SQLite ve Postgres'in insert yapıları aynı upsert arayüzünü sunar.
+    """
+    if engine.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def async_database_url(url: str) -> str:
+    """Senkron bağlantı adresini async sürücüye çevir (SQLite: aiosqlite, Postgres: asyncpg)"""
+    if url.startswith('sqlite:'):
+        return 'sqlite+aiosqlite:' + url[len('sqlite:'):]
+    for onek in ('postgresql+psycopg2://', 'postgresql://', 'postgres://'):
+        if url.startswith(onek):
+            return 'postgresql+asyncpg://' + url[len(onek):]
+    return url
+
+
+# Async engine: event loop'u bloklamaması gereken async route'lar için.
+# Servisler ve arka plan işleri senkron engine'i kullanmaya devam eder.
+_async_ayarlar = engine_ayarlari(config.DATABASE_URL)
+if config.DATABASE_URL.startswith('sqlite') and 'pool_size' in _async_ayarlar:
+    # aiosqlite varsayılanı NullPool (her istekte yeni bağlantı ve thread); havuz kullan
+    _async_ayarlar['poolclass'] = AsyncAdaptedQueuePool
+async_engine = create_async_engine(async_database_url(config.DATABASE_URL), **_async_ayarlar)
+sqlite_ayarla(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 class User(Base):
     """Kullanıcı modeli"""
     __tablename__ = "users"
@@ -35,17 +113,27 @@ class User(Base):
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
     queries = relationship("Query", back_populates="user", cascade="all, delete-orphan")
     companies = relationship("Company", back_populates="user", cascade="all, delete-orphan")
+    search_jobs = relationship("SearchJob", back_populates="user", cascade="all, delete-orphan")
+    stats = relationship("UserStats", back_populates="user", uselist=False, cascade="all, delete-orphan")
 
 
 class Transaction(Base):
     """Bakiye işlemleri modeli"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Dashboard: kullanıcının son işlemleri
+        Index("ix_transactions_user_created", "user_id", "created_at"),
+        # Süresi dolan kredi rezervasyonlarının toplu iadesi
+        Index("ix_transactions_expires_at", "expires_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Integer, nullable=False)  # Pozitif: yükleme, Negatif: harcama
     description = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime)  # Doluysa bekleyen kredi rezervasyonu; NULL: kesinleşmiş işlem
+    hold_durumu = Column(String)  # Kredi rezervasyonu: bekliyor, kesinlesti, iade_edildi; NULL: rezervasyon değil
     
     # İlişkiler
     user = relationship("User", back_populates="transactions")
@@ -54,6 +142,10 @@ class Transaction(Base):
 class Query(Base):
     """Sorgu geçmişi modeli"""
     __tablename__ = "queries"
+    __table_args__ = (
+        # Dashboard: kullanıcının son sorguları
+        Index("ix_queries_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -62,6 +154,7 @@ class Query(Base):
     ulke = Column(String)
     limit = Column(Integer)
     result_count = Column(Integer)  # Kaç sonuç bulundu
+    api_kullanimi = Column(Text)  # Aramanın Google API çağrıları (JSON, GoogleMapsService.kullanim_ozeti)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # İlişkiler
@@ -71,9 +164,21 @@ class Query(Base):
 class Company(Base):
     """Firma modeli"""
     __tablename__ = "companies"
+    __table_args__ = (
+        # Aynı kullanıcıda her Google işletmesi tek kayıt (NULL place_id'ler serbest)
+        Index("uq_companies_user_place_id", "user_id", "place_id", unique=True),
+        # Firma listesi/export: user_id + filtreler, created_at desc sıralama
+        Index("ix_companies_user_created", "user_id", "created_at"),
+        Index("ix_companies_user_sehir_created", "user_id", "sehir", "created_at"),
+        Index("ix_companies_user_ilce_created", "user_id", "ilce", "created_at"),
+        Index("ix_companies_user_asama_created", "user_id", "asama", "created_at"),
+        # Yarıçap / sınır kutusu filtreleri: geohash aralıkları, user_id index'ten elenir
+        Index("ix_companies_geo_hucre_user", "geo_hucre", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    place_id = Column(String)  # Google place_id
     firma_adi = Column(String, nullable=False)
     sehir = Column(String)
     ilce = Column(String)
@@ -92,6 +197,11 @@ class Company(Base):
     type = Column(String)
     types = Column(Text)
     kategori = Column(String)
+    lat = Column(Float)
+    lng = Column(Float)
+    geo_hucre = Column(BigInteger)  # lat/lng'nin geohash'i (app.utils.geo)
+    arama_metni = Column(Text)  # Tam metin arama için normalize edilmiş ad/kategori/adres (bkz. migrations)
+    iletisim_eksik = Column(Boolean, default=False)  # Temel profille kaydedildi; telefon/web henüz alınmadı
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # İlişkiler
@@ -113,10 +223,93 @@ class Activity(Base):
     company = relationship("Company", back_populates="activities")
 
 
+class SearchJob(Base):
+    """Arka planda çalışan arama işi modeli"""
+    __tablename__ = "search_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default='queued', index=True)  # queued, running, done, failed
+    sehir = Column(String)
+    ulke = Column(String)
+    kategori = Column(String, nullable=False)
+    limit = Column(Integer, nullable=False)
+    tum_sehirler = Column(Boolean, default=False)
+    telefon_filtre = Column(Boolean, default=False)
+    profil = Column(String, default='tam')  # Place Details profili (temel, iletisim, tam)
+    tamamlanan_sehir = Column(Integer, default=0)  # İlerleme
+    toplam_sehir = Column(Integer, default=1)
+    result_count = Column(Integer, default=0)
+    credits_used = Column(Integer, default=0)
+    credit_hold_id = Column(Integer)  # İş kuyruğa alınırken ayrılan kredi rezervasyonu (transactions.id)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)  # Çalışan worker'ın son canlılık sinyali
+    finished_at = Column(DateTime)
+    
+    # İlişkiler
+    user = relationship("User", back_populates="search_jobs")
+    results = relationship("SearchJobResult", back_populates="job", cascade="all, delete-orphan")
+
+
+class SearchJobResult(Base):
+    """Arama işinin (kısmi) sonuçları"""
+    __tablename__ = "search_job_results"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("search_jobs.id"), nullable=False, index=True)
+    data = Column(Text, nullable=False)  # Firma bilgisi (JSON)
+    
+    # İlişkiler
+    job = relationship("SearchJob", back_populates="results")
+
+
+class UserStats(Base):
+    """Kullanıcı başına dashboard sayaçları (sorgu/firma yazılırken artırılır)"""
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_queries = Column(Integer, default=0, nullable=False)
+    total_companies = Column(Integer, default=0, nullable=False)
+    stats_gunu = Column(Date)  # *_today sayaçlarının ait olduğu gün (UTC)
+    queries_today = Column(Integer, default=0, nullable=False)
+    companies_today = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # İlişkiler
+    user = relationship("User", back_populates="stats")
+
+
+class PlaceDetailsCacheEntry(Base):
+    """Place Details yanıt önbelleği"""
+    __tablename__ = "place_details_cache"
+    
+    place_id = Column(String, primary_key=True)
+    language = Column(String, primary_key=True)
+    fields = Column(Text, nullable=False)  # Virgülle ayrılmış, sıralı alan listesi
+    data = Column(Text, nullable=False)  # Place Details 'result' (JSON)
+    fetched_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class TextSearchCacheEntry(Base):
+    """Text Search sonuç önbelleği (tüm sayfaların sıralı place_id listesi)"""
+    __tablename__ = "text_search_cache"
+    
+    query_key = Column(String, primary_key=True)  # Normalize edilmiş sorgu
+    language = Column(String, primary_key=True)
+    place_ids = Column(Text, nullable=False)  # JSON liste
+    tamamlandi = Column(Boolean, default=False)  # Son sayfaya kadar gelindi mi
+    fetched_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
 # Veritabanı tablolarını oluştur
 def init_db():
-    """Veritabanı tablolarını oluştur"""
+    """Veritabanı tablolarını oluştur ve eksik şema değişikliklerini uygula"""
+    from app.models.migrations import run_migrations
+    
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 
 # Dependency injection için
@@ -128,3 +321,9 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """Async database session dependency (async def route'lar için)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
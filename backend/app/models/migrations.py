@@ -0,0 +1,283 @@
+"""
+Şema migration'ları
+
+create_all() mevcut tablolara yeni kolon/index eklemez. Buradaki adımlar
+init_db() tarafından her açılışta çağrılır ve idempotent olmalıdır.
+"""
+import json
+import logging
+import re
+from typing import Dict, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Google Maps URL'lerinde place_id'nin geçtiği biçimler
+_PLACE_ID_RE = re.compile(r'(?:query_place_id=|place_id[=:])([A-Za-z0-9_-]+)')
+
+
+def place_id_from_url(url: Optional[str]) -> Optional[str]:
+    """Google Maps URL'inden place_id çıkar (yoksa None)"""
+    if not url:
+        return None
+    eslesme = _PLACE_ID_RE.search(url)
+    return eslesme.group(1) if eslesme else None
+
+
+def _add_column(engine: Engine, table: str, column: str, ddl_type: str) -> bool:
+    """Kolon yoksa ekle; eklendiyse True döner"""
+    kolonlar = {c['name'] for c in inspect(engine).get_columns(table)}
+    if column in kolonlar:
+        return False
+    with engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}'))
+    logger.info(f"Migration: {table}.{column} eklendi")
+    return True
+
+
+def _create_indexes(engine: Engine, table_name: str):
+    """Modelde tanımlı ama veritabanında olmayan index'leri oluştur"""
+    from app.models.database import Base
+
+    table = Base.metadata.tables[table_name]
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def backfill_company_place_ids(engine: Engine) -> int:
+    """
+    place_id'si boş firmaları url kolonundan doldur
+
+    Place Details 'url' alanı çoğunlukla ?cid=... biçimindedir ve place_id
+    içermez. Bu durumda url, place_details_cache'teki aynı url'e sahip
+    kayıttan eşleştirilir. Eşleşmeyen firmalar NULL kalır ve ad/adres ile
+    tekilleştirilmeye devam eder.
+
+    Returns:
+        Doldurulan firma sayısı
+    """
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT id, user_id, url FROM companies "
+            "WHERE place_id IS NULL AND url IS NOT NULL AND url != ''"
+        )).all()
+        if not rows:
+            return 0
+
+        # Önbellekteki Place Details kayıtlarından url -> place_id eşlemesi
+        url_map: Dict[str, str] = {}
+        for place_id, data in conn.execute(text("SELECT place_id, data FROM place_details_cache")):
+            try:
+                url = json.loads(data).get('url')
+            except ValueError:
+                continue
+            if url:
+                url_map[url] = place_id
+
+        # Kullanıcı başına zaten kullanılan place_id'ler (unique index ihlal edilmesin)
+        kullanilan = {
+            (user_id, place_id) for user_id, place_id in conn.execute(text(
+                "SELECT user_id, place_id FROM companies WHERE place_id IS NOT NULL"
+            ))
+        }
+
+        guncellemeler = []
+        for company_id, user_id, url in rows:
+            place_id = place_id_from_url(url) or url_map.get(url)
+            if not place_id or (user_id, place_id) in kullanilan:
+                continue
+            kullanilan.add((user_id, place_id))
+            guncellemeler.append({'id': company_id, 'place_id': place_id})
+
+        if guncellemeler:
+            conn.execute(text("UPDATE companies SET place_id = :place_id WHERE id = :id"), guncellemeler)
+
+    logger.info(f"Migration: {len(guncellemeler)}/{len(rows)} firmanın place_id'si url'den dolduruldu")
+    return len(guncellemeler)
+
+
+def backfill_company_locations(engine: Engine) -> int:
+    """
+    Konumu boş firmaları place_details_cache'teki geometry alanından doldur
+
+    Returns:
+        Doldurulan firma sayısı
+    """
+    from app.utils.geo import geo_hucre
+
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT c.id, d.data FROM companies c "
+            "JOIN place_details_cache d ON d.place_id = c.place_id "
+            "WHERE c.lat IS NULL"
+        )).all()
+
+        guncellemeler, doldurulan = [], set()
+        for company_id, data in rows:
+            if company_id in doldurulan:
+                continue  # Aynı place_id farklı dillerde önbellekte olabilir
+            try:
+                konum = (json.loads(data).get('geometry') or {}).get('location') or {}
+            except ValueError:
+                continue
+            lat, lng = konum.get('lat'), konum.get('lng')
+            if lat is None or lng is None:
+                continue
+            doldurulan.add(company_id)
+            guncellemeler.append({'id': company_id, 'lat': lat, 'lng': lng, 'geo_hucre': geo_hucre(lat, lng)})
+
+        if guncellemeler:
+            conn.execute(text(
+                "UPDATE companies SET lat = :lat, lng = :lng, geo_hucre = :geo_hucre WHERE id = :id"
+            ), guncellemeler)
+
+    logger.info(f"Migration: {len(guncellemeler)} firmanın konumu önbellekten dolduruldu")
+    return len(guncellemeler)
+
+
+def backfill_company_search_text(engine: Engine, parti: int = 5000) -> int:
+    """
+    arama_metni'si boş firmaları doldur
+
+    Returns:
+        Doldurulan firma sayısı
+    """
+    from app.services.company_service import ARAMA_KOLONLARI, arama_metni_olustur
+
+    kolonlar = ', '.join(ARAMA_KOLONLARI)
+    toplam, son_id = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                f"SELECT id, {kolonlar} FROM companies "
+                "WHERE id > :son_id AND arama_metni IS NULL ORDER BY id LIMIT :parti"
+            ), {'son_id': son_id, 'parti': parti}).mappings().all()
+            if not rows:
+                break
+            conn.execute(text("UPDATE companies SET arama_metni = :arama_metni WHERE id = :id"), [
+                {'id': row['id'], 'arama_metni': arama_metni_olustur(row)} for row in rows
+            ])
+        toplam += len(rows)
+        son_id = rows[-1]['id']
+
+    logger.info(f"Migration: {toplam} firmanın arama metni dolduruldu")
+    return toplam
+
+
+# SQLite: companies.arama_metni üzerinde external content FTS5 tablosu.
+# Trigger'lar index'i her insert/update/delete'te (kullanıcı silinince
+# cascade ile silinen firmalar dahil) aynı transaction içinde günceller.
+_SQLITE_FTS_TRIGGERLARI = [
+    """CREATE TRIGGER IF NOT EXISTS companies_fts_ai AFTER INSERT ON companies BEGIN
+        INSERT INTO companies_fts(rowid, arama_metni) VALUES (new.id, new.arama_metni);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS companies_fts_ad AFTER DELETE ON companies BEGIN
+        INSERT INTO companies_fts(companies_fts, rowid, arama_metni) VALUES ('delete', old.id, old.arama_metni);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE OF arama_metni ON companies BEGIN
+        INSERT INTO companies_fts(companies_fts, rowid, arama_metni) VALUES ('delete', old.id, old.arama_metni);
+        INSERT INTO companies_fts(rowid, arama_metni) VALUES (new.id, new.arama_metni);
+    END""",
+]
+
+
+def create_company_search_index(engine: Engine):
+    """Firma tam metin arama index'ini oluştur (SQLite: FTS5, Postgres: GIN)"""
+    if engine.dialect.name == 'sqlite':
+        with engine.begin() as conn:
+            var_mi = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'companies_fts'"
+            )).first()
+            if not var_mi:
+                # Metin zaten normalize edilir; tokenizer sadece boşluklardan böler.
+                # prefix: 2-3 harflik önek aramaları (yazarken arama) için ek index
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE companies_fts USING fts5("
+                    "arama_metni, content='companies', content_rowid='id', "
+                    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                ))
+                conn.execute(text("INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')"))
+                logger.info("Migration: companies_fts oluşturuldu")
+            for trigger in _SQLITE_FTS_TRIGGERLARI:
+                conn.execute(text(trigger))
+    elif engine.dialect.name == 'postgresql':
+        # Sorgudaki ifade (company_filter_service.tam_metin_kosulu) bununla birebir aynı olmalı
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_companies_arama_metni ON companies "
+                "USING gin (to_tsvector('simple'::regconfig, arama_metni))"
+            ))
+
+
+# Kredi rezervasyonu bekliyor durumundan çıkarken (kesinleşme/iade) kullanılmayan
+# kısım aynı UPDATE içinde bakiyeye geri yazılır: kayıt -rezerve'den -alınan'a
+# (iadede 0'a) iner, fark (new.amount - old.amount) bakiyeye eklenir.
+_SQLITE_HOLD_TRIGGERI = """CREATE TRIGGER IF NOT EXISTS transactions_hold_kapanis
+    AFTER UPDATE OF hold_durumu ON transactions
+    WHEN old.hold_durumu = 'bekliyor' AND new.hold_durumu != 'bekliyor' BEGIN
+        UPDATE users SET balance = balance + (new.amount - old.amount) WHERE id = new.user_id;
+    END"""
+
+_POSTGRES_HOLD_TRIGGERI = [
+    """CREATE OR REPLACE FUNCTION transactions_hold_kapanis() RETURNS trigger AS $$
+    BEGIN
+        UPDATE users SET balance = balance + (NEW.amount - OLD.amount) WHERE id = NEW.user_id;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS transactions_hold_kapanis ON transactions",
+    """CREATE TRIGGER transactions_hold_kapanis
+    AFTER UPDATE OF hold_durumu ON transactions FOR EACH ROW
+    WHEN (OLD.hold_durumu = 'bekliyor' AND NEW.hold_durumu <> 'bekliyor')
+    EXECUTE FUNCTION transactions_hold_kapanis()""",
+]
+
+
+def backfill_hold_durumu(engine: Engine):
+    """Eski rezervasyon kayıtlarının durumunu doldur (bekleyenler ve işlere bağlı olanlar)"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE transactions SET hold_durumu = 'bekliyor' WHERE expires_at IS NOT NULL"
+        ))
+        conn.execute(text(
+            "UPDATE transactions SET hold_durumu = CASE "
+            "WHEN amount = 0 AND description LIKE '%iade edildi' THEN 'iade_edildi' ELSE 'kesinlesti' END "
+            "WHERE hold_durumu IS NULL AND id IN "
+            "(SELECT credit_hold_id FROM search_jobs WHERE credit_hold_id IS NOT NULL)"
+        ))
+
+
+def create_hold_trigger(engine: Engine):
+    """Rezervasyon kapanırken kullanılmayan krediyi iade eden trigger'ı oluştur"""
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.execute(text(_SQLITE_HOLD_TRIGGERI))
+        elif engine.dialect.name == 'postgresql':
+            for komut in _POSTGRES_HOLD_TRIGGERI:
+                conn.execute(text(komut))
+
+
+def run_migrations(engine: Engine):
+    """Tüm migration adımlarını sırayla uygula"""
+    if _add_column(engine, 'companies', 'place_id', 'VARCHAR'):
+        backfill_company_place_ids(engine)
+    _add_column(engine, 'companies', 'lat', 'FLOAT')
+    _add_column(engine, 'companies', 'lng', 'FLOAT')
+    if _add_column(engine, 'companies', 'geo_hucre', 'BIGINT'):
+        backfill_company_locations(engine)
+    _create_indexes(engine, 'companies')
+    if _add_column(engine, 'companies', 'arama_metni', 'TEXT'):
+        backfill_company_search_text(engine)
+    create_company_search_index(engine)
+    # Mevcut firmalar tüm alanlarla alınmıştı; NULL iletişim eksik sayılmaz
+    _add_column(engine, 'companies', 'iletisim_eksik', 'BOOLEAN')
+    _create_indexes(engine, 'queries')
+    _add_column(engine, 'queries', 'api_kullanimi', 'TEXT')
+    _add_column(engine, 'transactions', 'expires_at', 'TIMESTAMP')
+    _create_indexes(engine, 'transactions')
+    _add_column(engine, 'search_jobs', 'credit_hold_id', 'INTEGER')
+    if _add_column(engine, 'transactions', 'hold_durumu', 'VARCHAR'):
+        backfill_hold_durumu(engine)
+    create_hold_trigger(engine)
+    _add_column(engine, 'search_jobs', 'profil', 'VARCHAR')
@@ -8,6 +8,8 @@ from typing import List, Optional
 from app.models.database import User, Transaction, get_db
 from app.utils.auth import get_current_admin_user
 from app.services.credit_service import CreditService
+from app.services.cache_service import place_details_cache, text_search_cache
+from app.services.company_filter_service import company_filter_service
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -34,7 +36,7 @@ class UserSearch(BaseModel):
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def get_users(
+def get_users(
     search: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -64,7 +66,7 @@ async def get_users(
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -86,7 +88,7 @@ async def get_user(
 
 
 @router.post("/users/{user_id}/credit", response_model=dict)
-async def add_credit_to_user(
+def add_credit_to_user(
     user_id: int,
     credit_data: CreditUpdate,
     current_user: User = Depends(get_current_admin_user),
@@ -122,7 +124,7 @@ async def add_credit_to_user(
 
 
 @router.get("/users/{user_id}/transactions")
-async def get_user_transactions(
+def get_user_transactions(
     user_id: int,
     current_user: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -147,3 +149,22 @@ async def get_user_transactions(
         for t in transactions
     ]
 
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Google Maps önbellek isabet/kaçırma sayaçları"""
+    return {
+        "place_details": place_details_cache.istatistikler(),
+        "text_search": text_search_cache.istatistikler()
+    }
+
+
+@router.get("/filters/stats")
+async def get_filter_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Firma listesi/export sorgu süreleri (filtre ve filtre kombinasyonu başına)"""
+    return company_filter_service.istatistikler()
@@ -9,7 +9,7 @@ from datetime import timedelta
 from app.models.database import User, get_db, init_db
 from app.utils.auth import (
     verify_password, get_password_hash, create_access_token,
-    get_current_user
+    get_current_user_async
 )
 from app.models.database import User as UserModel
 import app.config as config
@@ -42,7 +42,7 @@ class Token(BaseModel):
 
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """Yeni kullanıcı kaydı"""
     # Email kontrolü
     existing_user = db.query(User).filter(User.email == user_data.email).first()
@@ -75,7 +75,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     # Token oluştur
     access_token_expires = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": new_user.id}, expires_delta=access_token_expires
+        data={"sub": str(new_user.id)}, expires_delta=access_token_expires
     )
     
     return {
@@ -93,7 +93,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -113,7 +113,7 @@ async def login(
     # Token oluştur
     access_token_expires = timedelta(minutes=config.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.id}, expires_delta=access_token_expires
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
     )
     
     return {
@@ -131,7 +131,7 @@ async def login(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: UserModel = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserModel = Depends(get_current_user_async)):
     """Mevcut kullanıcı bilgilerini getir"""
     return UserResponse(
         id=current_user.id,
@@ -1,15 +1,28 @@
 """
 Companies routes - Firma yönetimi
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
-from app.models.database import User, Company, Activity, get_db
-from app.utils.auth import get_current_user
+from datetime import datetime
+import base64
+import json
+import logging
+from app.models.database import User, Company, Activity, SessionLocal, get_async_db
+from app.utils.auth import get_current_user_async
+from app.services.stats_service import StatsService
+from app.services.company_service import eksik_iletisimleri_tamamla
+from app.services.google_maps_service import GoogleMapsService
+from app.services.company_filter_service import CompanyFilter, company_filter, company_filter_service
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
+logger = logging.getLogger(__name__)
+
 
 class CompanyResponse(BaseModel):
     id: int
@@ -31,12 +44,20 @@ class CompanyResponse(BaseModel):
     type: Optional[str]
     types: Optional[str]
     kategori: Optional[str]
+    lat: Optional[float]
+    lng: Optional[float]
+    iletisim_eksik: Optional[bool]
     created_at: Optional[str]
     
     class Config:
         from_attributes = True
 
 
+class CompanyListResponse(BaseModel):
+    companies: List[CompanyResponse]
+    next_cursor: Optional[str] = None
+
+
 class CompanyUpdate(BaseModel):
     asama: Optional[str] = None
 
@@ -56,165 +77,183 @@ class ActivityResponse(BaseModel):
         from_attributes = True
 
 
-@router.get("/", response_model=List[CompanyResponse])
+# Yanıtta dönen kolonlar; liste ve detay sadece bunları seçer (ORM nesnesi oluşturulmaz)
+YANIT_KOLONLARI = [
+    Company.id, Company.firma_adi, Company.sehir, Company.ilce, Company.ulke,
+    Company.adres, Company.telefon, Company.web, Company.asama, Company.rating,
+    Company.user_ratings_total, Company.price_level, Company.business_status,
+    Company.international_phone_number, Company.url, Company.plus_code,
+    Company.type, Company.types, Company.kategori, Company.lat, Company.lng,
+    Company.iletisim_eksik, Company.created_at
+]
+
+
+async def _firma_satiri(db: AsyncSession, user_id: int, company_id: int) -> Optional[dict]:
+    """Tek firmanın yanıt kolonlarını sözlük olarak getir"""
+    result = await db.execute(
+        select(*YANIT_KOLONLARI).where(Company.id == company_id, Company.user_id == user_id)
+    )
+    row = result.mappings().first()
+    return dict(row) if row is not None else None
+
+
+def _iletisimi_tamamla(user_id: int, company_id: int):
+    """Temel profille kaydedilmiş firmanın telefon/web bilgisini al (senkron; thread'de çalışır)"""
+    db = SessionLocal()
+    try:
+        eksik_iletisimleri_tamamla(db, user_id, [company_id], GoogleMapsService())
+    except Exception:
+        # Detay iletişim bilgisi olmadan da gösterilebilir; bir sonraki açılışta tekrar denenir
+        logger.warning(f"Firma iletişim bilgisi alınamadı: {company_id}", exc_info=True)
+    finally:
+        db.close()
+
+
+async def _firma_var_mi(db: AsyncSession, user_id: int, company_id: int) -> bool:
+    """Firma bu kullanıcıya ait mi"""
+    result = await db.execute(
+        select(Company.id).where(Company.id == company_id, Company.user_id == user_id)
+    )
+    return result.first() is not None
+
+
+# Sunucu tarafı sıralama anahtarları (NULL değerler en küçük kabul edilir)
+SIRALAMA_IFADELERI = {
+    'created_at': Company.created_at,
+    'rating': func.coalesce(Company.rating, -1.0),
+    'user_ratings_total': func.coalesce(Company.user_ratings_total, -1),
+    'firma_adi': Company.firma_adi,
+}
+
+
+def _cursor_olustur(sort: str, deger, company_id: int) -> str:
+    """Son satırın (sıralama değeri, id) ikilisini opak bir token'a çevir"""
+    if sort == 'created_at' and deger is not None:
+        deger = deger.isoformat()
+    elif sort in ('rating', 'user_ratings_total') and deger is None:
+        deger = -1
+    veri = json.dumps([deger, company_id], ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(veri).decode().rstrip('=')
+
+
+def _cursor_coz(sort: str, cursor: str):
+    """Cursor token'ını (sıralama değeri, id) ikilisine çevir"""
+    try:
+        dolgu = '=' * (-len(cursor) % 4)
+        deger, company_id = json.loads(base64.urlsafe_b64decode(cursor + dolgu))
+        if sort == 'created_at':
+            deger = datetime.fromisoformat(deger)
+        return deger, int(company_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+
+
+@router.get("/", response_model=CompanyListResponse)
 async def get_companies(
-    sehir_filtre: Optional[str] = None,
-    ilce_filtre: Optional[str] = None,
-    asama_filtre: Optional[str] = None,
-    telefon_filtre: Optional[str] = None,  # "hepsi", "var", "yok"
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    filtre: CompanyFilter = Depends(company_filter),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = Query('created_at', pattern='^(created_at|rating|user_ratings_total|firma_adi)$'),
+    order: str = Query('desc', pattern='^(asc|desc)$'),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Firmaları listele (filtrelerle)"""
-    query = db.query(Company).filter(Company.user_id == current_user.id)
-    
-    if sehir_filtre and sehir_filtre != "Hepsi":
-        query = query.filter(Company.sehir == sehir_filtre)
-    
-    if ilce_filtre and ilce_filtre != "Hepsi":
-        query = query.filter(Company.ilce == ilce_filtre)
-    
-    if asama_filtre and asama_filtre != "Hepsi":
-        query = query.filter(Company.asama == asama_filtre)
-    
-    if telefon_filtre == "var":
-        query = query.filter(Company.telefon.isnot(None), Company.telefon != "")
-    elif telefon_filtre == "yok":
-        query = query.filter(
-            (Company.telefon.is_(None)) | (Company.telefon == "")
-        )
-    
-    companies = query.order_by(Company.created_at.desc()).all()
+    """
+    Firmaları listele (filtrelerle, keyset pagination ile)
+    
+    Sonraki sayfa için yanıttaki next_cursor aynı filtre ve sıralama ile
+    cursor parametresinde gönderilir.
+    """
+    # (sıralama değeri, id) ikilisi üzerinden keyset pagination;
+    # bir fazla satır çekerek sonraki sayfanın varlığı anlaşılır
+    onceki = _cursor_coz(sort, cursor) if cursor else None
+    stmt = company_filter_service.sayfa_sorgusu(
+        current_user.id, filtre, YANIT_KOLONLARI, SIRALAMA_IFADELERI[sort],
+        azalan=order == 'desc', son=onceki, limit=limit + 1
+    )
     
-    return [
-        CompanyResponse(
-            id=c.id,
-            firma_adi=c.firma_adi,
-            sehir=c.sehir,
-            ilce=c.ilce,
-            ulke=c.ulke,
-            adres=c.adres,
-            telefon=c.telefon,
-            web=c.web,
-            asama=c.asama,
-            rating=c.rating,
-            user_ratings_total=c.user_ratings_total,
-            price_level=c.price_level,
-            business_status=c.business_status,
-            international_phone_number=c.international_phone_number,
-            url=c.url,
-            plus_code=c.plus_code,
-            type=c.type,
-            types=c.types,
-            kategori=c.kategori,
-            created_at=c.created_at.isoformat() if c.created_at else None
-        )
-        for c in companies
-    ]
+    with company_filter_service.olc('liste', filtre):
+        companies = (await db.execute(stmt)).mappings().all()
+    
+    next_cursor = None
+    if len(companies) > limit:
+        companies = companies[:limit]
+        son = companies[-1]
+        next_cursor = _cursor_olustur(sort, son[sort], son['id'])
+    
+    # Satırlar doğrudan orjson ile yazılır (datetime'lar ISO 8601 olur);
+    # response_model sadece dokümantasyon içindir
+    return ORJSONResponse({
+        'companies': [dict(row) for row in companies],
+        'next_cursor': next_cursor
+    })
 
 
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(
     company_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Firma detayını getir"""
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.user_id == current_user.id
-    ).first()
+    """Firma detayını getir (temel profille kaydedildiyse telefon/web önce tamamlanır)"""
+    user_id = current_user.id
+    company = await _firma_satiri(db, user_id, company_id)
     
     if not company:
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    return CompanyResponse(
-        id=company.id,
-        firma_adi=company.firma_adi,
-        sehir=company.sehir,
-        ilce=company.ilce,
-        ulke=company.ulke,
-        adres=company.adres,
-        telefon=company.telefon,
-        web=company.web,
-        asama=company.asama,
-        rating=company.rating,
-        user_ratings_total=company.user_ratings_total,
-        price_level=company.price_level,
-        business_status=company.business_status,
-        international_phone_number=company.international_phone_number,
-        url=company.url,
-        plus_code=company.plus_code,
-        type=company.type,
-        types=company.types,
-        kategori=company.kategori,
-        created_at=company.created_at.isoformat() if company.created_at else None
-    )
+    if company['iletisim_eksik']:
+        # Açık okuma işlemi kapatılır; yoksa ayrı oturumda yazılan değerler görünmeyebilir
+        await db.rollback()
+        await run_in_threadpool(_iletisimi_tamamla, user_id, company_id)
+        company = await _firma_satiri(db, user_id, company_id)
+    
+    return ORJSONResponse(company)
 
 
 @router.patch("/{company_id}", response_model=CompanyResponse)
 async def update_company(
     company_id: int,
     update_data: CompanyUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Firma bilgilerini güncelle (sadece aşama)"""
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.user_id == current_user.id
-    ).first()
+    if update_data.asama:
+        await db.execute(
+            update(Company)
+            .where(Company.id == company_id, Company.user_id == current_user.id)
+            .values(asama=update_data.asama)
+        )
+        await db.commit()
+    
+    company = await _firma_satiri(db, current_user.id, company_id)
     
     if not company:
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    if update_data.asama:
-        company.asama = update_data.asama
-    
-    db.commit()
-    db.refresh(company)
-    
-    return CompanyResponse(
-        id=company.id,
-        firma_adi=company.firma_adi,
-        sehir=company.sehir,
-        ilce=company.ilce,
-        ulke=company.ulke,
-        adres=company.adres,
-        telefon=company.telefon,
-        web=company.web,
-        asama=company.asama,
-        rating=company.rating,
-        user_ratings_total=company.user_ratings_total,
-        price_level=company.price_level,
-        business_status=company.business_status,
-        international_phone_number=company.international_phone_number,
-        url=company.url,
-        plus_code=company.plus_code,
-        type=company.type,
-        types=company.types,
-        kategori=company.kategori,
-        created_at=company.created_at.isoformat() if company.created_at else None
-    )
+    return ORJSONResponse(company)
 
 
 @router.delete("/{company_id}")
 async def delete_company(
     company_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Firmayı sil"""
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.user_id == current_user.id
-    ).first()
+    company = (await db.execute(
+        select(Company).where(Company.id == company_id, Company.user_id == current_user.id)
+    )).scalar_one_or_none()
     
     if not company:
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    db.delete(company)
-    db.commit()
+    # Senkron servis aynı transaction içinde çalışır
+    user_id, created_at = current_user.id, company.created_at
+    await db.run_sync(lambda session: StatsService.firma_silindi(session, user_id, created_at))
+    await db.delete(company)
+    await db.commit()
     
     return {"message": "Firma silindi"}
 
@@ -222,21 +261,18 @@ async def delete_company(
 @router.get("/{company_id}/activities", response_model=List[ActivityResponse])
 async def get_company_activities(
     company_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Firmanın aktivitelerini getir"""
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.user_id == current_user.id
-    ).first()
-    
-    if not company:
+    if not await _firma_var_mi(db, current_user.id, company_id):
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    activities = db.query(Activity).filter(
-        Activity.company_id == company_id
-    ).order_by(Activity.created_at.desc()).all()
+    activities = (await db.execute(
+        select(Activity)
+        .where(Activity.company_id == company_id)
+        .order_by(Activity.created_at.desc())
+    )).scalars().all()
     
     return [
         ActivityResponse(
@@ -253,16 +289,11 @@ async def get_company_activities(
 async def create_activity(
     company_id: int,
     activity_data: ActivityCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Yeni aktivite ekle"""
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.user_id == current_user.id
-    ).first()
-    
-    if not company:
+    if not await _firma_var_mi(db, current_user.id, company_id):
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
     activity = Activity(
@@ -271,8 +302,8 @@ async def create_activity(
         sonuc=activity_data.sonuc
     )
     db.add(activity)
-    db.commit()
-    db.refresh(activity)
+    await db.commit()
+    await db.refresh(activity)
     
     return ActivityResponse(
         id=activity.id,
@@ -286,64 +317,60 @@ async def create_activity(
 async def delete_activity(
     company_id: int,
     activity_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Aktiviteyi sil"""
-    company = db.query(Company).filter(
-        Company.id == company_id,
-        Company.user_id == current_user.id
-    ).first()
-    
-    if not company:
+    if not await _firma_var_mi(db, current_user.id, company_id):
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    activity = db.query(Activity).filter(
-        Activity.id == activity_id,
-        Activity.company_id == company_id
-    ).first()
+    activity = (await db.execute(
+        select(Activity).where(Activity.id == activity_id, Activity.company_id == company_id)
+    )).scalar_one_or_none()
     
     if not activity:
         raise HTTPException(status_code=404, detail="Aktivite bulunamadı")
     
-    db.delete(activity)
-    db.commit()
+    await db.delete(activity)
+    await db.commit()
     
     return {"message": "Aktivite silindi"}
 
 
 @router.get("/filters/cities")
 async def get_cities(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Kullanıcının firmalarındaki şehirleri getir"""
-    cities = db.query(Company.sehir).filter(
-        Company.user_id == current_user.id,
-        Company.sehir.isnot(None),
-        Company.sehir != ""
-    ).distinct().all()
+    cities = await db.execute(
+        select(Company.sehir).where(
+            Company.user_id == current_user.id,
+            Company.sehir.isnot(None),
+            Company.sehir != ""
+        ).distinct()
+    )
     
-    return [city[0] for city in cities]
+    return cities.scalars().all()
 
 
 @router.get("/filters/districts")
 async def get_districts(
     sehir: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Kullanıcının firmalarındaki ilçeleri getir"""
-    query = db.query(Company.ilce).filter(
+    query = select(Company.ilce).where(
         Company.user_id == current_user.id,
         Company.ilce.isnot(None),
         Company.ilce != ""
     )
     
     if sehir and sehir != "Hepsi":
-        query = query.filter(Company.sehir == sehir)
+        query = query.where(Company.sehir == sehir)
     
-    districts = query.distinct().all()
+    districts = await db.execute(query.distinct())
     
-    return [district[0] for district in districts]
+    return districts.scalars().all()
 
@@ -1,8 +1,10 @@
 """
 Config routes - Uygulama yapılandırma verileri
 """
-from fastapi import APIRouter
-from typing import List
+from fastapi import APIRouter, Header, Response
+from typing import List, Optional, Tuple
+import hashlib
+import orjson
 import app.config as config
 
 router = APIRouter(prefix="/api/config", tags=["config"])
@@ -16,14 +18,40 @@ class ConfigResponse:
     aktivite_tipleri: List[str]
 
 
-@router.get("/")
-async def get_config():
-    """Uygulama yapılandırma verilerini getir"""
-    return {
+def _yanit_olustur() -> Tuple[bytes, str]:
+    """Yapılandırma verisini JSON'a çevir ve içerikten strong ETag üret"""
+    govde = orjson.dumps({
         "sehirler": config.TURKIYE_SEHIRLERI,
         "ulkeler": config.ULKELER,
         "kategoriler": config.KATEGORILER,
         "asama_secenekleri": config.ASAMA_SECENEKLERI,
         "aktivite_tipleri": config.AKTIVITE_TIPLERI
-    }
+    })
+    etag = '"' + hashlib.sha256(govde).hexdigest()[:32] + '"'
+    return govde, etag
+
+
+# Veri sadece deploy ile değiştiği için yanıt uygulama açılırken bir kez hazırlanır
+CONFIG_GOVDE, CONFIG_ETAG = _yanit_olustur()
+CACHE_CONTROL = f"public, max-age={config.CONFIG_CACHE_MAX_AGE}"
+
+
+def _etag_eslesiyor(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match başlığı ETag'i içeriyor mu (weak karşılaştırma, RFC 9110)"""
+    if not if_none_match:
+        return False
+    for deger in if_none_match.split(','):
+        deger = deger.strip()
+        if deger == '*' or deger.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+@router.get("/")
+async def get_config(if_none_match: Optional[str] = Header(None)):
+    """Uygulama yapılandırma verilerini getir (ETag ile; değişmediyse 304)"""
+    headers = {"ETag": CONFIG_ETAG, "Cache-Control": CACHE_CONTROL}
+    if _etag_eslesiyor(if_none_match, CONFIG_ETAG):
+        return Response(status_code=304, headers=headers)
+    return Response(content=CONFIG_GOVDE, media_type="application/json", headers=headers)
 
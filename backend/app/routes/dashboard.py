@@ -2,12 +2,13 @@
 Dashboard routes
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.models.database import User, Transaction, Query, get_db
-from app.utils.auth import get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.database import User, Transaction, Query, get_async_db
+from app.utils.auth import get_current_user_async
+from app.services.stats_service import StatsService
 from pydantic import BaseModel
 from typing import List
-from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
@@ -24,36 +25,21 @@ class DashboardStats(BaseModel):
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dashboard istatistiklerini getir"""
-    # Bugünün başlangıcı
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Toplam sorgu sayısı
-    total_queries = db.query(Query).filter(Query.user_id == current_user.id).count()
-    
-    # Bugünkü sorgu sayısı
-    queries_today = db.query(Query).filter(
-        Query.user_id == current_user.id,
-        Query.created_at >= today_start
-    ).count()
-    
-    # Toplam firma sayısı
-    from app.models.database import Company
-    total_companies = db.query(Company).filter(Company.user_id == current_user.id).count()
-    
-    # Bugünkü firma sayısı
-    companies_today = db.query(Company).filter(
-        Company.user_id == current_user.id,
-        Company.created_at >= today_start
-    ).count()
+    # Sayaçlar user_stats tablosundan tek okumayla gelir
+    user_id = current_user.id
+    stats = await db.run_sync(lambda session: StatsService.getir(session, user_id))
     
     # Son işlemler (10 adet)
-    recent_transactions = db.query(Transaction).filter(
-        Transaction.user_id == current_user.id
-    ).order_by(Transaction.created_at.desc()).limit(10).all()
+    recent_transactions = (await db.execute(
+        select(Transaction)
+        .where(Transaction.user_id == user_id)
+        .order_by(Transaction.created_at.desc())
+        .limit(10)
+    )).scalars().all()
     
     transactions_data = [
         {
@@ -66,9 +52,12 @@ async def get_dashboard_stats(
     ]
     
     # Son sorgular (10 adet)
-    recent_queries = db.query(Query).filter(
-        Query.user_id == current_user.id
-    ).order_by(Query.created_at.desc()).limit(10).all()
+    recent_queries = (await db.execute(
+        select(Query)
+        .where(Query.user_id == user_id)
+        .order_by(Query.created_at.desc())
+        .limit(10)
+    )).scalars().all()
     
     queries_data = [
         {
@@ -84,10 +73,10 @@ async def get_dashboard_stats(
     
     return DashboardStats(
         balance=current_user.balance,
-        total_queries=total_queries,
-        total_companies=total_companies,
-        queries_today=queries_today,
-        companies_today=companies_today,
+        total_queries=stats['total_queries'],
+        total_companies=stats['total_companies'],
+        queries_today=stats['queries_today'],
+        companies_today=stats['companies_today'],
         recent_transactions=transactions_data,
         recent_queries=queries_data
     )
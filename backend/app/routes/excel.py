@@ -1,86 +1,81 @@
 """
 Excel export routes
 """
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import BinaryIO, Iterable, Optional
 from app.models.database import User, Company, get_db
 from app.utils.auth import get_current_user
+from app.utils.stream import dosyayi_akit
+from app.services.company_filter_service import CompanyFilter, company_filter, company_filter_service
+from app.services.company_service import iletisimleri_tamamla
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
 from datetime import datetime
-import io
+from tempfile import SpooledTemporaryFile
+import itertools
+import app.config as config
 
 router = APIRouter(prefix="/api/excel", tags=["excel"])
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
-@router.get("/export")
-async def export_companies(
-    sehir_filtre: Optional[str] = None,
-    ilce_filtre: Optional[str] = None,
-    asama_filtre: Optional[str] = None,
-    telefon_filtre: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Firmaları Excel'e aktar (ücretsiz)"""
-    # Filtrelerle firmaları getir
-    query = db.query(Company).filter(Company.user_id == current_user.id)
-    
-    if sehir_filtre and sehir_filtre != "Hepsi":
-        query = query.filter(Company.sehir == sehir_filtre)
-    
-    if ilce_filtre and ilce_filtre != "Hepsi":
-        query = query.filter(Company.ilce == ilce_filtre)
-    
-    if asama_filtre and asama_filtre != "Hepsi":
-        query = query.filter(Company.asama == asama_filtre)
-    
-    if telefon_filtre == "var":
-        query = query.filter(Company.telefon.isnot(None), Company.telefon != "")
-    elif telefon_filtre == "yok":
-        query = query.filter(
-            (Company.telefon.is_(None)) | (Company.telefon == "")
-        )
-    
-    companies = query.order_by(Company.created_at.desc()).all()
-    
-    if not companies:
-        return Response(
-            content="Aktarılacak veri bulunamadı",
-            status_code=404
-        )
-    
-    # Excel workbook oluştur
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Firmalar"
+# Başlıklar ve kolon genişlikleri
+BASLIKLAR = [
+    'Sıra', 'Firma Adı', 'Şehir', 'İlçe', 'Kategori', 'Adres', 'Aşama',
+    'Telefon', 'Web', 'Rating', 'Değerlendirme Sayısı', 'Fiyat Seviyesi'
+]
+KOLON_GENISLIKLERI = {
+    'A': 8, 'B': 30, 'C': 20, 'D': 20, 'E': 20, 'F': 50,
+    'G': 15, 'H': 20, 'I': 30, 'J': 10, 'K': 18, 'L': 15
+}
+
+
+def _fiyat_seviyesi(price_level: Optional[int]) -> str:
+    """Fiyat seviyesini ₺ işaretlerine çevir"""
+    if price_level is None or price_level < 0:
+        return ''
+    return '₺' * (price_level + 1)
+
+
+def excel_yaz(companies: Iterable, hedef: BinaryIO) -> int:
+    """
+    Firmaları write-only workbook ile hedef dosyaya yaz
+    
+    Satırlar openpyxl tarafından geçici dosyaya aktarıldığı için bellek
+    kullanımı satır sayısından bağımsızdır.
+    
+    Returns:
+        Yazılan firma sayısı
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Firmalar")
+    
+    # Kolon genişlikleri ve başlık yüksekliği satırlardan önce ayarlanmalı
+    for kolon, genislik in KOLON_GENISLIKLERI.items():
+        ws.column_dimensions[kolon].width = genislik
+    ws.row_dimensions[1].height = 25
     
     # Başlık satırı
-    basliklar = [
-        'Sıra', 'Firma Adı', 'Şehir', 'İlçe', 'Kategori', 'Adres', 'Aşama',
-        'Telefon', 'Web', 'Rating', 'Değerlendirme Sayısı', 'Fiyat Seviyesi'
-    ]
-    ws.append(basliklar)
-    
-    # Başlık stilini ayarla
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF")
+    header_alignment = Alignment(horizontal="center", vertical="center")
     
-    for cell in ws[1]:
+    baslik_satiri = []
+    for baslik in BASLIKLAR:
+        cell = WriteOnlyCell(ws, value=baslik)
         cell.fill = header_fill
         cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
+        cell.alignment = header_alignment
+        baslik_satiri.append(cell)
+    ws.append(baslik_satiri)
     
     # Verileri ekle
+    idx = 0
     for idx, company in enumerate(companies, 1):
-        # Fiyat seviyesi formatla
-        price_level = company.price_level
-        price_str = ''
-        if price_level is not None:
-            price_str = '₺' * (price_level + 1) if price_level >= 0 else ''
-        
-        satir = [
+        ws.append([
             idx,
             company.firma_adi or '',
             company.sehir or '',
@@ -92,39 +87,58 @@ async def export_companies(
             company.web or '',
             company.rating or '',
             company.user_ratings_total or '',
-            price_str
-        ]
-        ws.append(satir)
+            _fiyat_seviyesi(company.price_level)
+        ])
     
-    # Kolon genişliklerini ayarla
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 30
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 20
-    ws.column_dimensions['E'].width = 20
-    ws.column_dimensions['F'].width = 50
-    ws.column_dimensions['G'].width = 15
-    ws.column_dimensions['H'].width = 20
-    ws.column_dimensions['I'].width = 30
-    ws.column_dimensions['J'].width = 10
-    ws.column_dimensions['K'].width = 18
-    ws.column_dimensions['L'].width = 15
+    wb.save(hedef)
+    return idx
+
+
+@router.get("/export")
+def export_companies(
+    iletisim: bool = Query(False, description="Temel profilli firmaların telefon/web'ini önce tamamla"),
+    filtre: CompanyFilter = Depends(company_filter),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Firmaları Excel'e aktar (ücretsiz)"""
+    if iletisim:
+        iletisimleri_tamamla(db, current_user.id, filtre)
     
-    # Satır yüksekliğini ayarla
-    ws.row_dimensions[1].height = 25
+    # Filtrelerle firmaları getir; satırlar parça parça okunur, tüm sonuç belleğe alınmaz
+    stmt = company_filter_service.sorgu(current_user.id, filtre) \
+        .order_by(Company.created_at.desc()) \
+        .execution_options(yield_per=config.EXPORT_BATCH_SIZE)
     
-    # Excel dosyasını memory'ye yaz
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
+    # Ölçüm sorgu ve ilk parça içindir, xlsx yazımı dahil değildir
+    with company_filter_service.olc('excel', filtre):
+        companies = iter(db.execute(stmt).scalars())
+        ilk = next(companies, None)
+    
+    if ilk is None:
+        return Response(
+            content="Aktarılacak veri bulunamadı",
+            status_code=404
+        )
+    
+    # Küçük dosyalar bellekte kalır, büyükler diske taşınır
+    output = SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_SIZE)
+    try:
+        excel_yaz(itertools.chain([ilk], companies), output)
+        boyut = output.tell()
+    except Exception:
+        output.close()
+        raise
     
     # Dosya adı
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"firmalar_{timestamp}.xlsx"
     
-    return Response(
-        content=output.read(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    return StreamingResponse(
+        dosyayi_akit(output),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(boyut)
+        }
     )
-
@@ -0,0 +1,187 @@
+"""
+Export routes - CSV, gzip CSV ve Parquet
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import BinaryIO, Iterable, Iterator
+from app.models.database import User, Company, SessionLocal, get_db
+from app.utils.auth import get_current_user
+from app.utils.stream import dosyayi_akit
+from app.services.company_filter_service import CompanyFilter, company_filter, company_filter_service
+from app.services.company_service import iletisimleri_tamamla
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+import csv
+import io
+import itertools
+import zlib
+import app.config as config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet desteği isteğe bağlı
+    pa = None
+    pq = None
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+# Dışa aktarılan kolonlar (başlık satırı da bu isimlerle yazılır)
+EXPORT_KOLONLARI = [
+    'id', 'place_id', 'firma_adi', 'sehir', 'ilce', 'ulke', 'kategori', 'adres',
+    'asama', 'telefon', 'international_phone_number', 'web', 'rating',
+    'user_ratings_total', 'price_level', 'business_status', 'url', 'lat', 'lng', 'created_at'
+]
+
+# format: (media type, dosya uzantısı)
+FORMATLAR = {
+    'csv': ('text/csv', 'csv'),
+    'csv.gz': ('application/gzip', 'csv.gz'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Parquet row group boyutu (satır)
+PARQUET_ROW_GROUP = 50000
+
+
+def _parcalar(satirlar: Iterable, boyut: int) -> Iterator[list]:
+    iterator = iter(satirlar)
+    while True:
+        parca = list(itertools.islice(iterator, boyut))
+        if not parca:
+            return
+        yield parca
+
+
+def _satirlar(user_id: int, filtre: CompanyFilter, etiket: str = 'export') -> Iterator[tuple]:
+    """
+    Filtrelenen firmaların export kolonlarını parça parça oku
+
+    Yanıt akarken request'in oturumu kapanmış olabileceği için kendi
+    oturumunu açar.
+    """
+    stmt = company_filter_service.sorgu(
+        user_id, filtre, *[getattr(Company, kolon) for kolon in EXPORT_KOLONLARI]
+    ).order_by(Company.created_at.desc()).execution_options(yield_per=config.EXPORT_BATCH_SIZE)
+
+    db = SessionLocal()
+    try:
+        # Ölçüm sorgu ve ilk parça içindir; yanıtın akıtılması dahil değildir
+        with company_filter_service.olc(etiket, filtre):
+            satirlar = iter(db.execute(stmt))
+            ilk = next(satirlar, None)
+        if ilk is not None:
+            yield ilk
+            yield from satirlar
+    finally:
+        db.close()
+
+
+def csv_akisi(satirlar: Iterable[tuple]) -> Iterator[bytes]:
+    """Satırları başlıklı CSV olarak parça parça üret"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_KOLONLARI)
+
+    for parca in _parcalar(satirlar, config.EXPORT_BATCH_SIZE):
+        writer.writerows(parca)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        # Hiç satır yoksa sadece başlık
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_akisi(parcalar: Iterable[bytes]) -> Iterator[bytes]:
+    """Bayt parçalarını gzip formatında sıkıştırarak akıt"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for parca in parcalar:
+        sikistirilmis = compressor.compress(parca)
+        if sikistirilmis:
+            yield sikistirilmis
+    yield compressor.flush()
+
+
+def parquet_yaz(satirlar: Iterable[tuple], hedef: BinaryIO):
+    """Satırları row group'lar halinde Parquet dosyasına yaz"""
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('place_id', pa.string()),
+        ('firma_adi', pa.string()),
+        ('sehir', pa.string()),
+        ('ilce', pa.string()),
+        ('ulke', pa.string()),
+        ('kategori', pa.string()),
+        ('adres', pa.string()),
+        ('asama', pa.string()),
+        ('telefon', pa.string()),
+        ('international_phone_number', pa.string()),
+        ('web', pa.string()),
+        ('rating', pa.float64()),
+        ('user_ratings_total', pa.int64()),
+        ('price_level', pa.int64()),
+        ('business_status', pa.string()),
+        ('url', pa.string()),
+        ('lat', pa.float64()),
+        ('lng', pa.float64()),
+        ('created_at', pa.timestamp('us')),
+    ])
+
+    with pq.ParquetWriter(hedef, schema) as writer:
+        for parca in _parcalar(satirlar, PARQUET_ROW_GROUP):
+            kolonlar = list(zip(*parca))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(degerler, type=alan.type) for degerler, alan in zip(kolonlar, schema)],
+                schema=schema
+            ))
+
+
+@router.get("/")
+def export_companies(
+    bicim: str = Query('csv', alias='format', pattern=r'^(csv|csv\.gz|parquet)$'),
+    iletisim: bool = Query(False, description="Temel profilli firmaların telefon/web'ini önce tamamla"),
+    filtre: CompanyFilter = Depends(company_filter),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Firmaları CSV, gzip CSV veya Parquet olarak dışa aktar (ücretsiz)
+
+    Filtreler Excel export ile aynıdır. CSV formatları akış halinde
+    gönderilir; Parquet için sunucuda pyarrow kurulu olmalıdır.
+    """
+    if bicim == 'parquet' and pa is None:
+        raise HTTPException(status_code=400, detail="Parquet desteği için pyarrow kurulu olmalı")
+
+    if iletisim:
+        iletisimleri_tamamla(db, current_user.id, filtre)
+
+    ilk = db.execute(company_filter_service.sorgu(current_user.id, filtre, Company.id).limit(1)).first()
+    if ilk is None:
+        return Response(
+            content="Aktarılacak veri bulunamadı",
+            status_code=404
+        )
+
+    media_type, uzanti = FORMATLAR[bicim]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    headers = {"Content-Disposition": f"attachment; filename=firmalar_{timestamp}.{uzanti}"}
+
+    if bicim == 'parquet':
+        # Parquet footer'ı dosyanın sonunda olduğu için önce dosya tamamlanır
+        output = SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_SIZE)
+        try:
+            parquet_yaz(_satirlar(current_user.id, filtre, bicim), output)
+            headers["Content-Length"] = str(output.tell())
+        except Exception:
+            output.close()
+            raise
+        return StreamingResponse(dosyayi_akit(output), media_type=media_type, headers=headers)
+
+    akis = csv_akisi(_satirlar(current_user.id, filtre, bicim))
+    if bicim == 'csv.gz':
+        akis = gzip_akisi(akis)
+    return StreamingResponse(akis, media_type=media_type, headers=headers)
@@ -1,14 +1,16 @@
 """
 Search routes - Google Maps arama
 """
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from app.models.database import User, Company, get_db
 from app.utils.auth import get_current_user
 from app.services.google_maps_service import GoogleMapsService
 from app.services.credit_service import CreditService
+from app.services.company_service import save_companies_to_db
+from app.services.job_service import JobService
 import app.config as config
 
 router = APIRouter(prefix="/api/search", tags=["search"])
@@ -21,28 +23,35 @@ class SearchRequest(BaseModel):
     limit: int = 20
     tum_sehirler: bool = False
     telefon_filtre: bool = False
+    # Place Details profili: temel (ad/adres/konum), iletisim (+telefon/web), tam (+puanlar).
+    # Temel profilde telefon/web firma açıldığında veya dışa aktarılırken tamamlanır.
+    profil: str = Field('tam', pattern=r'^(temel|iletisim|tam)$')
 
 
 class CompanyResponse(BaseModel):
     id: Optional[int] = None
+    place_id: Optional[str] = None
     firma_adi: str
-    sehir: Optional[str]
-    ilce: Optional[str]
-    ulke: Optional[str]
-    adres: Optional[str]
-    telefon: Optional[str]
-    web: Optional[str]
-    asama: Optional[str]
-    rating: Optional[float]
-    user_ratings_total: Optional[int]
-    price_level: Optional[int]
-    business_status: Optional[str]
-    international_phone_number: Optional[str]
-    url: Optional[str]
-    plus_code: Optional[str]
-    type: Optional[str]
-    types: Optional[str]
-    kategori: Optional[str]
+    sehir: Optional[str] = None
+    ilce: Optional[str] = None
+    ulke: Optional[str] = None
+    adres: Optional[str] = None
+    telefon: Optional[str] = None
+    web: Optional[str] = None
+    asama: Optional[str] = None
+    rating: Optional[float] = None
+    user_ratings_total: Optional[int] = None
+    price_level: Optional[int] = None
+    business_status: Optional[str] = None
+    international_phone_number: Optional[str] = None
+    url: Optional[str] = None
+    plus_code: Optional[str] = None
+    type: Optional[str] = None
+    types: Optional[str] = None
+    kategori: Optional[str] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    iletisim_eksik: Optional[bool] = None
     
     class Config:
         from_attributes = True
@@ -55,51 +64,154 @@ class SearchResponse(BaseModel):
     remaining_balance: int
 
 
-def save_companies_to_db(db: Session, user_id: int, companies: List[dict], kategori: str):
-    """Firmaları veritabanına kaydet (background task)"""
-    for company_data in companies:
-        # Firma zaten var mı kontrol et
-        existing = db.query(Company).filter(
-            Company.user_id == user_id,
-            Company.firma_adi == company_data['firma_adi'],
-            Company.adres == company_data.get('adres', '')
-        ).first()
-        
-        if existing:
-            # Güncelle
-            for key, value in company_data.items():
-                if hasattr(existing, key) and value is not None:
-                    setattr(existing, key, value)
-            if kategori:
-                existing.kategori = kategori
-        else:
-            # Yeni ekle
-            new_company = Company(
-                user_id=user_id,
-                kategori=kategori,
-                **company_data
-            )
-            db.add(new_company)
+class SearchJobResponse(BaseModel):
+    id: int
+    status: str
+    sehir: Optional[str]
+    ulke: Optional[str]
+    kategori: str
+    limit: int
+    tum_sehirler: bool
+    telefon_filtre: bool
+    profil: str
+    tamamlanan_sehir: int
+    toplam_sehir: int
+    result_count: int
+    credits_used: int
+    error: Optional[str]
+    created_at: Optional[str]
+    finished_at: Optional[str]
+
+
+class SearchJobResultsResponse(BaseModel):
+    companies: List[CompanyResponse]
+    offset: int
+    next_offset: Optional[int]
+    status: str
+
+
+def _job_response(job) -> SearchJobResponse:
+    return SearchJobResponse(
+        id=job.id,
+        status=job.status,
+        sehir=job.sehir,
+        ulke=job.ulke,
+        kategori=job.kategori,
+        limit=job.limit,
+        tum_sehirler=bool(job.tum_sehirler),
+        telefon_filtre=bool(job.telefon_filtre),
+        profil=job.profil or 'tam',
+        tamamlanan_sehir=job.tamamlanan_sehir or 0,
+        toplam_sehir=job.toplam_sehir or 1,
+        result_count=job.result_count or 0,
+        credits_used=job.credits_used or 0,
+        error=job.error,
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        finished_at=job.finished_at.isoformat() if job.finished_at else None
+    )
+
+
+@router.post("/jobs", response_model=SearchJobResponse, status_code=202)
+def create_search_job(
+    search_request: SearchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Arama işini kuyruğa al (hemen döner, arama arka planda çalışır)"""
+    if not search_request.tum_sehirler and not search_request.sehir:
+        raise HTTPException(status_code=400, detail="Şehir belirtilmedi")
+    
+    # En yüksek ücret iş kuyruğa alınırken rezerve edilir, iş bitince kesinleşir
+    credit_service = CreditService()
+    required_credits = credit_service.search_hold_amount(search_request.limit, search_request.tum_sehirler)
+    hold_id = credit_service.hold_credit(
+        db, current_user.id, required_credits,
+        f"Arama: {search_request.kategori} - {search_request.sehir or 'Tüm Şehirler'} (rezerve)"
+    )
     
-    db.commit()
+    if hold_id is None:
+        balance = credit_service.check_balance(db, current_user.id)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Yetersiz bakiye. Gerekli: {required_credits}, Mevcut: {balance}"
+        )
+    
+    job = JobService.create_job(
+        db=db,
+        user_id=current_user.id,
+        sehir=None if search_request.tum_sehirler else search_request.sehir,
+        ulke=search_request.ulke,
+        kategori=search_request.kategori,
+        limit=search_request.limit,
+        tum_sehirler=search_request.tum_sehirler,
+        telefon_filtre=search_request.telefon_filtre,
+        profil=search_request.profil,
+        credit_hold_id=hold_id
+    )
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=SearchJobResponse)
+def get_search_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Arama işinin durumunu getir"""
+    job = JobService.get_job(db, current_user.id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Arama işi bulunamadı")
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}/results", response_model=SearchJobResultsResponse)
+def get_search_job_results(
+    job_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Arama işinin o ana kadarki sonuçlarını sayfa sayfa getir"""
+    job = JobService.get_job(db, current_user.id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Arama işi bulunamadı")
+    
+    companies = JobService.get_results(db, job_id, offset=offset, limit=limit)
+    
+    # İş sürerken yeni sonuçlar gelebilir; bitmiş işte son sayfadan sonra devam yok
+    if len(companies) == limit or job.status in ('queued', 'running'):
+        next_offset = offset + len(companies)
+    else:
+        next_offset = None
+    
+    return SearchJobResultsResponse(
+        companies=[CompanyResponse(**company) for company in companies],
+        offset=offset,
+        next_offset=next_offset,
+        status=job.status
+    )
 
 
 @router.post("/", response_model=SearchResponse)
-async def search_companies(
+def search_companies(
     search_request: SearchRequest,
     background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """İşletme ara"""
-    # Bakiye kontrolü
-    credit_service = CreditService()
-    balance = credit_service.check_balance(db, current_user.id)
+    """İşletme ara (senkron; uzun aramalar için /jobs kullanın)"""
+    if not search_request.tum_sehirler and not search_request.sehir:
+        raise HTTPException(status_code=400, detail="Şehir belirtilmedi")
     
-    # Gerekli kredi hesapla
-    required_credits = search_request.limit * config.SORGU_BASINA_KREDI
+    # En yüksek ücret aramadan önce rezerve edilir, sonunda bulunan sonuç kadarı alınır
+    credit_service = CreditService()
+    required_credits = credit_service.search_hold_amount(search_request.limit, search_request.tum_sehirler)
+    aciklama = f"Arama: {search_request.kategori} - {search_request.sehir or 'Tüm Şehirler'}"
+    hold_id = credit_service.hold_credit(db, current_user.id, required_credits, f"{aciklama} (rezerve)")
     
-    if balance < required_credits:
+    if hold_id is None:
+        balance = credit_service.check_balance(db, current_user.id)
         raise HTTPException(
             status_code=400,
             detail=f"Yetersiz bakiye. Gerekli: {required_credits}, Mevcut: {balance}"
@@ -115,34 +227,22 @@ async def search_companies(
                 kategori=search_request.kategori,
                 ulke=search_request.ulke,
                 limit_per_sehir=search_request.limit,
-                telefon_filtre=search_request.telefon_filtre
+                telefon_filtre=search_request.telefon_filtre,
+                profil=search_request.profil
             )
         else:
             # Tek şehirde ara
-            if not search_request.sehir:
-                raise HTTPException(status_code=400, detail="Şehir belirtilmedi")
-            
             companies_data = google_maps.isletme_ara(
                 sehir=search_request.sehir,
                 ulke=search_request.ulke,
                 kategori=search_request.kategori,
                 limit=search_request.limit,
-                telefon_filtre=search_request.telefon_filtre
+                telefon_filtre=search_request.telefon_filtre,
+                profil=search_request.profil
             )
         
-        # Kredi düşür
+        # Sorgu geçmişi kredi düşümüyle aynı transaction'da yazılır
         credits_used = len(companies_data) * config.SORGU_BASINA_KREDI
-        success = credit_service.deduct_credit(
-            db=db,
-            user_id=current_user.id,
-            amount=credits_used,
-            description=f"Arama: {search_request.kategori} - {search_request.sehir or 'Tüm Şehirler'}"
-        )
-        
-        if not success:
-            raise HTTPException(status_code=400, detail="Kredi düşürme hatası")
-        
-        # Sorgu geçmişini kaydet
         credit_service.save_query(
             db=db,
             user_id=current_user.id,
@@ -150,9 +250,24 @@ async def search_companies(
             kategori=search_request.kategori,
             ulke=search_request.ulke,
             limit=search_request.limit,
-            result_count=len(companies_data)
+            result_count=len(companies_data),
+            api_kullanimi=google_maps.kullanim_ozeti(),
+            commit=False
+        )
+        
+        # Rezervasyonu bulunan sonuç kadar kesinleştir, kalanı iade et
+        success = credit_service.settle_hold(
+            db=db,
+            user_id=current_user.id,
+            hold_id=hold_id,
+            amount=credits_used,
+            description=aciklama
         )
         
+        if not success:
+            raise HTTPException(status_code=400, detail="Kredi düşürme hatası")
+        db.commit()
+        
         # Firmaları veritabanına kaydet (background)
         background_tasks.add_task(
             save_companies_to_db,
@@ -178,5 +293,8 @@ async def search_companies(
         )
     
     except Exception as e:
+        # Kesinleşmemiş rezervasyon iade edilir (kesinleşmişse bir şey yapmaz)
+        db.rollback()
+        credit_service.release_hold(db, current_user.id, hold_id)
         raise HTTPException(status_code=500, detail=f"Arama hatası: {str(e)}")
 
@@ -15,7 +15,7 @@ class ThemeUpdate(BaseModel):
 
 
 @router.patch("/", response_model=dict)
-async def update_theme(
+def update_theme(
     theme_data: ThemeUpdate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -0,0 +1,377 @@
+"""
+Google Maps yanıt önbellekleri
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+from app.models.database import SessionLocal, PlaceDetailsCacheEntry, TextSearchCacheEntry
+from app.utils.text import sorgu_normalize
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe, süreli (TTL) LRU önbellek"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            kayit = self._data.get(key)
+            if kayit is None:
+                return None
+            son_kullanma, deger = kayit
+            if son_kullanma < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return deger
+
+    def kalan_sure(self, key) -> Optional[float]:
+        """Kaydın kalan geçerlilik süresi (saniye; kayıt yoksa veya süresi dolduysa None)"""
+        with self._lock:
+            kayit = self._data.get(key)
+        if kayit is None:
+            return None
+        kalan = kayit[0] - time.monotonic()
+        return kalan if kalan > 0 else None
+
+    def set(self, key, deger, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        son_kullanma = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (son_kullanma, deger)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PlaceDetailsCache:
+    """
+    Place Details yanıtları için iki katmanlı önbellek
+
+    Bellekteki LRU, place_details_cache tablosunun önünde durur. Anahtar
+    (place_id, dil) ikilisidir; kayıt, istenen alanların tamamını içeriyorsa
+    isabet sayılır.
+    """
+
+    def __init__(self, ttl: int = config.PLACE_DETAILS_CACHE_TTL,
+                 lru_boyutu: int = config.PLACE_DETAILS_CACHE_SIZE,
+                 kalici: bool = True):
+        """
+        Args:
+            ttl: Kayıtların geçerlilik süresi (saniye, 0: önbellek kapalı)
+            lru_boyutu: Bellekte tutulacak maksimum kayıt
+            kalici: Veritabanı katmanını kullan
+        """
+        self.ttl = ttl
+        self.kalici = kalici
+        self._lru = LRUCache(lru_boyutu, ttl)
+        self._sayac_lock = threading.Lock()
+        self.sayaclar = {'lru_hit': 0, 'db_hit': 0, 'miss': 0, 'write': 0}
+
+    @property
+    def aktif(self) -> bool:
+        return self.ttl > 0
+
+    def _say(self, anahtar: str, adet: int = 1):
+        with self._sayac_lock:
+            self.sayaclar[anahtar] += adet
+
+    def get_many(self, place_ids: Iterable[str], language: str,
+                 fields: List[str]) -> Dict[str, Dict]:
+        """
+        Önbellekteki detayları getir
+
+        Returns:
+            place_id -> Place Details 'result' sözlüğü (sadece isabet edenler)
+        """
+        place_ids = list(dict.fromkeys(place_ids))
+        if not self.aktif or not place_ids:
+            return {}
+
+        istenen = set(fields)
+        bulunan = {}
+        eksik = []
+        for place_id in place_ids:
+            kayit = self._lru.get((place_id, language))
+            if kayit is not None and istenen <= kayit[0]:
+                bulunan[place_id] = kayit[1]
+            else:
+                eksik.append(place_id)
+        self._say('lru_hit', len(bulunan))
+
+        if eksik and self.kalici:
+            esik = datetime.utcnow() - timedelta(seconds=self.ttl)
+            db = SessionLocal()
+            try:
+                rows = db.query(PlaceDetailsCacheEntry).filter(
+                    PlaceDetailsCacheEntry.place_id.in_(eksik),
+                    PlaceDetailsCacheEntry.language == language,
+                    PlaceDetailsCacheEntry.fetched_at >= esik
+                ).all()
+                for row in rows:
+                    alanlar = set(row.fields.split(','))
+                    if not istenen <= alanlar:
+                        continue
+                    data = json.loads(row.data)
+                    bulunan[row.place_id] = data
+                    # Kalan süre kadar bellekte tut
+                    kalan = self.ttl - (datetime.utcnow() - row.fetched_at).total_seconds()
+                    self._lru.set((row.place_id, language), (alanlar, data), ttl=kalan)
+                    self._say('db_hit')
+            except SQLAlchemyError:
+                logger.exception("Place Details önbelleği okunamadı")
+            finally:
+                db.close()
+
+        self._say('miss', len(place_ids) - len(bulunan))
+        return bulunan
+
+    def get(self, place_id: str, language: str, fields: List[str]) -> Optional[Dict]:
+        """Tek bir place_id için önbellekteki detayı getir"""
+        return self.get_many([place_id], language, fields).get(place_id)
+
+    def set_many(self, detaylar: Dict[str, Dict], language: str, fields: List[str]):
+        """
+        API'den gelen detayları önbelleğe yaz
+
+        Geçerli bir kayıt varsa yeni alanlar onunla birleştirilir (alanların
+        ve verinin birleşimi yazılır); dar bir alan kümesiyle gelen detay,
+        ör. sadece iletişim alanları, daha geniş kaydı ezmez. Birleşen kayıt
+        eski verinin alındığı zamanı korur, yani ilk alınan alanlar kadar
+        geçerli kalır.
+        """
+        detaylar = {place_id: data for place_id, data in detaylar.items() if data}
+        if not self.aktif or not detaylar:
+            return
+
+        simdi = datetime.utcnow()
+        # place_id -> (alanlar, veri, alındığı zaman)
+        kayitlar = {place_id: (set(fields), data, simdi) for place_id, data in detaylar.items()}
+
+        def birlestir(place_id: str, alanlar: set, data: Dict, zaman: datetime):
+            yeni_alanlar, yeni_data, yeni_zaman = kayitlar[place_id]
+            kayitlar[place_id] = (alanlar | yeni_alanlar, {**data, **yeni_data}, min(zaman, yeni_zaman))
+
+        for place_id in detaylar:
+            mevcut = self._lru.get((place_id, language))
+            kalan = self._lru.kalan_sure((place_id, language))
+            if mevcut is not None and kalan is not None:
+                birlestir(place_id, mevcut[0], mevcut[1], simdi - timedelta(seconds=self.ttl - kalan))
+
+        if self.kalici:
+            esik = simdi - timedelta(seconds=self.ttl)
+            db = SessionLocal()
+            try:
+                rows = db.query(PlaceDetailsCacheEntry).filter(
+                    PlaceDetailsCacheEntry.place_id.in_(list(detaylar)),
+                    PlaceDetailsCacheEntry.language == language
+                ).all()
+                for row in rows:
+                    if row.fetched_at >= esik:
+                        birlestir(row.place_id, set(row.fields.split(',')), json.loads(row.data), row.fetched_at)
+
+                for place_id, (alanlar, data, zaman) in kayitlar.items():
+                    db.merge(PlaceDetailsCacheEntry(
+                        place_id=place_id,
+                        language=language,
+                        fields=','.join(sorted(alanlar)),
+                        data=json.dumps(data, ensure_ascii=False),
+                        fetched_at=zaman
+                    ))
+                db.commit()
+            except SQLAlchemyError:
+                # Aynı kaydı eşzamanlı yazan başka bir worker olabilir; önbellek kritik değil
+                db.rollback()
+                logger.warning("Place Details önbelleğine yazılamadı", exc_info=True)
+            finally:
+                db.close()
+
+        for place_id, (alanlar, data, zaman) in kayitlar.items():
+            kalan = self.ttl - (simdi - zaman).total_seconds()
+            self._lru.set((place_id, language), (alanlar, data), ttl=kalan)
+
+        self._say('write', len(detaylar))
+
+    def set(self, place_id: str, language: str, fields: List[str], data: Dict):
+        """Tek bir detayı önbelleğe yaz"""
+        self.set_many({place_id: data}, language, fields)
+
+    def suresi_dolanlari_sil(self) -> int:
+        """Süresi dolmuş kalıcı kayıtları sil"""
+        if not self.kalici:
+            return 0
+        esik = datetime.utcnow() - timedelta(seconds=self.ttl)
+        db = SessionLocal()
+        try:
+            silinen = db.query(PlaceDetailsCacheEntry).filter(
+                PlaceDetailsCacheEntry.fetched_at < esik
+            ).delete(synchronize_session=False)
+            db.commit()
+            return silinen
+        finally:
+            db.close()
+
+    def istatistikler(self) -> Dict:
+        """İsabet/kaçırma sayaçları"""
+        with self._sayac_lock:
+            sayaclar = dict(self.sayaclar)
+        toplam = sayaclar['lru_hit'] + sayaclar['db_hit'] + sayaclar['miss']
+        sayaclar['hit_orani'] = (
+            round((sayaclar['lru_hit'] + sayaclar['db_hit']) / toplam, 4) if toplam else 0.0
+        )
+        sayaclar['lru_boyutu'] = len(self._lru)
+        return sayaclar
+
+
+class TextSearchCache:
+    """
+    Text Search sonuçları için iki katmanlı önbellek
+
+    Anahtar normalize edilmiş sorgu ve dildir. Değer, o ana kadar gezilen tüm
+    sayfalardaki place_id'lerin sıralı listesi ve son sayfaya ulaşılıp
+    ulaşılmadığıdır.
+    """
+
+    def __init__(self, ttl: int = config.TEXT_SEARCH_CACHE_TTL,
+                 lru_boyutu: int = config.TEXT_SEARCH_CACHE_SIZE,
+                 kalici: bool = True):
+        """
+        Args:
+            ttl: Kayıtların geçerlilik süresi (saniye, 0: önbellek kapalı)
+            lru_boyutu: Bellekte tutulacak maksimum sorgu
+            kalici: Veritabanı katmanını kullan
+        """
+        self.ttl = ttl
+        self.kalici = kalici
+        self._lru = LRUCache(lru_boyutu, ttl)
+        self._sayac_lock = threading.Lock()
+        self.sayaclar = {'lru_hit': 0, 'db_hit': 0, 'miss': 0, 'write': 0}
+
+    @property
+    def aktif(self) -> bool:
+        return self.ttl > 0
+
+    def _say(self, anahtar: str):
+        with self._sayac_lock:
+            self.sayaclar[anahtar] += 1
+
+    def get(self, query: str, language: str) -> Optional[Tuple[List[str], bool]]:
+        """
+        Önbellekteki sonucu getir
+
+        Returns:
+            (sıralı place_id listesi, son sayfaya ulaşıldı mı) veya None
+        """
+        if not self.aktif:
+            return None
+
+        anahtar = (sorgu_normalize(query), language)
+        kayit = self._lru.get(anahtar)
+        if kayit is not None:
+            self._say('lru_hit')
+            return kayit
+
+        if self.kalici:
+            esik = datetime.utcnow() - timedelta(seconds=self.ttl)
+            db = SessionLocal()
+            try:
+                row = db.query(TextSearchCacheEntry).filter(
+                    TextSearchCacheEntry.query_key == anahtar[0],
+                    TextSearchCacheEntry.language == language,
+                    TextSearchCacheEntry.fetched_at >= esik
+                ).first()
+                if row is not None:
+                    kayit = (json.loads(row.place_ids), bool(row.tamamlandi))
+                    kalan = self.ttl - (datetime.utcnow() - row.fetched_at).total_seconds()
+                    self._lru.set(anahtar, kayit, ttl=kalan)
+                    self._say('db_hit')
+                    return kayit
+            except SQLAlchemyError:
+                logger.exception("Text Search önbelleği okunamadı")
+            finally:
+                db.close()
+
+        self._say('miss')
+        return None
+
+    def set(self, query: str, language: str, place_ids: List[str], tamamlandi: bool):
+        """Gezilen sayfaların sonucunu önbelleğe yaz"""
+        if not self.aktif:
+            return
+
+        anahtar = (sorgu_normalize(query), language)
+        self._lru.set(anahtar, (list(place_ids), tamamlandi))
+
+        if self.kalici:
+            db = SessionLocal()
+            try:
+                db.merge(TextSearchCacheEntry(
+                    query_key=anahtar[0],
+                    language=language,
+                    place_ids=json.dumps(place_ids),
+                    tamamlandi=tamamlandi,
+                    fetched_at=datetime.utcnow()
+                ))
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                logger.warning("Text Search önbelleğine yazılamadı", exc_info=True)
+            finally:
+                db.close()
+
+        self._say('write')
+
+    def suresi_dolanlari_sil(self) -> int:
+        """Süresi dolmuş kalıcı kayıtları sil"""
+        if not self.kalici:
+            return 0
+        esik = datetime.utcnow() - timedelta(seconds=self.ttl)
+        db = SessionLocal()
+        try:
+            silinen = db.query(TextSearchCacheEntry).filter(
+                TextSearchCacheEntry.fetched_at < esik
+            ).delete(synchronize_session=False)
+            db.commit()
+            return silinen
+        finally:
+            db.close()
+
+    def istatistikler(self) -> Dict:
+        """İsabet/kaçırma sayaçları"""
+        with self._sayac_lock:
+            sayaclar = dict(self.sayaclar)
+        toplam = sayaclar['lru_hit'] + sayaclar['db_hit'] + sayaclar['miss']
+        sayaclar['hit_orani'] = (
+            round((sayaclar['lru_hit'] + sayaclar['db_hit']) / toplam, 4) if toplam else 0.0
+        )
+        sayaclar['lru_boyutu'] = len(self._lru)
+        return sayaclar
+
+
+# Uygulama genelinde paylaşılan önbellekler
+place_details_cache = PlaceDetailsCache()
+text_search_cache = TextSearchCache()
@@ -0,0 +1,398 @@
+"""
+Firma filtreleme servisi
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import Select, and_, case, column, func, literal, literal_column, or_, select, table, union_all
+from app.models.database import Company, engine
+from app.utils.geo import BOYLAM_KM, ENLEM_KM, kapsayan_araliklar, yaricap_kutusu
+from app.utils.text import arama_terimleri
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+
+# Yarıçap filtresinin üst sınırı; mesafe eşdikdörtgen yaklaşımıyla hesaplanır
+# (bu ölçekte hata %1'in altında)
+MAX_YARICAP_KM = 200
+
+
+class CompanyFilter(BaseModel):
+    """Firma listesi ve export'ların ortak filtreleri ("Hepsi" veya boş: filtre yok)"""
+    sehir_filtre: Optional[str] = None
+    ilce_filtre: Optional[str] = None
+    asama_filtre: Optional[str] = None
+    telefon_filtre: Optional[str] = None  # "var", "yok"
+    kategori_filtre: Optional[str] = None
+    business_status_filtre: Optional[str] = None
+    min_rating: Optional[float] = None
+    max_rating: Optional[float] = None
+    q: Optional[str] = None  # Ad, kategori, adres, ilçe, şehir içinde tam metin arama
+    # Yarıçap: (lat, lng) merkezli yaricap_km içindeki firmalar
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    yaricap_km: Optional[float] = None
+    # Sınır kutusu: dört değer birlikte verilir
+    min_lat: Optional[float] = None
+    min_lng: Optional[float] = None
+    max_lat: Optional[float] = None
+    max_lng: Optional[float] = None
+
+
+def company_filter(
+    sehir_filtre: Optional[str] = None,
+    ilce_filtre: Optional[str] = None,
+    asama_filtre: Optional[str] = None,
+    telefon_filtre: Optional[str] = None,
+    kategori_filtre: Optional[str] = None,
+    business_status_filtre: Optional[str] = None,
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    max_rating: Optional[float] = Query(None, ge=0, le=5),
+    q: Optional[str] = Query(None, max_length=200),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    yaricap_km: Optional[float] = Query(None, gt=0, le=MAX_YARICAP_KM),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180)
+) -> CompanyFilter:
+    """Query parametrelerinden CompanyFilter oluşturan FastAPI dependency'si"""
+    yaricap = (lat, lng, yaricap_km)
+    if any(v is not None for v in yaricap) and any(v is None for v in yaricap):
+        raise HTTPException(status_code=400, detail="lat, lng ve yaricap_km birlikte verilmeli")
+    kutu = (min_lat, min_lng, max_lat, max_lng)
+    if any(v is not None for v in kutu):
+        if any(v is None for v in kutu):
+            raise HTTPException(status_code=400, detail="min_lat, min_lng, max_lat ve max_lng birlikte verilmeli")
+        if min_lat > max_lat or min_lng > max_lng:
+            raise HTTPException(status_code=400, detail="Geçersiz sınır kutusu")
+    return CompanyFilter(
+        sehir_filtre=sehir_filtre,
+        ilce_filtre=ilce_filtre,
+        asama_filtre=asama_filtre,
+        telefon_filtre=telefon_filtre,
+        kategori_filtre=kategori_filtre,
+        business_status_filtre=business_status_filtre,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        q=q,
+        lat=lat,
+        lng=lng,
+        yaricap_km=yaricap_km,
+        min_lat=min_lat,
+        min_lng=min_lng,
+        max_lat=max_lat,
+        max_lng=max_lng
+    )
+
+
+def _secili(deger: Optional[str]) -> Optional[str]:
+    return deger if deger and deger != "Hepsi" else None
+
+
+def _telefon(deger: Optional[str]):
+    if deger == "var":
+        return Company.telefon.isnot(None) & (Company.telefon != "")
+    if deger == "yok":
+        return Company.telefon.is_(None) | (Company.telefon == "")
+    return None
+
+
+# Aramada kullanılan en fazla terim sayısı
+_MAX_ARAMA_TERIMI = 8
+
+# SQLite FTS5 tablosu (migrations.create_company_search_index)
+_companies_fts = table('companies_fts', column('rowid'))
+_POSTGRES_ARAMA_CONFIG = literal_column("'simple'::regconfig")
+
+# SQLite liste sayfası: q / konum filtresinin kendi index'inden (FTS,
+# geo_hucre) en fazla bu kadar aday gelirse sayfa bu adaylardan, fazlası
+# gelirse (user_id, created_at) index'inden okunur (bkz. sayfa_sorgusu)
+SECICI_ADAY_SINIRI = 5000
+
+
+def _fts_eslesmesi(terimler: List[str]) -> str:
+    return ' '.join(f'"{terim}"*' for terim in terimler)
+
+
+def tam_metin_kosulu(sorgu: Optional[str]):
+    """
+    q araması için WHERE koşulu (terim yoksa None)
+
+    Sorgu arama_metni ile aynı şekilde normalize edilir; her terim önek
+    olarak aranır ve tüm terimler eşleşmelidir ("ist cicek" ->
+    "İstanbul Çiçekçisi"). Terimler sadece harf/rakamdır, sorgu sözdizimine
+    karışmaz.
+    """
+    terimler = arama_terimleri(sorgu or '')[:_MAX_ARAMA_TERIMI]
+    if not terimler:
+        return None
+    if engine.dialect.name == 'sqlite':
+        return Company.id.in_(
+            select(_companies_fts.c.rowid).where(literal_column('companies_fts').match(_fts_eslesmesi(terimler)))
+        )
+    if engine.dialect.name == 'postgresql':
+        # İfade GIN index'iyle birebir aynı olmalı
+        eslesme = ' & '.join(f'{terim}:*' for terim in terimler)
+        return func.to_tsvector(_POSTGRES_ARAMA_CONFIG, Company.arama_metni).op('@@')(
+            func.to_tsquery(_POSTGRES_ARAMA_CONFIG, eslesme)
+        )
+    # Tam metin index'i olmayan veritabanları: index'siz tarama
+    return and_(*(Company.arama_metni.like(f'%{terim}%') for terim in terimler))
+
+
+def _tam_metin_satir_kosulu(terimler: List[str]):
+    """
+    q terimlerinin satırın kendi arama_metni'nde önek olarak geçmesi (FTS'siz kontrol)
+
+    arama_metni boşlukla ayrılmış normalize kelimelerdir; " terim" ile
+    başlayan bir kelime FTS'teki "terim"* eşleşmesinin aynısıdır. Terimler
+    harf/rakamdır, LIKE joker karakteri içermez.
+    """
+    metin = literal(' ') + Company.arama_metni
+    return and_(*(metin.like(f'% {terim}%') for terim in terimler))
+
+
+def _geo_aralik_kosulu(min_lat: float, min_lng: float, max_lat: float, max_lng: float):
+    araliklar = kapsayan_araliklar(min_lat, min_lng, max_lat, max_lng)
+    return or_(*(Company.geo_hucre.between(baslangic, bitis) for baslangic, bitis in araliklar))
+
+
+def _kutu_kosulu(min_lat: float, min_lng: float, max_lat: float, max_lng: float):
+    """Sınır kutusu: geo_hucre aralıkları (index) + kesin lat/lng sınırı"""
+    return and_(
+        _geo_aralik_kosulu(min_lat, min_lng, max_lat, max_lng),
+        Company.lat.between(min_lat, max_lat),
+        Company.lng.between(min_lng, max_lng)
+    )
+
+
+def _konum_kutusu(f: CompanyFilter) -> Optional[Tuple[float, float, float, float]]:
+    """Yarıçap veya sınır kutusu filtresinin kapsadığı kutu (konum filtresi yoksa None)"""
+    if f.lat is not None and f.lng is not None and f.yaricap_km is not None:
+        return yaricap_kutusu(f.lat, f.lng, f.yaricap_km)
+    if f.min_lat is not None and f.min_lng is not None and f.max_lat is not None and f.max_lng is not None:
+        return f.min_lat, f.min_lng, f.max_lat, f.max_lng
+    return None
+
+
+def _kutu(f: CompanyFilter):
+    if f.min_lat is None or f.min_lng is None or f.max_lat is None or f.max_lng is None:
+        return None
+    return _kutu_kosulu(f.min_lat, f.min_lng, f.max_lat, f.max_lng)
+
+
+def _yaricap(f: CompanyFilter):
+    if f.lat is None or f.lng is None or f.yaricap_km is None:
+        return None
+    # Dairenin sınır kutusu index'ten okunur, mesafe km cinsinden kontrol edilir
+    dy = (Company.lat - f.lat) * ENLEM_KM
+    dx = (Company.lng - f.lng) * (BOYLAM_KM * math.cos(math.radians(f.lat)))
+    return and_(
+        _kutu_kosulu(*yaricap_kutusu(f.lat, f.lng, f.yaricap_km)),
+        dx * dx + dy * dy <= f.yaricap_km * f.yaricap_km
+    )
+
+
+# (filtre adı, filtreden koşul üreten fonksiyon; None: filtre kapalı).
+# Değerler her zaman bound parametre olur, aynı filtre kombinasyonu aynı
+# derlenmiş SQL'i kullanır.
+FILTRELER: List[Tuple[str, Callable[[CompanyFilter], Optional[object]]]] = [
+    ('sehir', lambda f: Company.sehir == f.sehir_filtre if _secili(f.sehir_filtre) else None),
+    ('ilce', lambda f: Company.ilce == f.ilce_filtre if _secili(f.ilce_filtre) else None),
+    ('asama', lambda f: Company.asama == f.asama_filtre if _secili(f.asama_filtre) else None),
+    ('telefon', lambda f: _telefon(f.telefon_filtre)),
+    ('kategori', lambda f: Company.kategori == f.kategori_filtre if _secili(f.kategori_filtre) else None),
+    ('business_status', lambda f: (Company.business_status == f.business_status_filtre
+                                   if _secili(f.business_status_filtre) else None)),
+    ('min_rating', lambda f: Company.rating >= f.min_rating if f.min_rating is not None else None),
+    ('max_rating', lambda f: Company.rating <= f.max_rating if f.max_rating is not None else None),
+    ('q', lambda f: tam_metin_kosulu(f.q)),
+    ('yaricap', _yaricap),
+    ('kutu', _kutu),
+]
+
+
+class CompanyFilterService:
+    """
+    Firma sorgularını filtrelerden oluşturur ve süre istatistiği tutar
+
+    İstatistikler etiket (ör. 'liste', 'excel') başına filtre kombinasyonu
+    için tutulur; tek bir filtrenin açık olduğu sorgular ayrıca o filtrenin
+    istatistiğine yazılır. Yavaş sorgular loglanır.
+    """
+
+    def __init__(self, yavas_sorgu_ms: float = config.SLOW_QUERY_MS):
+        self.yavas_sorgu_ms = yavas_sorgu_ms
+        self._istatistik: Dict[Tuple[str, str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def aktif_filtreler(filtre: CompanyFilter) -> List[Tuple[str, object]]:
+        """Açık olan filtrelerin (ad, WHERE koşulu) listesi"""
+        aktif = []
+        for ad, kosul_olustur in FILTRELER:
+            kosul = kosul_olustur(filtre)
+            if kosul is not None:
+                aktif.append((ad, kosul))
+        return aktif
+
+    def sorgu(self, user_id: int, filtre: CompanyFilter, *kolonlar) -> Select:
+        """
+        Filtrelenmiş select(); kolon verilmezse Company entity'si seçilir
+
+        Plan veritabanına bırakılır: user_id koşulu (user_id, ...) bileşik
+        index'lerini kullanabilir, q ve konum filtreleri kendi index'lerinden
+        (FTS/GIN, geo_hucre) gelen eşleşmelerle kontrol edilir. Seçilen
+        planlar scripts/explain_company_filters ile görülebilir.
+        """
+        kosullar = [kosul for _, kosul in self.aktif_filtreler(filtre)]
+        return select(*kolonlar or (Company,)).where(Company.user_id == user_id, *kosullar)
+
+    def sayfa_sorgusu(self, user_id: int, filtre: CompanyFilter, kolonlar: List, siralama,
+                      azalan: bool, son: Optional[Tuple[object, int]], limit: int) -> Select:
+        """
+        Firma listesinin bir sayfası (keyset pagination)
+
+        Args:
+            kolonlar: Seçilecek Company kolonları (sonuç satırlarının anahtarları)
+            siralama: Sıralama ifadesi; eşitlikte id ile sıralanır
+            azalan: Azalan sıralama
+            son: Önceki sayfanın son satırının (sıralama değeri, id) ikilisi
+            limit: Sayfadaki en fazla satır
+
+        SQLite planlayıcısı FTS ve geo_hucre eşleşme sayılarını bilmez ve
+        sıralamaya uyan (user_id, created_at) index'ini tarar; seçici bir q
+        veya konum filtresinde bu, kullanıcının bütün firmalarını gezmek
+        demektir. Bu yüzden SQLite'ta sayfa UNION ALL dallarından oluşur:
+        her seçici filtrenin adayları (tüm kullanıcılarda en fazla
+        SECICI_ADAY_SINIRI + 1) kendi index'inden okunur; adaylar sınırı
+        aşmıyorsa o dal sadece adayları sıralar. Hiçbiri aşmıyorsa son dal
+        sıralama index'ini tarar ve q'yu her satırın arama_metni'nde kontrol
+        eder (eşleşme yoğun olduğundan sayfa birkaç yüz satırda dolar).
+        Dal seçimi LIMIT ifadesindedir, seçilmeyen dallar (LIMIT 0) hiç
+        çalışmaz; ayrı bir sayım sorgusu yapılmaz. Diğer veritabanlarında
+        plan istatistiklerle seçilir, sorgu tek select()'tir.
+        """
+        def sayfala(stmt: Select, sira) -> Select:
+            if son is not None:
+                deger, son_id = son
+                if azalan:
+                    stmt = stmt.where(or_(siralama < deger, and_(siralama == deger, Company.id < son_id)))
+                else:
+                    stmt = stmt.where(or_(siralama > deger, and_(siralama == deger, Company.id > son_id)))
+            if azalan:
+                return stmt.order_by(sira.desc(), Company.id.desc())
+            return stmt.order_by(sira.asc(), Company.id.asc())
+
+        aktif = self.aktif_filtreler(filtre)
+        if engine.dialect.name != 'sqlite':
+            stmt = select(*kolonlar).where(Company.user_id == user_id, *(kosul for _, kosul in aktif))
+            return sayfala(stmt, siralama).limit(limit)
+
+        # Seçici filtrelerin aday kümeleri: (filtre adı, aday id'leri CTE'si)
+        adaylar = []
+        terimler = arama_terimleri(filtre.q or '')[:_MAX_ARAMA_TERIMI]
+        if terimler:
+            adaylar.append(('q', select(_companies_fts.c.rowid.label('id')).where(
+                literal_column('companies_fts').match(_fts_eslesmesi(terimler))
+            ).limit(SECICI_ADAY_SINIRI + 1).cte('q_adaylari')))
+        kutu = _konum_kutusu(filtre)
+        if kutu is not None:
+            # Sadece (geo_hucre, user_id) index'i okunur; user_id dalda aday
+            # kolonundan kontrol edilir
+            adaylar.append(('konum', select(Company.id, Company.user_id).where(
+                _geo_aralik_kosulu(*kutu)
+            ).limit(SECICI_ADAY_SINIRI + 1).cte('konum_adaylari')))
+
+        # q, aday kümesi dışındaki dallarda satırın arama_metni'nde kontrol edilir
+        kosullar = [(ad, _tam_metin_satir_kosulu(terimler) if ad == 'q' else kosul) for ad, kosul in aktif]
+        sayilar = [select(func.count()).select_from(cte).scalar_subquery() for _, cte in adaylar]
+
+        dallar = []
+        for i, (ad, cte) in enumerate(adaylar):
+            secim = and_(*(sayi > SECICI_ADAY_SINIRI for sayi in sayilar[:i]), sayilar[i] <= SECICI_ADAY_SINIRI)
+            # companies.user_id koşulu planlayıcıyı (user_id, created_at)
+            # index'inden adayları yoklamaya yöneltir; aday kolonu varsa o kullanılır
+            kullanici = cte.c.user_id if 'user_id' in cte.c else Company.user_id
+            stmt = select(*kolonlar, siralama.label('sira')) \
+                .select_from(cte.join(Company, Company.id == cte.c.id)) \
+                .where(kullanici == user_id, *(kosul for k, kosul in kosullar if k != ad))
+            dallar.append(sayfala(stmt, siralama).limit(case((secim, limit), else_=0)))
+
+        stmt = select(*kolonlar, siralama.label('sira')) \
+            .where(Company.user_id == user_id, *(kosul for _, kosul in kosullar))
+        stmt = sayfala(stmt, siralama)
+        if not dallar:
+            return stmt.limit(limit)
+        secim = and_(*(sayi > SECICI_ADAY_SINIRI for sayi in sayilar))
+        dallar.append(stmt.limit(case((secim, limit), else_=0)))
+
+        # Sadece bir dal satır döndürür; dallar sıralı alt sorgu olarak birleştirilir
+        sayfa = union_all(*(select(dal.subquery()) for dal in dallar)).subquery('sayfa')
+        stmt = select(*(kolon for kolon in sayfa.c if kolon.key != 'sira'))
+        if azalan:
+            return stmt.order_by(sayfa.c.sira.desc(), sayfa.c.id.desc())
+        return stmt.order_by(sayfa.c.sira.asc(), sayfa.c.id.asc())
+
+    @contextmanager
+    def olc(self, etiket: str, filtre: CompanyFilter):
+        """
+        Bloğun süresini aktif filtrelere göre kaydet
+
+        Blok sadece sorgunun çalıştırılmasını ve ilk satırların okunmasını
+        kapsamalıdır; sonuçların yazılması/akıtılması ölçüme girmez. Birden
+        fazla filtreli bir sürenin hangi filtreden geldiği bilinmediği için
+        filtre istatistiği sadece filtre tek başına ölçüldüğünde tutulur.
+        """
+        aktif = [ad for ad, _ in self.aktif_filtreler(filtre)]
+        kombinasyon = '+'.join(aktif) or 'yok'
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            sure_ms = (time.perf_counter() - baslangic) * 1000
+            self._kaydet(etiket, 'kombinasyon', kombinasyon, sure_ms)
+            if len(aktif) == 1:
+                self._kaydet(etiket, 'filtre', aktif[0], sure_ms)
+
+            if sure_ms >= self.yavas_sorgu_ms:
+                logger.warning(f"Yavaş firma sorgusu ({etiket}, filtreler: {kombinasyon}): {sure_ms:.1f} ms")
+            else:
+                logger.debug(f"Firma sorgusu ({etiket}, filtreler: {kombinasyon}): {sure_ms:.1f} ms")
+
+    def _kaydet(self, etiket: str, tip: str, ad: str, sure_ms: float):
+        with self._lock:
+            kayit = self._istatistik.setdefault(
+                (etiket, tip, ad), {'adet': 0, 'toplam_ms': 0.0, 'max_ms': 0.0}
+            )
+            kayit['adet'] += 1
+            kayit['toplam_ms'] += sure_ms
+            kayit['max_ms'] = max(kayit['max_ms'], sure_ms)
+
+    def istatistikler(self) -> Dict:
+        """Etiket -> {kombinasyon: {...}, filtre: {...}} süre istatistikleri"""
+        sonuc: Dict[str, Dict[str, Dict]] = {}
+        with self._lock:
+            for (etiket, tip, ad), kayit in self._istatistik.items():
+                sonuc.setdefault(etiket, {'kombinasyon': {}, 'filtre': {}})[tip][ad] = {
+                    'adet': kayit['adet'],
+                    'ortalama_ms': round(kayit['toplam_ms'] / kayit['adet'], 2),
+                    'max_ms': round(kayit['max_ms'], 2)
+                }
+        return sonuc
+
+    def sifirla(self):
+        with self._lock:
+            self._istatistik.clear()
+
+
+# Uygulama genelinde paylaşılan servis
+company_filter_service = CompanyFilterService()
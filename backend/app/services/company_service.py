@@ -0,0 +1,257 @@
+"""
+Firma kayıt servisi
+"""
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Tuple
+from app.models.database import Company, dialect_insert
+from app.services.company_filter_service import CompanyFilter, company_filter_service
+from app.services.google_maps_service import GoogleMapsService
+from app.services.stats_service import StatsService
+from app.utils.geo import geo_hucre
+from app.utils.text import arama_normalize
+import app.config as config
+
+# Tek sorguda işlenecek firma sayısı (SQLite bağlı parametre sınırının altında kalır)
+UPSERT_BATCH_SIZE = 500
+
+# Arama sonucundan yazılabilecek kolonlar
+_YAZILABILIR_KOLONLAR = {
+    column.key for column in Company.__table__.columns
+} - {'id', 'user_id', 'created_at', 'arama_metni', 'geo_hucre'}
+
+# Tam metin aramada (q) aranan kolonlar; arama_metni bunlardan üretilir
+ARAMA_KOLONLARI = ('firma_adi', 'kategori', 'adres', 'ilce', 'sehir')
+
+# Eşleşen mevcut firmadan okunan / upsert'ün döndürdüğü kolonlar (güncellenmiş arama metnini hesaplamak için)
+_MEVCUT_KOLONLAR = [Company.id, Company.arama_metni] + [
+    getattr(Company, kolon) for kolon in ARAMA_KOLONLARI
+]
+
+# Upsert'te yazılan kolonlar (executemany: her satırda hepsi bulunur)
+_UPSERT_KOLONLARI = sorted(_YAZILABILIR_KOLONLAR | {'geo_hucre'})
+
+# Çakışmada coalesce ile güncellenmeyen kolonlar: eşleşme anahtarı, kullanıcının
+# yönettiği aşama ve _firma_upsert'te ayrıca ele alınanlar
+_UPSERTTE_KORUNAN = {'place_id', 'asama', 'kategori', 'iletisim_eksik'}
+
+_VARSAYILAN_ASAMA = Company.__table__.c.asama.default.arg
+
+
+def _firma_upsert(kategori: str):
+    """(user_id, place_id) çakışmasında mevcut firmayı güncelleyen INSERT"""
+    stmt = dialect_insert(Company)
+    excluded = stmt.excluded
+    # Boş gelen alanlar mevcut değeri ezmez
+    set_ = {
+        kolon: func.coalesce(excluded[kolon], Company.__table__.c[kolon])
+        for kolon in _UPSERT_KOLONLARI if kolon not in _UPSERTTE_KORUNAN
+    }
+    if kategori:
+        set_['kategori'] = excluded.kategori
+    # Temel profille gelen firma, kayıttaki iletişim bilgisinin durumunu değiştirmez
+    set_['iletisim_eksik'] = case(
+        (excluded.iletisim_eksik, Company.iletisim_eksik), else_=excluded.iletisim_eksik
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[Company.user_id, Company.place_id], set_=set_
+    ).returning(*_MEVCUT_KOLONLAR, Company.created_at)
+
+
+def _parcala(items: List, boyut: int):
+    for i in range(0, len(items), boyut):
+        yield items[i:i + boyut]
+
+
+def arama_metni_olustur(kayit) -> str:
+    """Firmanın ARAMA_KOLONLARI değerlerinden arama_metni kolonunu üret"""
+    return arama_normalize(' '.join(kayit[kolon] for kolon in ARAMA_KOLONLARI if kayit.get(kolon)))
+
+
+def _dedup_anahtari(company_data: dict) -> Tuple:
+    """Firmanın tekilleştirme anahtarı: place_id, yoksa (ad, adres)"""
+    if company_data.get('place_id'):
+        return ('place_id', company_data['place_id'])
+    return ('ad_adres', company_data['firma_adi'], company_data.get('adres', ''))
+
+
+def save_companies_to_db(db: Session, user_id: int, companies: List[dict], kategori: str,
+                         commit: bool = True):
+    """
+    Firmaları veritabanına toplu kaydet (upsert)
+
+    Firmalar (user_id, place_id) unique index'i üzerinden veritabanının
+    kendi upsert'üyle (INSERT ... ON CONFLICT DO UPDATE) yazılır; aynı
+    kullanıcı için eşzamanlı kayıtlar birbirinin eklediği firmaya çarpmaz.
+    Sadece place_id'si olmayan eski kayıtlar ad/adres ile bulunur ve
+    place_id'leri doldurulur.
+
+    arama_metni aynı yazımda güncellenir; SQLite'ta FTS index'i trigger'larla
+    (silmeler dahil), Postgres'te GIN expression index'iyle takip eder.
+
+    commit=False ise yazılanlar çağıranın transaction'ında kalır.
+    """
+    # Aynı listede tekrar eden firmaları birleştir (son gelen geçerli)
+    kayitlar: Dict[Tuple, dict] = {}
+    for company_data in companies:
+        kayitlar[_dedup_anahtari(company_data)] = company_data
+
+    # Yeni eklenen satırlar RETURNING'de bu created_at değeriyle ayırt edilir
+    # (created_at ve arama_metni çakışmada güncellenmez)
+    kayit_zamani = datetime.utcnow()
+    upsert = _firma_upsert(kategori)
+
+    eklenen = 0
+    for parca in _parcala(list(kayitlar.values()), UPSERT_BATCH_SIZE):
+        # place_id'si henüz olmayan eski kayıtlara ad/adres ile bak.
+        # place_id'si dolu kayıtlar ad ile eşleşmez (zincirlerin şubeleri ayrı kalsın).
+        rows = db.query(*_MEVCUT_KOLONLAR).filter(
+            Company.user_id == user_id,
+            Company.place_id.is_(None),
+            Company.firma_adi.in_({c['firma_adi'] for c in parca})
+        ).all()
+        ad_adres_ile = {(row.firma_adi, row.adres): row._mapping for row in rows}
+
+        # Eski kayda bağlanacak place_id başka bir kayıtta varsa o kayıt günceldir
+        kullanilan = set()
+        eslesen_place_ids = {
+            c['place_id'] for c in parca
+            if c.get('place_id') and (c['firma_adi'], c.get('adres', '')) in ad_adres_ile
+        }
+        if eslesen_place_ids:
+            kullanilan = set(db.execute(
+                select(Company.place_id).where(
+                    Company.user_id == user_id,
+                    Company.place_id.in_(eslesen_place_ids)
+                )
+            ).scalars())
+
+        yazilacak = []
+        guncellenecek = []
+        for company_data in parca:
+            degerler = {
+                key: value for key, value in company_data.items()
+                if key in _YAZILABILIR_KOLONLAR
+            }
+            if degerler.get('lat') is not None and degerler.get('lng') is not None:
+                degerler['geo_hucre'] = geo_hucre(degerler['lat'], degerler['lng'])
+
+            mevcut = None
+            if company_data.get('place_id') not in kullanilan:
+                mevcut = ad_adres_ile.pop((company_data['firma_adi'], company_data.get('adres', '')), None)
+
+            if mevcut is not None:
+                # Eski kaydı güncelle (boş gelen alanlar mevcut değeri ezmez)
+                guncel = {key: value for key, value in degerler.items() if value is not None}
+                # Temel profille gelen firma, kayıttaki iletişim bilgisinin durumunu değiştirmez
+                if guncel.get('iletisim_eksik'):
+                    del guncel['iletisim_eksik']
+                if kategori:
+                    guncel['kategori'] = kategori
+                # Arama metni sadece değiştiyse yazılır (FTS index'i gereksiz yere güncellenmez)
+                arama_metni = arama_metni_olustur({**mevcut, **guncel})
+                if arama_metni != mevcut['arama_metni']:
+                    guncel['arama_metni'] = arama_metni
+                guncel['id'] = mevcut['id']
+                guncellenecek.append(guncel)
+            else:
+                # Ekle veya (user_id, place_id) çakışırsa güncelle.
+                # executemany için tüm satırlar aynı kolonları taşır.
+                satir = {kolon: degerler.get(kolon) for kolon in _UPSERT_KOLONLARI}
+                satir.update(
+                    user_id=user_id,
+                    kategori=kategori,
+                    asama=satir['asama'] or _VARSAYILAN_ASAMA,
+                    iletisim_eksik=bool(satir['iletisim_eksik']),
+                    created_at=kayit_zamani,
+                )
+                satir['arama_metni'] = arama_metni_olustur(satir)
+                yazilacak.append(satir)
+
+        if yazilacak:
+            for row in db.execute(upsert, yazilacak).all():
+                if row.created_at == kayit_zamani:
+                    eklenen += 1
+                    continue
+                # Güncellenen firmanın arama metni birleşmiş değerlerden hesaplanır;
+                # sadece değiştiyse yazılır (FTS index'i gereksiz yere güncellenmez)
+                arama_metni = arama_metni_olustur(row._mapping)
+                if arama_metni != row.arama_metni:
+                    guncellenecek.append({'id': row.id, 'arama_metni': arama_metni})
+        if guncellenecek:
+            db.execute(update(Company), guncellenecek)
+
+    StatsService.firma_eklendi(db, user_id, eklenen)
+    if commit:
+        db.commit()
+
+
+def eksik_iletisimleri_tamamla(db: Session, user_id: int, company_ids: Iterable[int], google_maps) -> int:
+    """
+    Temel profille kaydedilmiş firmaların telefon/web bilgisini tamamla
+
+    Sadece iletişim alanları (Contact Data) istenir. Firma açıldığında veya
+    dışa aktarılırken çağrılır; iletişimi zaten olan firmalar için API'ye
+    gidilmez.
+
+    Args:
+        google_maps: GoogleMapsService
+
+    Returns:
+        Güncellenen firma sayısı
+    """
+    company_ids = list(company_ids)
+    guncellenen = 0
+    for parca in _parcala(company_ids, UPSERT_BATCH_SIZE):
+        rows = db.query(Company.id, Company.place_id).filter(
+            Company.user_id == user_id,
+            Company.id.in_(parca),
+            Company.iletisim_eksik.is_(True),
+            Company.place_id.isnot(None)
+        ).all()
+        if not rows:
+            continue
+
+        bilgiler = google_maps.iletisim_bilgileri([row.place_id for row in rows])
+        guncellenecek = [
+            {'id': row.id, **bilgiler[row.place_id], 'iletisim_eksik': False}
+            for row in rows if row.place_id in bilgiler
+        ]
+        if guncellenecek:
+            db.execute(update(Company), guncellenecek)
+            db.commit()
+            guncellenen += len(guncellenecek)
+    return guncellenen
+
+
+def filtredeki_eksik_iletisimleri_tamamla(db: Session, user_id: int, filtre: CompanyFilter, google_maps,
+                                          limit: int = config.ILETISIM_TAMAMLAMA_MAX) -> int:
+    """
+    Dışa aktarılacak firmalardan iletişimi eksik olanları tamamla
+
+    En yeni limit kadar firma tamamlanır (büyük export'lar API bütçesini
+    tüketmesin); kalanlar boş telefon/web ile aktarılır.
+
+    Returns:
+        Güncellenen firma sayısı
+    """
+    company_ids = db.execute(
+        company_filter_service.sorgu(user_id, filtre, Company.id)
+        .where(Company.iletisim_eksik.is_(True))
+        .order_by(Company.created_at.desc())
+        .limit(limit)
+    ).scalars().all()
+    if not company_ids:
+        return 0
+    return eksik_iletisimleri_tamamla(db, user_id, company_ids, google_maps)
+
+
+def iletisimleri_tamamla(db: Session, user_id: int, filtre: CompanyFilter):
+    """Export'tan önce iletişimi eksik firmaları tamamla (Excel ve CSV/Parquet export'ları kullanır)"""
+    try:
+        filtredeki_eksik_iletisimleri_tamamla(db, user_id, filtre, GoogleMapsService())
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=502, detail=f"İletişim bilgileri alınamadı: {str(e)}")
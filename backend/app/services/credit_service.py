@@ -1,11 +1,24 @@
 """
 Kredi/Bakiye yönetim servisi
 """
+from typing import Dict, Optional
+from sqlalchemy import case, insert, select, update
 from sqlalchemy.orm import Session
 from app.models.database import User, Transaction, Query
-from datetime import datetime
+from app.services.stats_service import StatsService
+from app.utils.auth import kullanici_cache_commitde_temizle, kullanici_cache_temizle
+from datetime import datetime, timedelta
+import json
+import logging
 import app.config as config
 
+logger = logging.getLogger(__name__)
+
+# Transaction.hold_durumu değerleri
+HOLD_BEKLIYOR = 'bekliyor'
+HOLD_KESINLESTI = 'kesinlesti'
+HOLD_IADE_EDILDI = 'iade_edildi'
+
 
 class CreditService:
     @staticmethod
@@ -15,28 +28,34 @@ class CreditService:
         return user.balance if user else 0
     
     @staticmethod
-    def deduct_credit(db: Session, user_id: int, amount: int, description: str) -> bool:
+    def deduct_credit(db: Session, user_id: int, amount: int, description: str,
+                      commit: bool = True) -> bool:
         """
         Kredi düşür
         
+        Bakiye kontrolü ve düşüm tek bir koşullu UPDATE'tir; eşzamanlı
+        düşümler birbirinin değişikliğini ezmez ve bakiye eksiye inmez.
+        İşlem kaydı aynı kısa transaction içinde yazılır.
+        
         Args:
             db: Database session
             user_id: Kullanıcı ID
             amount: Düşürülecek miktar (pozitif sayı)
             description: İşlem açıklaması
+            commit: False ise düşüm çağıranın transaction'ında kalır; çağıran
+                başarıda commit, başarısızlıkta rollback eder
         
         Returns:
-            Başarılı ise True
+            Başarılı ise True (kullanıcı yoksa veya bakiye yetersizse False)
         """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return False
-        
-        if user.balance < amount:
-            return False  # Yetersiz bakiye
-        
-        # Bakiyeyi düşür
-        user.balance -= amount
+        result = db.execute(
+            update(User)
+            .where(User.id == user_id, User.balance >= amount)
+            .values(balance=User.balance - amount)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return False  # Kullanıcı yok veya yetersiz bakiye
         
         # İşlem kaydı oluştur
         transaction = Transaction(
@@ -45,7 +64,10 @@ class CreditService:
             description=description
         )
         db.add(transaction)
-        db.commit()
+        # UPDATE ORM dışında yapıldığı için önbellekteki kullanıcı commit'te elle silinir
+        kullanici_cache_commitde_temizle(db, user_id)
+        if commit:
+            db.commit()
         
         return True
     
@@ -63,13 +85,16 @@ class CreditService:
         Returns:
             Başarılı ise True
         """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        # Bakiyeyi artır (eşzamanlı düşümlerle çakışmaması için veritabanında)
+        result = db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(balance=User.balance + amount)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
             return False
         
-        # Bakiyeyi artır
-        user.balance += amount
-        
         # İşlem kaydı oluştur
         transaction = Transaction(
             user_id=user_id,
@@ -78,9 +103,154 @@ class CreditService:
         )
         db.add(transaction)
         db.commit()
+        kullanici_cache_temizle(user_id)
+        
+        return True
+    
+    @staticmethod
+    def search_hold_amount(limit: int, tum_sehirler: bool) -> int:
+        """Bir aramanın alabileceği en yüksek ücret (rezerve edilen miktar)"""
+        sehir_sayisi = len(config.TURKIYE_SEHIRLERI) if tum_sehirler else 1
+        return limit * sehir_sayisi * config.SORGU_BASINA_KREDI
+    
+    @staticmethod
+    def hold_credit(db: Session, user_id: int, amount: int, description: str) -> Optional[int]:
+        """
+        Kredi rezerve et (aramadan önce)
+        
+        Bakiye deduct_credit'teki gibi tek koşullu UPDATE ile düşülür ve
+        süresi CREDIT_HOLD_TTL olan bekleyen bir işlem kaydı yazılır. Aynı
+        bakiyeyle birden fazla arama başlatılamaz. Süresi dolan
+        rezervasyonlar istek sırasında değil, arka planda
+        (sweep_expired_holds) iade edilir.
+        
+        Returns:
+            Rezervasyon ID'si (settle_hold / release_hold için), yetersiz bakiyede None
+        """
+        result = db.execute(
+            update(User)
+            .where(User.id == user_id, User.balance >= amount)
+            .values(balance=User.balance - amount)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            return None
+        
+        hold_id = db.execute(insert(Transaction).values(
+            user_id=user_id,
+            amount=-amount,
+            description=description,
+            expires_at=datetime.utcnow() + timedelta(seconds=config.CREDIT_HOLD_TTL),
+            hold_durumu=HOLD_BEKLIYOR
+        )).inserted_primary_key[0]
+        db.commit()
+        kullanici_cache_temizle(user_id)
+        return hold_id
+    
+    @staticmethod
+    def settle_hold(db: Session, user_id: int, hold_id: int, amount: int, description: str) -> bool:
+        """
+        Rezervasyonu kesinleştir: teslim edilen sonuç kadar kredi al, kalanı iade et
         
+        Sadece bekleyen rezervasyonu kapatan tek bir koşullu UPDATE'tir;
+        kullanılmayan kısım aynı UPDATE'te veritabanı trigger'ıyla bakiyeye
+        döner (bkz. migrations.create_hold_trigger). Rezervasyon kaydı
+        kesinleşmiş işleme dönüşür (yeni kayıt yazılmaz) ve rezerve
+        edilenden fazlası alınmaz. Zaten kesinleşmişse tekrar ücret
+        alınmaz; süresi dolup iade edilmişse ücret deduct_credit'in koşullu
+        UPDATE'iyle alınır.
+        
+        Commit etmez: kesinleştirme (veya düşüm) çağıranın bekleyen
+        değişiklikleriyle aynı transaction'dadır. Çağıran başarıda commit,
+        başarısızlıkta rollback eder.
+        
+        Returns:
+            Başarılı ise True (iade edilmiş rezervasyonda bakiye yetersizse False)
+        """
+        result = db.execute(
+            update(Transaction)
+            .where(Transaction.id == hold_id, Transaction.user_id == user_id,
+                   Transaction.hold_durumu == HOLD_BEKLIYOR)
+            .values(
+                amount=case((Transaction.amount > -amount, Transaction.amount), else_=-amount),
+                description=description,
+                expires_at=None,
+                hold_durumu=HOLD_KESINLESTI
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            durum = db.execute(
+                select(Transaction.hold_durumu)
+                .where(Transaction.id == hold_id, Transaction.user_id == user_id)
+            ).scalar()
+            if durum == HOLD_KESINLESTI:
+                return True  # Daha önce kesinleşmiş (ör. yeniden çalışan iş)
+            # Bulunamadı veya iade edilmiş
+            return CreditService.deduct_credit(db, user_id, amount, description, commit=False)
+        
+        kullanici_cache_commitde_temizle(db, user_id)
         return True
     
+    @staticmethod
+    def release_hold(db: Session, user_id: int, hold_id: int) -> bool:
+        """
+        Rezervasyonu iptal et ve kredinin tamamını iade et (arama başarısız olduğunda)
+        
+        settle_hold gibi tek koşullu UPDATE'tir; eşzamanlı settle/sweep ile
+        çift iade olmaz. Kayıt silinmez, tutarı sıfırlanır (SQLite silinen
+        son ID'yi yeniden kullanabilir; bekleyen bir rezervasyonun ID'si
+        başka kayda geçmemeli).
+        
+        Returns:
+            İade edildiyse True (rezervasyon bekliyor değilse False)
+        """
+        result = db.execute(
+            update(Transaction)
+            .where(Transaction.id == hold_id, Transaction.user_id == user_id,
+                   Transaction.hold_durumu == HOLD_BEKLIYOR)
+            .values(amount=0, expires_at=None, hold_durumu=HOLD_IADE_EDILDI,
+                    description=Transaction.description + ' - iade edildi')
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            return False
+        
+        db.commit()
+        kullanici_cache_temizle(user_id)
+        return True
+    
+    @staticmethod
+    def sweep_expired_holds(db: Session, simdi: Optional[datetime] = None) -> int:
+        """
+        Süresi dolan rezervasyonları toplu olarak iade et
+        
+        Tek UPDATE'tir; bakiyeler trigger ile aynı statement içinde iade
+        edilir. Açılışta ve arka planda CREDIT_HOLD_SWEEP_INTERVAL
+        aralıklarla çalışır.
+        
+        Returns:
+            İade edilen rezervasyon sayısı
+        """
+        simdi = simdi or datetime.utcnow()
+        user_ids = db.execute(
+            update(Transaction)
+            .where(Transaction.expires_at < simdi, Transaction.hold_durumu == HOLD_BEKLIYOR)
+            .values(amount=0, expires_at=None, hold_durumu=HOLD_IADE_EDILDI,
+                    description=Transaction.description + ' - süresi doldu, iade edildi')
+            .returning(Transaction.user_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        if not user_ids:
+            return 0
+        
+        for user_id in set(user_ids):
+            kullanici_cache_temizle(user_id)
+        logger.info(f"{len(user_ids)} süresi dolan kredi rezervasyonu iade edildi")
+        return len(user_ids)
+    
     @staticmethod
     def get_transactions(db: Session, user_id: int, limit: int = 50):
         """Kullanıcının işlem geçmişini getir"""
@@ -91,17 +261,25 @@ class CreditService:
     
     @staticmethod
     def save_query(db: Session, user_id: int, sehir: str, kategori: str, 
-                   ulke: str, limit: int, result_count: int):
-        """Sorgu geçmişini kaydet"""
+                   ulke: str, limit: int, result_count: int,
+                   api_kullanimi: Optional[Dict] = None, commit: bool = True):
+        """
+        Sorgu geçmişini kaydet (api_kullanimi: aramanın Google API çağrı sayaçları)
+        
+        commit=False ise kayıt çağıranın transaction'ında kalır (ör. kredi düşümüyle birlikte commit edilir).
+        """
         query = Query(
             user_id=user_id,
             sehir=sehir,
             kategori=kategori,
             ulke=ulke,
             limit=limit,
-            result_count=result_count
+            result_count=result_count,
+            api_kullanimi=json.dumps(api_kullanimi) if api_kullanimi is not None else None
         )
         db.add(query)
-        db.commit()
+        StatsService.sorgu_eklendi(db, user_id)
+        if commit:
+            db.commit()
         return query
 
@@ -2,18 +2,133 @@
 Google Maps API service
 """
 import googlemaps
-from typing import List, Dict
+import itertools
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 import time
 import app.config as config
+from app.utils.rate_limiter import TokenBucket
+from app.utils.text import sorgu_normalize
+from app.services.cache_service import (
+    LRUCache, PlaceDetailsCache, TextSearchCache, place_details_cache, text_search_cache
+)
+
+# Place Details alanları, Google'ın faturalandırma katmanlarına göre
+# (Basic Data / Contact Data / Atmosphere Data). Her katman ayrı ücretlenir.
+ALAN_KATMANLARI = {
+    'temel': ['name', 'formatted_address', 'geometry', 'address_component',
+              'business_status', 'url', 'plus_code', 'type'],
+    'iletisim': ['formatted_phone_number', 'international_phone_number', 'website'],
+    'atmosfer': ['rating', 'user_ratings_total', 'price_level'],
+}
+
+# Arama profilleri: profil -> Place Details'te istenen alanlar
+DETAY_PROFILLERI = {
+    'temel': ALAN_KATMANLARI['temel'],
+    'iletisim': ALAN_KATMANLARI['temel'] + ALAN_KATMANLARI['iletisim'],
+    'tam': ALAN_KATMANLARI['temel'] + ALAN_KATMANLARI['iletisim'] + ALAN_KATMANLARI['atmosfer'],
+}
+
+# Varsayılan (tüm alanlar)
+DETAY_ALANLARI = DETAY_PROFILLERI['tam']
+
+# Firma alanı -> kaynağı olan Place Details alanı (alan istenmediyse firma alanı None kalır)
+_ALAN_KAYNAKLARI = {
+    'telefon': 'formatted_phone_number',
+    'international_phone_number': 'international_phone_number',
+    'web': 'website',
+    'rating': 'rating',
+    'user_ratings_total': 'user_ratings_total',
+    'price_level': 'price_level',
+}
+
+
+def detay_alanlari(profil: str, telefon_filtre: bool = False) -> List[str]:
+    """
+    Profil için istenecek en küçük alan listesi
+
+    Telefon filtresi telefon alanı olmadan uygulanamadığı için temel profil
+    iletişim profiline yükseltilir.
+    """
+    if profil not in DETAY_PROFILLERI:
+        raise ValueError(f"Bilinmeyen profil: {profil}")
+    if telefon_filtre and profil == 'temel':
+        profil = 'iletisim'
+    return DETAY_PROFILLERI[profil]
+
+# Aynı API anahtarını kullanan tüm servisler tek bir bütçeyi paylaşır
+_api_limiter = TokenBucket(config.GOOGLE_MAPS_QPS)
+
+# Şehir sınır kutuları nadiren değişir; geocode sonucu bellekte tutulur
+_sehir_kutulari = LRUCache(1000, 60 * 60 * 24 * 30)
 
 
 class GoogleMapsService:
-    def __init__(self, api_key: str = config.GOOGLE_MAPS_API_KEY):
-        """Google Maps API client'ını başlat"""
-        self.client = googlemaps.Client(key=api_key)
+    # next_page_token'ın geçerli hale gelmesi için beklenen süre (Google API gereksinimi)
+    SAYFA_BEKLEME = 2.0
+    # Google'ın tek bir Text Search sorgusu için döndürdüğü en fazla sonuç
+    TEXT_SEARCH_SINIRI = 60
+
+    def __init__(self, api_key: str = config.GOOGLE_MAPS_API_KEY,
+                 client: Optional[googlemaps.Client] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 detay_eszamanlilik: int = config.PLACE_DETAILS_CONCURRENCY,
+                 detay_cache: Optional[PlaceDetailsCache] = None,
+                 text_cache: Optional[TextSearchCache] = None,
+                 nabiz: Optional[Callable[[], None]] = None):
+        """
+        Google Maps API client'ını başlat
+
+        Args:
+            api_key: Google Maps API anahtarı
+            client: Hazır client (verilmezse api_key ile oluşturulur)
+            rate_limiter: API çağrıları için hız sınırlayıcı (varsayılan: paylaşılan bütçe)
+            detay_eszamanlilik: Aynı anda yapılabilecek Place Details çağrısı
+            detay_cache: Place Details önbelleği (varsayılan: paylaşılan önbellek)
+            text_cache: Text Search önbelleği (varsayılan: paylaşılan önbellek)
+            nabiz: Her API çağrısında (sayfa, ızgara hücresi, detay) çağrılan
+                fonksiyon; arka plan işleri canlı olduklarını bununla bildirir
+        """
+        self.client = client if client is not None else googlemaps.Client(key=api_key)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else _api_limiter
+        self.detay_eszamanlilik = max(1, detay_eszamanlilik)
+        self.detay_cache = detay_cache if detay_cache is not None else place_details_cache
+        self.text_cache = text_cache if text_cache is not None else text_search_cache
+        self.nabiz = nabiz
+        self._sayac_lock = threading.Lock()
+        self.sayaclar = {'text_search': 0, 'geocode': 0, 'place_details': 0}
+        # Place Details çağrılarında istenen alanlar ve ücretlenen katmanlar (çağrı sayısı)
+        self.alan_sayaclari: Dict[str, int] = {}
+        self.katman_sayaclari = {katman: 0 for katman in ALAN_KATMANLARI}
+    
+    def _cagri_say(self, tip: str, alanlar: Optional[List[str]] = None):
+        """API çağrısını ve istenen alanları say, varsa nabız fonksiyonunu çağır"""
+        with self._sayac_lock:
+            self.sayaclar[tip] += 1
+            for alan in alanlar or ():
+                self.alan_sayaclari[alan] = self.alan_sayaclari.get(alan, 0) + 1
+            if alanlar:
+                for katman, katman_alanlari in ALAN_KATMANLARI.items():
+                    if any(alan in alanlar for alan in katman_alanlari):
+                        self.katman_sayaclari[katman] += 1
+        if self.nabiz is not None:
+            self.nabiz()
+    
+    def kullanim_ozeti(self) -> Dict:
+        """Bu servis örneğinin yaptığı API çağrılarının özeti (arama maliyeti için)"""
+        with self._sayac_lock:
+            return {
+                **self.sayaclar,
+                'place_details_katmanlari': dict(self.katman_sayaclari),
+                'place_details_alanlari': dict(self.alan_sayaclari),
+            }
     
     def isletme_ara(self, sehir: str, ulke: str, kategori: str, 
-                    limit: int = 20, telefon_filtre: bool = False) -> List[Dict]:
+                    limit: int = 20, telefon_filtre: bool = False,
+                    profil: str = 'tam') -> List[Dict]:
         """
         Google Maps'te işletme ara
         
@@ -22,108 +137,430 @@ class GoogleMapsService:
             ulke: Ülke adı
             kategori: İşletme kategorisi/anahtar kelime
             limit: Maksimum sonuç sayısı
-            telefon_filtre: Sadece telefonu olanları getir
+            telefon_filtre: Sadece telefonu olanları getir (limit kadar telefonlu
+                firma bulunana veya sonuçlar bitene kadar aranır)
+            profil: Place Details profili ('temel', 'iletisim', 'tam'); istenmeyen
+                alanlar None döner
         
         Returns:
             İşletme bilgileri listesi
         """
-        sonuclar = []
-        query = f"{kategori} {sehir} {ulke}"
+        query = self._sorgu_olustur(kategori, sehir, ulke)
+        alanlar = detay_alanlari(profil, telefon_filtre)
         
         try:
-            # Text Search kullanarak arama yap (pagination ile)
-            all_results = []
-            next_page_token = None
+            # Tek sorgu ~60 sonuçta durur; daha fazlası için şehir alanı hücrelere bölünür
+            place_ids = None
+            if limit > self.TEXT_SEARCH_SINIRI:
+                place_ids = self._izgarada_place_idleri_topla(query, sehir, ulke, limit)
             
-            while len(all_results) < limit:
-                if next_page_token:
-                    # Sonraki sayfa için bekle (Google API gereksinimi)
-                    time.sleep(2)
-                    places_result = self.client.places(
-                        query=query, 
-                        language='tr',
-                        page_token=next_page_token
-                    )
-                else:
-                    places_result = self.client.places(query=query, language='tr')
-                
-                results = places_result.get('results', [])
-                all_results.extend(results)
-                
-                # Sonraki sayfa var mı kontrol et
-                next_page_token = places_result.get('next_page_token')
-                if not next_page_token or len(results) == 0:
-                    break
-                
-                # Limit'e ulaştık mı kontrol et
-                if len(all_results) >= limit:
-                    break
+            if telefon_filtre:
+                # Telefonlu firmalar akış halinde toplanır; limit dolunca API çağrıları durur
+                sayfalar = iter([place_ids]) if place_ids is not None else self._text_search_sayfalari(query)
+                return self._telefonlu_firmalari_topla(sayfalar, sehir, ulke, limit, alanlar)
             
-            # Limit kadar sonuç al
-            for place in all_results[:limit]:
-                place_id = place.get('place_id')
-                
-                if not place_id:
-                    continue
-                
-                # Detaylı bilgileri al
-                place_details = self.client.place(
-                    place_id=place_id,
-                    language='tr',
-                    fields=['name', 'formatted_address', 'formatted_phone_number', 
-                           'website', 'geometry', 'address_component', 'rating',
-                           'user_ratings_total', 'price_level', 'business_status',
-                           'international_phone_number', 'url', 'plus_code', 'type']
-                )
-                
-                details = place_details.get('result', {})
-                
-                if not details:
-                    continue
-                
-                # Şehir ve ilçe bilgisini address_component'ten çıkar
-                sehir_bilgisi = self._sehir_cikar(details.get('address_components', []), sehir)
-                ilce_bilgisi = self._ilce_cikar(details.get('address_components', []))
-                
-                # Type ve Types bilgilerini al
-                type_str = details.get('type', '') or ''
-                types_list = details.get('types', [])
-                types_str = ', '.join(types_list[:10]) if types_list else ''
-                
-                firma_bilgisi = {
-                    'firma_adi': details.get('name', ''),
-                    'adres': details.get('formatted_address', ''),
-                    'telefon': details.get('formatted_phone_number', '') or '',
-                    'web': details.get('website', '') or '',
-                    'sehir': sehir_bilgisi,
-                    'ilce': ilce_bilgisi,
-                    'ulke': ulke,
-                    'rating': details.get('rating'),
-                    'user_ratings_total': details.get('user_ratings_total'),
-                    'price_level': details.get('price_level'),
-                    'business_status': details.get('business_status', ''),
-                    'international_phone_number': details.get('international_phone_number', '') or '',
-                    'url': details.get('url', '') or '',
-                    'plus_code': details.get('plus_code', {}).get('global_code', '') if details.get('plus_code') else '',
-                    'type': type_str,
-                    'types': types_str
-                }
-                
-                # Telefon filtresi varsa kontrol et
-                if telefon_filtre and not firma_bilgisi['telefon']:
-                    continue
-                
-                sonuclar.append(firma_bilgisi)
-                
-                # Rate limit için kısa bekleme
-                time.sleep(0.1)
+            # Text Search ile place_id'leri topla (pagination ile)
+            if place_ids is None:
+                place_ids = self._place_idleri_topla(query, limit)
+            
+            # Detaylı bilgileri eşzamanlı al (sonuç sırası Text Search sırasıyla aynı kalır)
+            detaylar = self._detaylari_getir(place_ids, alanlar)
         
         except Exception as e:
             print(f"Google Maps API hatası: {e}")
             raise
         
+        return self._firmalari_olustur(place_ids, detaylar, sehir, ulke, telefon_filtre, alanlar)
+    
+    def _sorgu_olustur(self, kategori: str, sehir: str, ulke: str) -> str:
+        """Text Search sorgu metnini oluştur"""
+        return f"{kategori} {sehir} {ulke}"
+    
+    def _text_search_sonuclari(self, query: str, page_token: Optional[str] = None,
+                               konum: Optional[Tuple[float, float]] = None,
+                               yaricap: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Tek bir Text Search sayfasının ham sonuçlarını getir
+        
+        Args:
+            konum: Sonuçların yanlı olacağı merkez (lat, lng)
+            yaricap: konum etrafındaki yanlılık yarıçapı (metre)
+        
+        Returns:
+            (place_id'si olan sonuçlar, sonraki sayfa token'ı veya None)
+        """
+        self.rate_limiter.acquire()
+        self._cagri_say('text_search')
+        if page_token:
+            places_result = self.client.places(query=query, language='tr', page_token=page_token)
+        elif konum is not None:
+            places_result = self.client.places(query=query, language='tr', location=konum, radius=yaricap)
+        else:
+            places_result = self.client.places(query=query, language='tr')
+        
+        results = places_result.get('results', [])
+        
+        # Boş sayfadan sonra devam etmenin anlamı yok
+        next_page_token = places_result.get('next_page_token') if results else None
+        return [place for place in results if place.get('place_id')], next_page_token
+    
+    def _text_search_sayfasi(self, query: str,
+                             page_token: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        Tek bir Text Search sayfası getir
+        
+        Returns:
+            (sayfadaki place_id'ler, sonraki sayfa token'ı veya None)
+        """
+        results, next_page_token = self._text_search_sonuclari(query, page_token)
+        return [place['place_id'] for place in results], next_page_token
+    
+    def _cachedeki_place_idler(self, query: str, limit: int) -> Optional[List[str]]:
+        """Önbellekteki Text Search sonucu limiti karşılıyorsa döndür"""
+        kayit = self.text_cache.get(query, 'tr')
+        if kayit is None:
+            return None
+        
+        place_ids, tamamlandi = kayit
+        if tamamlandi or len(place_ids) >= limit:
+            return place_ids[:limit]
+        
+        # Önbellekte daha az sayfa var; sayfa token'ları saklanamadığı için baştan aranır
+        return None
+    
+    def _place_idleri_topla(self, query: str, limit: int) -> List[str]:
+        """Text Search sayfalarını limit dolana veya sayfalar bitene kadar gez"""
+        place_ids = self._cachedeki_place_idler(query, limit)
+        if place_ids is not None:
+            return place_ids
+        
+        place_ids = []
+        next_page_token = None
+        
+        while True:
+            if next_page_token:
+                # Sonraki sayfa için bekle (Google API gereksinimi)
+                time.sleep(self.SAYFA_BEKLEME)
+            
+            sayfa, next_page_token = self._text_search_sayfasi(query, next_page_token)
+            place_ids.extend(sayfa)
+            
+            if not next_page_token or len(place_ids) >= limit:
+                break
+        
+        self.text_cache.set(query, 'tr', place_ids, tamamlandi=next_page_token is None)
+        return place_ids[:limit]
+    
+    def _text_search_sayfalari(self, query: str) -> Iterator[List[str]]:
+        """
+        Text Search sonuçlarını sayfa sayfa, ihtiyaç oldukça üret
+        
+        Önbellekteki kısım ilk parça olarak gelir; devamı gerekirse sayfalar
+        baştan gezilir ve daha önce dönen place_id'ler atlanır. Üretici
+        kapatıldığında (veya sayfalar bittiğinde) toplanan liste önbelleğe yazılır.
+        """
+        toplanan: List[str] = []
+        kayit = self.text_cache.get(query, 'tr')
+        if kayit is not None:
+            toplanan, tamamlandi = list(kayit[0]), kayit[1]
+            if toplanan:
+                yield list(toplanan)
+            if tamamlandi:
+                return
+        
+        gorulen = set(toplanan)
+        next_page_token = None
+        sayfa_alindi = False
+        bitti = False
+        try:
+            while True:
+                if next_page_token:
+                    # Sonraki sayfa için bekle (Google API gereksinimi)
+                    time.sleep(self.SAYFA_BEKLEME)
+                
+                sayfa, next_page_token = self._text_search_sayfasi(query, next_page_token)
+                sayfa_alindi = True
+                yeni = [place_id for place_id in dict.fromkeys(sayfa) if place_id not in gorulen]
+                gorulen.update(yeni)
+                toplanan.extend(yeni)
+                
+                if not next_page_token:
+                    bitti = True
+                if yeni:
+                    yield yeni
+                if bitti:
+                    return
+        finally:
+            if sayfa_alindi:
+                self.text_cache.set(query, 'tr', toplanan, tamamlandi=bitti)
+    
+    def _telefonlu_firmalari_topla(self, sayfalar: Iterator[List[str]], sehir: str, ulke: str,
+                                   limit: int, alanlar: List[str]) -> List[Dict]:
+        """
+        Telefonu olan limit kadar firmayı akış halinde topla
+        
+        Text Search sayfaları detay aşamasını, detaylar telefon filtresini
+        besler. Önbellekteki detaylar hemen işlenir. Aynı anda yapılan detay
+        çağrısı, o ana kadar görülen telefon oranına göre limiti doldurmaya
+        yetecek kadarla sınırlanır. Yeni sayfa da ancak bekleyen firmalar
+        yetmeyecekse çekilir. Limit dolunca başlamamış çağrılar iptal edilir.
+        O sırada sürmekte olan çağrıların sonuçları sadece önbelleğe yazılır.
+        
+        Returns:
+            Text Search sırasıyla en fazla limit firma
+        """
+        bulunan: Dict[int, Dict] = {}  # Text Search sırası -> firma
+        kuyruk = deque()  # (sıra, place_id) - detayı henüz istenmemiş
+        sira = itertools.count()
+        tamamlanan = 0
+        sayfa_bitti = False
+        
+        def isle(i: int, place_id: str, details: Dict):
+            nonlocal tamamlanan
+            tamamlanan += 1
+            if not details:
+                return
+            firma_bilgisi = self._firma_bilgisi_olustur(place_id, details, sehir, ulke, alanlar)
+            if firma_bilgisi['telefon']:
+                bulunan[i] = firma_bilgisi
+        
+        with ThreadPoolExecutor(max_workers=self.detay_eszamanlilik) as executor:
+            calisan = {}
+            try:
+                while len(bulunan) < limit:
+                    # Telefon oranı tahmini (başta 1: ilk çağrılar limitten fazla olmasın)
+                    oran = (len(bulunan) + 1) / (tamamlanan + 1)
+                    gereken = limit - len(bulunan)
+                    
+                    # Bekleyenlerin beklenen katkısı limite yetmiyorsa sonraki sayfayı al
+                    if not sayfa_bitti and (len(calisan) + len(kuyruk)) * oran < gereken:
+                        sayfa = next(sayfalar, None)
+                        if sayfa is None:
+                            sayfa_bitti = True
+                            continue
+                        sayfa = [(next(sira), place_id) for place_id in sayfa]
+                        onbellekte = self.detay_cache.get_many([p for _, p in sayfa], 'tr', alanlar)
+                        for i, place_id in sayfa:
+                            if place_id in onbellekte:
+                                isle(i, place_id, onbellekte[place_id])
+                            else:
+                                kuyruk.append((i, place_id))
+                        continue
+                    
+                    pencere = min(self.detay_eszamanlilik, math.ceil(gereken / oran))
+                    while kuyruk and len(calisan) < pencere:
+                        i, place_id = kuyruk.popleft()
+                        calisan[executor.submit(self._detay_api, place_id, alanlar)] = (i, place_id)
+                    
+                    if not calisan:
+                        if sayfa_bitti and not kuyruk:
+                            break
+                        continue
+                    
+                    bitenler, _ = wait(calisan, return_when=FIRST_COMPLETED)
+                    for future in bitenler:
+                        i, place_id = calisan.pop(future)
+                        details = future.result()
+                        self.detay_cache.set(place_id, 'tr', alanlar, details)
+                        isle(i, place_id, details)
+            finally:
+                for future in calisan:
+                    future.cancel()
+                # Üretici kapanınca toplanan Text Search sonuçları önbelleğe yazılır
+                if hasattr(sayfalar, 'close'):
+                    sayfalar.close()
+        
+        # Limit dolduktan sonra biten çağrılar da ücretlendi; sonuçlarını önbellekte tut
+        for future, (_, place_id) in calisan.items():
+            if not future.cancelled() and future.exception() is None:
+                self.detay_cache.set(place_id, 'tr', alanlar, future.result())
+        
+        return [bulunan[i] for i in sorted(bulunan)][:limit]
+    
+    def _sehir_kutusu(self, sehir: str, ulke: str) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Şehrin sınır kutusu (min_lat, min_lng, max_lat, max_lng)
+        
+        Geocoding sonucundaki bounds (yoksa viewport) kullanılır. Şehir
+        bulunamazsa None döner.
+        """
+        anahtar = sorgu_normalize(f"{sehir} {ulke}")
+        kutu = _sehir_kutulari.get(anahtar)
+        if kutu is not None:
+            return kutu
+        
+        self.rate_limiter.acquire()
+        self._cagri_say('geocode')
+        sonuclar = self.client.geocode(f"{sehir}, {ulke}", language='tr')
+        if not sonuclar:
+            return None
+        
+        geometri = sonuclar[0].get('geometry') or {}
+        sinir = geometri.get('bounds') or geometri.get('viewport')
+        if not sinir:
+            return None
+        
+        kutu = (sinir['southwest']['lat'], sinir['southwest']['lng'],
+                sinir['northeast']['lat'], sinir['northeast']['lng'])
+        _sehir_kutulari.set(anahtar, kutu)
+        return kutu
+    
+    def _izgarada_place_idleri_topla(self, query: str, sehir: str, ulke: str,
+                                     limit: int) -> Optional[List[str]]:
+        """
+        Şehir alanını hücrelere bölerek limit kadar tekil place_id topla
+        
+        Şehrin sınır kutusu bulunamazsa None döner (normal arama yapılır).
+        """
+        anahtar = f"{query} [ızgara]"
+        place_ids = self._cachedeki_place_idler(anahtar, limit)
+        if place_ids is not None:
+            return place_ids
+        
+        kutu = self._sehir_kutusu(sehir, ulke)
+        if kutu is None:
+            return None
+        
+        from app.services.grid_search_service import GridSearchService
+        
+        place_ids, tamamlandi = GridSearchService(self).ara(query, kutu, limit)
+        self.text_cache.set(anahtar, 'tr', place_ids, tamamlandi=tamamlandi)
+        return place_ids
+    
+    def _detay_api(self, place_id: str, alanlar: List[str] = DETAY_ALANLARI) -> Dict:
+        """Place Details API çağrısı (önbelleğe bakmadan)"""
+        self.rate_limiter.acquire()
+        self._cagri_say('place_details', alanlar)
+        place_details = self.client.place(
+            place_id=place_id,
+            language='tr',
+            fields=alanlar
+        )
+        return place_details.get('result', {})
+    
+    def _detay_getir(self, place_id: str, alanlar: List[str] = DETAY_ALANLARI) -> Dict:
+        """Tek bir işletmenin Place Details sonucunu getir (önbellekli)"""
+        details = self.detay_cache.get(place_id, 'tr', alanlar)
+        if details is None:
+            details = self._detay_api(place_id, alanlar)
+            self.detay_cache.set(place_id, 'tr', alanlar, details)
+        return details
+    
+    def _detaylari_getir(self, place_ids: List[str], alanlar: List[str] = DETAY_ALANLARI) -> List[Dict]:
+        """
+        Place Details sonuçlarını getir
+        
+        Önbellekte olanlar (istenen alanları kapsayan kayıtlar) tek sorguda
+        okunur, kalanlar sınırlı bir worker havuzunda paralel olarak API'den
+        alınır.
+        
+        Returns:
+            place_ids ile aynı sırada detay sözlükleri
+        """
+        if not place_ids:
+            return []
+        
+        detaylar = self.detay_cache.get_many(place_ids, 'tr', alanlar)
+        eksik = [place_id for place_id in dict.fromkeys(place_ids) if place_id not in detaylar]
+        
+        if len(eksik) <= 1 or self.detay_eszamanlilik == 1:
+            yeni = [self._detay_api(place_id, alanlar) for place_id in eksik]
+        else:
+            worker_sayisi = min(self.detay_eszamanlilik, len(eksik))
+            with ThreadPoolExecutor(max_workers=worker_sayisi) as executor:
+                # map() sonuçları girdi sırasıyla döndürür
+                yeni = list(executor.map(lambda place_id: self._detay_api(place_id, alanlar), eksik))
+        
+        yeni_detaylar = dict(zip(eksik, yeni))
+        self.detay_cache.set_many(yeni_detaylar, 'tr', alanlar)
+        detaylar.update(yeni_detaylar)
+        
+        return [detaylar[place_id] for place_id in place_ids]
+    
+    def iletisim_bilgileri(self, place_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Sadece iletişim alanlarını getir (temel profille kaydedilmiş firmaları tamamlamak için)
+        
+        Returns:
+            place_id -> telefon, international_phone_number ve web değerleri
+        """
+        alanlar = ALAN_KATMANLARI['iletisim']
+        place_ids = list(dict.fromkeys(place_ids))
+        sonuclar = {}
+        for place_id, details in zip(place_ids, self._detaylari_getir(place_ids, alanlar)):
+            if not details:
+                continue
+            sonuclar[place_id] = {
+                kolon: details.get(alan, '') or ''
+                for kolon, alan in _ALAN_KAYNAKLARI.items() if alan in alanlar
+            }
         return sonuclar
     
+    def _firmalari_olustur(self, place_ids: List[str], detaylar: List[Dict], sehir: str,
+                           ulke: str, telefon_filtre: bool,
+                           alanlar: List[str] = DETAY_ALANLARI) -> List[Dict]:
+        """Detay sonuçlarını firma listesine çevir ve telefon filtresini uygula"""
+        sonuclar = []
+        for place_id, details in zip(place_ids, detaylar):
+            if not details:
+                continue
+            
+            firma_bilgisi = self._firma_bilgisi_olustur(place_id, details, sehir, ulke, alanlar)
+            
+            # Telefon filtresi varsa kontrol et
+            if telefon_filtre and not firma_bilgisi['telefon']:
+                continue
+            
+            sonuclar.append(firma_bilgisi)
+        
+        return sonuclar
+    
+    def _firma_bilgisi_olustur(self, place_id: str, details: Dict, sehir: str, ulke: str,
+                               alanlar: List[str] = DETAY_ALANLARI) -> Dict:
+        """
+        Place Details sonucunu firma sözlüğüne çevir
+        
+        İstenmeyen alanlardan gelen değerler None olur (kayıtta mevcut değeri
+        ezmez); iletişim alanları istenmediyse iletisim_eksik True'dur.
+        """
+        # Şehir ve ilçe bilgisini address_component'ten çıkar
+        sehir_bilgisi = self._sehir_cikar(details.get('address_components', []), sehir)
+        ilce_bilgisi = self._ilce_cikar(details.get('address_components', []))
+        
+        # Type ve Types bilgilerini al
+        type_str = details.get('type', '') or ''
+        types_list = details.get('types', [])
+        types_str = ', '.join(types_list[:10]) if types_list else ''
+        
+        konum = (details.get('geometry') or {}).get('location') or {}
+        
+        firma_bilgisi = {
+            'place_id': place_id,
+            'firma_adi': details.get('name', ''),
+            'adres': details.get('formatted_address', ''),
+            'telefon': details.get('formatted_phone_number', '') or '',
+            'web': details.get('website', '') or '',
+            'sehir': sehir_bilgisi,
+            'ilce': ilce_bilgisi,
+            'ulke': ulke,
+            'rating': details.get('rating'),
+            'user_ratings_total': details.get('user_ratings_total'),
+            'price_level': details.get('price_level'),
+            'business_status': details.get('business_status', ''),
+            'international_phone_number': details.get('international_phone_number', '') or '',
+            'url': details.get('url', '') or '',
+            'plus_code': details.get('plus_code', {}).get('global_code', '') if details.get('plus_code') else '',
+            'type': type_str,
+            'types': types_str,
+            'lat': konum.get('lat'),
+            'lng': konum.get('lng'),
+            'iletisim_eksik': not set(ALAN_KATMANLARI['iletisim']) <= set(alanlar)
+        }
+        for kolon, alan in _ALAN_KAYNAKLARI.items():
+            if alan not in alanlar:
+                firma_bilgisi[kolon] = None
+        return firma_bilgisi
+    
     def _sehir_cikar(self, address_components: List[Dict], varsayilan_sehir: str) -> str:
         """Address components'ten şehir bilgisini çıkar"""
         for component in address_components:
@@ -143,34 +580,34 @@ class GoogleMapsService:
         return ''
     
     def tum_sehirlerde_ara(self, kategori: str, ulke: str, limit_per_sehir: int = 20,
-                           telefon_filtre: bool = False) -> List[Dict]:
+                           telefon_filtre: bool = False,
+                           ilerleme: Optional[Callable[[Dict], None]] = None,
+                           profil: str = 'tam') -> List[Dict]:
         """
         Türkiye'nin tüm şehirlerinde arama yap
         
+        Şehirler SweepService ile paralel ve ortak rate limit bütçesiyle taranır.
+        
         Args:
             kategori: İşletme kategorisi
             ulke: Ülke adı
             limit_per_sehir: Her şehir için maksimum sonuç
             telefon_filtre: Sadece telefonu olanları getir
+            ilerleme: Her şehir başladığında/bittiğinde çağrılacak fonksiyon
+            profil: Place Details profili (bkz. isletme_ara)
         
         Returns:
             Tüm şehirlerden toplanan işletme bilgileri
         """
-        tum_sonuclar = []
-        
-        for sehir in config.TURKIYE_SEHIRLERI:
-            print(f"{sehir} aranıyor...")
-            sonuclar = self.isletme_ara(
-                sehir=sehir,
-                ulke=ulke,
-                kategori=kategori,
-                limit=limit_per_sehir,
-                telefon_filtre=telefon_filtre
-            )
-            tum_sonuclar.extend(sonuclar)
-            
-            # Rate limit için bekleme
-            time.sleep(0.5)
+        from app.services.sweep_service import SweepService
         
-        return tum_sonuclar
-
+        sweep = SweepService(self)
+        return sweep.tara(
+            kategori=kategori,
+            ulke=ulke,
+            sehirler=config.TURKIYE_SEHIRLERI,
+            limit_per_sehir=limit_per_sehir,
+            telefon_filtre=telefon_filtre,
+            ilerleme=ilerleme,
+            alanlar=detay_alanlari(profil, telefon_filtre)
+        )
@@ -0,0 +1,174 @@
+"""
+Izgara (alan) arama servisi
+"""
+import heapq
+import itertools
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple
+import app.config as config
+from app.services.google_maps_service import GoogleMapsService
+from app.utils.geo import BOYLAM_KM, ENLEM_KM
+
+logger = logging.getLogger(__name__)
+
+# (min_lat, min_lng, max_lat, max_lng)
+Kutu = Tuple[float, float, float, float]
+
+# Text Search konum yanlılığında izin verilen en büyük yarıçap (metre)
+MAX_YARICAP_M = 50000
+
+
+class _Hucre:
+    """Izgaradaki tek bir hücrenin arama durumu"""
+
+    def __init__(self, kutu: Kutu, derinlik: int):
+        self.kutu = kutu
+        self.derinlik = derinlik
+        self.icerideki_sonuc = 0
+        self.next_page_token: Optional[str] = None
+
+    @property
+    def merkez(self) -> Tuple[float, float]:
+        min_lat, min_lng, max_lat, max_lng = self.kutu
+        return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+    @property
+    def yaricap_m(self) -> int:
+        """Hücreyi çevreleyen dairenin yarıçapı"""
+        min_lat, min_lng, max_lat, max_lng = self.kutu
+        dy = (max_lat - min_lat) * ENLEM_KM
+        dx = (max_lng - min_lng) * BOYLAM_KM * math.cos(math.radians(self.merkez[0]))
+        return min(MAX_YARICAP_M, max(1, int(math.hypot(dx, dy) / 2 * 1000)))
+
+    def icinde(self, sonuc: Dict) -> bool:
+        """Text Search sonucu hücrenin çevrel çemberi içinde mi (konumu yoksa içinde sayılır)"""
+        konum = (sonuc.get('geometry') or {}).get('location')
+        if not konum:
+            return True
+        lat, lng = self.merkez
+        dy = (konum['lat'] - lat) * ENLEM_KM
+        dx = (konum['lng'] - lng) * BOYLAM_KM * math.cos(math.radians(lat))
+        return math.hypot(dx, dy) * 1000 <= self.yaricap_m
+
+    def bol(self) -> List['_Hucre']:
+        """Hücreyi dört eşit alt hücreye böl"""
+        min_lat, min_lng, max_lat, max_lng = self.kutu
+        orta_lat, orta_lng = self.merkez
+        return [
+            _Hucre(kutu, self.derinlik + 1) for kutu in (
+                (min_lat, min_lng, orta_lat, orta_lng), (min_lat, orta_lng, orta_lat, max_lng),
+                (orta_lat, min_lng, max_lat, orta_lng), (orta_lat, orta_lng, max_lat, max_lng),
+            )
+        ]
+
+
+class GridSearchService:
+    """
+    Bir alanı hücrelere bölerek Text Search'ün sorgu başına ~60 sonuç sınırını aşar
+
+    Her hücre aynı sorguyla, hücrenin merkezi ve çevrel çemberi konum
+    yanlılığı (location/radius) olarak verilerek aranır. Yanlılık bir sınır
+    olmadığı için Google sonuçları çemberin dışından da tamamlar; bu yüzden
+    hücre, çember içindeki sonuçlar sınıra ulaştıysa dolmuş sayılır ve dört
+    alt hücreye bölünür. Dışarıdan sonuç gelmesi hücrenin tükendiğini
+    gösterir. place_id'ler hücreler arasında bulunma sırasıyla tekilleştirilir.
+
+    Sayfalar SweepService'teki gibi ortak worker havuzunda çalışır;
+    next_page_token beklemeleri worker tutmaz ve tüm çağrılar
+    GoogleMapsService'in rate limiter'ından geçer.
+    """
+
+    def __init__(self, google_maps: GoogleMapsService,
+                 eszamanlilik: int = config.GRID_SEARCH_CONCURRENCY,
+                 max_derinlik: int = config.GRID_SEARCH_MAX_DEPTH):
+        self.google_maps = google_maps
+        self.eszamanlilik = max(1, eszamanlilik)
+        self.max_derinlik = max(0, max_derinlik)
+
+    def baslangic_izgarasi(self, kutu: Kutu, limit: int) -> List[_Hucre]:
+        """Limiti karşılayabilecek kadar hücreden oluşan kare ızgara"""
+        kenar = max(1, math.ceil(math.sqrt(limit / self.google_maps.TEXT_SEARCH_SINIRI)))
+        min_lat, min_lng, max_lat, max_lng = kutu
+        dlat = (max_lat - min_lat) / kenar
+        dlng = (max_lng - min_lng) / kenar
+        return [
+            _Hucre((min_lat + i * dlat, min_lng + j * dlng,
+                    min_lat + (i + 1) * dlat, min_lng + (j + 1) * dlng), 0)
+            for i in range(kenar) for j in range(kenar)
+        ]
+
+    def ara(self, query: str, kutu: Kutu, limit: int) -> Tuple[List[str], bool]:
+        """
+        Alanı hücre hücre ara
+
+        Args:
+            query: Text Search sorgusu
+            kutu: Aranacak alan (min_lat, min_lng, max_lat, max_lng)
+            limit: Toplanacak en fazla place_id
+
+        Returns:
+            (tekil place_id'ler, alan sonuna kadar tarandı mı). Limit dolduğu
+            için durulduysa veya en derin seviyedeki bir hücre de dolduysa
+            ikinci değer False'tur.
+        """
+        sinir = self.google_maps.TEXT_SEARCH_SINIRI
+        bulunan: Dict[str, None] = {}
+        eksik = False
+
+        # (hazır olma zamanı, sıra, hücre) - bekleyen Text Search sayfaları
+        sayac = itertools.count()
+        zamanlanmis = [(0.0, next(sayac), hucre) for hucre in self.baslangic_izgarasi(kutu, limit)]
+        heapq.heapify(zamanlanmis)
+        cagri = 0
+
+        with ThreadPoolExecutor(max_workers=self.eszamanlilik) as executor:
+            calisan = {}
+            try:
+                while (zamanlanmis or calisan) and len(bulunan) < limit:
+                    simdi = time.monotonic()
+                    while zamanlanmis and zamanlanmis[0][0] <= simdi:
+                        _, _, hucre = heapq.heappop(zamanlanmis)
+                        future = executor.submit(
+                            self.google_maps._text_search_sonuclari, query, hucre.next_page_token,
+                            hucre.merkez, hucre.yaricap_m
+                        )
+                        calisan[future] = hucre
+                        cagri += 1
+
+                    bekleme = max(0.0, zamanlanmis[0][0] - simdi) if zamanlanmis else None
+                    if not calisan:
+                        if bekleme is not None:
+                            time.sleep(bekleme)
+                        continue
+
+                    bitenler, _ = wait(calisan, timeout=bekleme, return_when=FIRST_COMPLETED)
+                    for future in bitenler:
+                        hucre = calisan.pop(future)
+                        sayfa, hucre.next_page_token = future.result()
+                        for sonuc in sayfa:
+                            bulunan.setdefault(sonuc['place_id'])
+                            hucre.icerideki_sonuc += hucre.icinde(sonuc)
+
+                        if hucre.next_page_token:
+                            # Token hazır olana kadar worker'ı meşgul etme
+                            hazir = time.monotonic() + self.google_maps.SAYFA_BEKLEME
+                            heapq.heappush(zamanlanmis, (hazir, next(sayac), hucre))
+                        elif hucre.icerideki_sonuc >= sinir:
+                            # Hücre doldu; daha fazlası için alt hücrelere in
+                            if hucre.derinlik < self.max_derinlik:
+                                for alt in hucre.bol():
+                                    heapq.heappush(zamanlanmis, (0.0, next(sayac), alt))
+                            else:
+                                eksik = True
+            finally:
+                # Limit dolduysa veya hata olduysa sırada bekleyen çağrıları yapma
+                for future in calisan:
+                    future.cancel()
+
+        tamamlandi = not eksik and not zamanlanmis and not calisan
+        logger.info(f"Izgara araması: {query!r}, {cagri} Text Search çağrısı, "
+                    f"{len(bulunan)} tekil sonuç, tamamlandi={tamamlandi}")
+        return list(bulunan)[:limit], tamamlandi
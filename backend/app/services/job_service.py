@@ -0,0 +1,337 @@
+"""
+Arka plan arama işleri servisi
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.database import SessionLocal, SearchJob, SearchJobResult
+from app.services.google_maps_service import GoogleMapsService
+from app.services.credit_service import CreditService
+from app.services.company_service import save_companies_to_db
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+# Aramalar event loop dışında, bu havuzda çalışır
+_executor = ThreadPoolExecutor(max_workers=config.SEARCH_JOB_WORKERS, thread_name_prefix="search-job")
+
+
+class _IsDevredildi(Exception):
+    """İş, sinyali geciktiği için kuyruğa geri alındı; bu worker işi bırakır"""
+
+
+class JobService:
+    @staticmethod
+    def create_job(db: Session, user_id: int, sehir: Optional[str], ulke: str, kategori: str,
+                   limit: int, tum_sehirler: bool, telefon_filtre: bool,
+                   profil: str = 'tam', credit_hold_id: Optional[int] = None) -> SearchJob:
+        """Yeni arama işi oluştur ve kuyruğa al"""
+        job = SearchJob(
+            user_id=user_id,
+            status='queued',
+            sehir=sehir,
+            ulke=ulke,
+            kategori=kategori,
+            limit=limit,
+            tum_sehirler=tum_sehirler,
+            telefon_filtre=telefon_filtre,
+            profil=profil,
+            credit_hold_id=credit_hold_id,
+            toplam_sehir=len(config.TURKIYE_SEHIRLERI) if tum_sehirler else 1
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        
+        JobService.submit(job.id)
+        return job
+    
+    @staticmethod
+    def submit(job_id: int):
+        """İşi worker havuzuna gönder"""
+        _executor.submit(JobService.run_job, job_id)
+    
+    @staticmethod
+    def get_job(db: Session, user_id: int, job_id: int) -> Optional[SearchJob]:
+        """Kullanıcının arama işini getir"""
+        return db.query(SearchJob).filter(
+            SearchJob.id == job_id,
+            SearchJob.user_id == user_id
+        ).first()
+    
+    @staticmethod
+    def get_results(db: Session, job_id: int, offset: int = 0, limit: int = 100) -> List[Dict]:
+        """İşin o ana kadar bulunan sonuçlarını sırayla getir"""
+        rows = db.query(SearchJobResult.data).filter(
+            SearchJobResult.job_id == job_id
+        ).order_by(SearchJobResult.id).offset(offset).limit(limit).all()
+        return [json.loads(row[0]) for row in rows]
+    
+    @staticmethod
+    def resume_pending_jobs() -> int:
+        """
+        Uygulama açılışında yarım kalan işleri kuyruğa geri al
+        
+        Uygulama tek süreçte çalışır (Procfile); açılışta 'running' görünen
+        işlerin hepsi önceki süreçten kalmıştır ve sinyalleri beklenmeden
+        kuyruğa alınır.
+        
+        Returns:
+            Kuyruğa alınan iş sayısı
+        """
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(SearchJob)
+                .where(SearchJob.status == 'running')
+                .values(status='queued')
+            )
+            db.commit()
+            
+            job_ids = [
+                row[0] for row in db.query(SearchJob.id).filter(
+                    SearchJob.status == 'queued'
+                ).order_by(SearchJob.id).all()
+            ]
+        finally:
+            db.close()
+        
+        for job_id in job_ids:
+            JobService.submit(job_id)
+        
+        if job_ids:
+            logger.info(f"{len(job_ids)} arama işi yeniden kuyruğa alındı")
+        return len(job_ids)
+    
+    @staticmethod
+    def requeue_stale_jobs() -> int:
+        """
+        Sinyali SEARCH_JOB_LEASE_SECONDS'tan eski çalışan işleri kuyruğa geri al
+        
+        Arka planda aralıklarla çalışır. İşi bırakılan worker bir sonraki
+        sinyalinde (veya ücret almadan önce) bunu görür ve durur.
+        
+        Returns:
+            Kuyruğa alınan iş sayısı
+        """
+        db = SessionLocal()
+        try:
+            esik = datetime.utcnow() - timedelta(seconds=config.SEARCH_JOB_LEASE_SECONDS)
+            job_ids = db.execute(
+                update(SearchJob)
+                .where(SearchJob.status == 'running', SearchJob.heartbeat_at < esik)
+                .values(status='queued')
+                .returning(SearchJob.id)
+            ).scalars().all()
+            db.commit()
+        finally:
+            db.close()
+        
+        for job_id in job_ids:
+            JobService.submit(job_id)
+        
+        if job_ids:
+            logger.warning(f"Sinyali kesilen {len(job_ids)} arama işi yeniden kuyruğa alındı")
+        return len(job_ids)
+    
+    @staticmethod
+    def _claim(db: Session, job_id: int) -> Optional[datetime]:
+        """
+        İşi atomik olarak 'running' durumuna al (aynı işi iki worker çalıştıramaz)
+        
+        Returns:
+            İşin bu çalıştırmaya ait başlangıç zamanı (sinyal ve sonuç yazarken
+            iş hâlâ bu worker'da mı diye bakılır), alınamadıysa None
+        """
+        simdi = datetime.utcnow()
+        result = db.execute(
+            update(SearchJob)
+            .where(SearchJob.id == job_id, SearchJob.status == 'queued')
+            .values(status='running', started_at=simdi, heartbeat_at=simdi)
+        )
+        db.commit()
+        return simdi if result.rowcount == 1 else None
+    
+    @staticmethod
+    def _nabiz(db: Session, job_id: int, baslangic: datetime):
+        """Sinyal yaz (commit etmez); iş bu worker'dan alınmışsa _IsDevredildi"""
+        result = db.execute(
+            update(SearchJob)
+            .where(SearchJob.id == job_id, SearchJob.status == 'running',
+                   SearchJob.started_at == baslangic)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        if result.rowcount != 1:
+            raise _IsDevredildi(f"Arama işi {job_id} başka bir worker'a geçti")
+    
+    @staticmethod
+    def _nabiz_fonksiyonu(job_id: int, baslangic: datetime) -> Callable[[], None]:
+        """
+        Arama sürerken GoogleMapsService'in her API çağrısında çağıracağı fonksiyon
+        
+        Sinyal en fazla SEARCH_JOB_HEARTBEAT_INTERVAL'da bir, kendi
+        session'ıyla yazılır (detay çağrıları farklı thread'lerden gelir).
+        """
+        kilit = threading.Lock()
+        son_yazma = time.monotonic()
+        
+        def nabiz():
+            nonlocal son_yazma
+            with kilit:
+                if time.monotonic() - son_yazma < config.SEARCH_JOB_HEARTBEAT_INTERVAL:
+                    return
+                son_yazma = time.monotonic()
+            
+            db = SessionLocal()
+            try:
+                JobService._nabiz(db, job_id, baslangic)
+                db.commit()
+            finally:
+                db.close()
+        
+        return nabiz
+    
+    @staticmethod
+    def _sonuclari_ekle(db: Session, job: SearchJob, sonuclar: List[Dict]):
+        """Kısmi sonuçları kaydet ve ilerlemeyi güncelle"""
+        db.add_all([
+            SearchJobResult(job_id=job.id, data=json.dumps(firma, ensure_ascii=False))
+            for firma in sonuclar
+        ])
+        job.result_count = (job.result_count or 0) + len(sonuclar)
+        job.tamamlanan_sehir = (job.tamamlanan_sehir or 0) + 1
+        job.heartbeat_at = datetime.utcnow()
+        db.commit()
+    
+    @staticmethod
+    def run_job(job_id: int):
+        """Arama işini çalıştır (worker thread'inde)"""
+        db = SessionLocal()
+        baslangic = None
+        try:
+            baslangic = JobService._claim(db, job_id)
+            if baslangic is None:
+                return
+            
+            job = db.get(SearchJob, job_id)
+            
+            # Yeniden başlatılan işin önceki yarım sonuçlarını temizle
+            db.query(SearchJobResult).filter(SearchJobResult.job_id == job_id).delete()
+            job.result_count = 0
+            job.tamamlanan_sehir = 0
+            db.commit()
+            
+            google_maps = GoogleMapsService(nabiz=JobService._nabiz_fonksiyonu(job_id, baslangic))
+            
+            if job.tum_sehirler:
+                def ilerleme(olay: Dict):
+                    if olay['durum'] in ('tamamlandi', 'hata'):
+                        JobService._sonuclari_ekle(db, job, olay['sonuclar'])
+                
+                companies_data = google_maps.tum_sehirlerde_ara(
+                    kategori=job.kategori,
+                    ulke=job.ulke,
+                    limit_per_sehir=job.limit,
+                    telefon_filtre=job.telefon_filtre,
+                    ilerleme=ilerleme,
+                    profil=job.profil or 'tam'
+                )
+            else:
+                companies_data = google_maps.isletme_ara(
+                    sehir=job.sehir,
+                    ulke=job.ulke,
+                    kategori=job.kategori,
+                    limit=job.limit,
+                    telefon_filtre=job.telefon_filtre,
+                    profil=job.profil or 'tam'
+                )
+                JobService._sonuclari_ekle(db, job, companies_data)
+            
+            # Sorgu geçmişi, firmalar ve işin sonucu kredi düşümüyle aynı transaction'da
+            # yazılır: ücret ancak sonuçlar kaydedilebildiyse alınır, kayıt hata
+            # verirse kredi düşülmemiş olur
+            credits_used = len(companies_data) * config.SORGU_BASINA_KREDI
+            credit_service = CreditService()
+            # İş bu arada kuyruğa geri alındıysa ücret yeni worker'da alınır
+            JobService._nabiz(db, job_id, baslangic)
+            credit_service.save_query(
+                db=db,
+                user_id=job.user_id,
+                sehir=job.sehir or "Tüm Şehirler",
+                kategori=job.kategori,
+                ulke=job.ulke,
+                limit=job.limit,
+                result_count=len(companies_data),
+                api_kullanimi=google_maps.kullanim_ozeti(),
+                commit=False
+            )
+            save_companies_to_db(db, job.user_id, companies_data, job.kategori, commit=False)
+            
+            job.status = 'done'
+            job.credits_used = credits_used
+            job.result_count = len(companies_data)
+            job.finished_at = datetime.utcnow()
+            
+            # Kredi düşür (rezervasyon varsa bulunan sonuç kadar kesinleşir, kalanı iade edilir).
+            # Başarılıysa yukarıdaki kayıtlarla birlikte tek commit'le yazılır.
+            aciklama = f"Arama: {job.kategori} - {job.sehir or 'Tüm Şehirler'}"
+            if job.credit_hold_id:
+                success = credit_service.settle_hold(
+                    db=db,
+                    user_id=job.user_id,
+                    hold_id=job.credit_hold_id,
+                    amount=credits_used,
+                    description=aciklama
+                )
+            else:
+                success = credit_service.deduct_credit(
+                    db=db,
+                    user_id=job.user_id,
+                    amount=credits_used,
+                    description=aciklama,
+                    commit=False
+                )
+            if not success:
+                raise RuntimeError("Kredi düşürme hatası")
+            db.commit()
+        
+        except _IsDevredildi:
+            db.rollback()
+            logger.warning(f"Arama işi {job_id} kuyruğa geri alındığı için bırakıldı")
+        
+        except Exception as e:
+            logger.exception(f"Arama işi başarısız: {job_id}")
+            db.rollback()
+            if baslangic is None:
+                return
+            # İş hâlâ bu worker'daysa başarısız sayılır (geri alınmışsa yeni worker'a dokunulmaz)
+            result = db.execute(
+                update(SearchJob)
+                .where(SearchJob.id == job_id, SearchJob.status == 'running',
+                       SearchJob.started_at == baslangic)
+                .values(status='failed', error=str(e), result_count=0, finished_at=datetime.utcnow())
+            )
+            if result.rowcount != 1:
+                db.rollback()
+                return
+            # Ücreti alınmamış sonuçlar teslim edilmez
+            db.query(SearchJobResult).filter(SearchJobResult.job_id == job_id).delete()
+            db.commit()
+            # Rezerve edilen kredi iade edilir (kesinleşmişse bir şey yapmaz)
+            hold = db.query(SearchJob.user_id, SearchJob.credit_hold_id).filter(SearchJob.id == job_id).first()
+            if hold and hold.credit_hold_id:
+                CreditService.release_hold(db, hold.user_id, hold.credit_hold_id)
+        
+        finally:
+            db.close()
+    
+    @staticmethod
+    def shutdown():
+        """Worker havuzunu kapat (çalışan işler bir sonraki açılışta devam eder)"""
+        _executor.shutdown(wait=False, cancel_futures=True)
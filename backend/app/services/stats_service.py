@@ -0,0 +1,143 @@
+"""
+Dashboard sayaç servisi
+"""
+from datetime import date, datetime, time
+from typing import Dict, Optional
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+from app.models.database import User, Query, Company, UserStats, dialect_insert
+
+
+class StatsService:
+    """
+    Kullanıcı başına toplam ve günlük sayaçları user_stats tablosunda tutar
+
+    Sayaçlar, sorgu ve firma yazan kodla aynı transaction içinde tek bir
+    UPDATE ile artırılır (commit çağıranındır). Kullanıcının satırı yoksa
+    artırma atlanır; satır ilk okumada kaynak tablolardan hesaplanır.
+    Zamanla oluşabilecek sapmalar yeniden_hesapla ile düzeltilir.
+    """
+
+    @staticmethod
+    def _bugun() -> date:
+        return datetime.utcnow().date()
+
+    @staticmethod
+    def _artir(db: Session, user_id: int, sorgu: int = 0, firma: int = 0,
+               bugun_sorgu: int = 0, bugun_firma: int = 0):
+        bugun = StatsService._bugun()
+        ayni_gun = UserStats.stats_gunu == bugun
+        db.execute(
+            update(UserStats)
+            .where(UserStats.user_id == user_id)
+            .values(
+                total_queries=UserStats.total_queries + sorgu,
+                total_companies=UserStats.total_companies + firma,
+                # Gün değiştiyse günlük sayaçlar sıfırdan başlar
+                queries_today=case((ayni_gun, UserStats.queries_today), else_=0) + bugun_sorgu,
+                companies_today=case((ayni_gun, UserStats.companies_today), else_=0) + bugun_firma,
+                stats_gunu=bugun,
+                updated_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def sorgu_eklendi(db: Session, user_id: int, adet: int = 1):
+        """Yeni sorgu geçmişi kayıtlarını say"""
+        StatsService._artir(db, user_id, sorgu=adet, bugun_sorgu=adet)
+
+    @staticmethod
+    def firma_eklendi(db: Session, user_id: int, adet: int):
+        """Yeni eklenen firmaları say (güncellenen firmalar sayılmaz)"""
+        if adet:
+            StatsService._artir(db, user_id, firma=adet, bugun_firma=adet)
+
+    @staticmethod
+    def firma_silindi(db: Session, user_id: int, created_at: Optional[datetime]):
+        """Silinen firmayı sayaçlardan düş"""
+        bugun_eklenmis = created_at is not None and created_at.date() == StatsService._bugun()
+        StatsService._artir(db, user_id, firma=-1, bugun_firma=-1 if bugun_eklenmis else 0)
+
+    @staticmethod
+    def getir(db: Session, user_id: int) -> Dict[str, int]:
+        """Kullanıcının sayaçlarını tek bir primary key okumasıyla getir"""
+        stats = db.execute(
+            select(UserStats).where(UserStats.user_id == user_id)
+        ).scalar_one_or_none()
+        if stats is None:
+            # Eşzamanlı ilk okumalardan biri satırı oluşturmuşsa ona dokunulmaz
+            StatsService.yeniden_hesapla(db, user_id, sadece_eksik=True)
+            stats = db.execute(
+                select(UserStats).where(UserStats.user_id == user_id)
+            ).scalar_one()
+
+        bugun = stats.stats_gunu == StatsService._bugun()
+        return {
+            'total_queries': stats.total_queries,
+            'total_companies': stats.total_companies,
+            'queries_today': stats.queries_today if bugun else 0,
+            'companies_today': stats.companies_today if bugun else 0,
+        }
+
+    @staticmethod
+    def yeniden_hesapla(db: Session, user_id: Optional[int] = None, sadece_eksik: bool = False) -> int:
+        """
+        Sayaçları queries/companies tablolarından baştan hesapla
+
+        Satırlar INSERT ... ON CONFLICT ile yazılır; aynı kullanıcı için
+        eşzamanlı hesaplamalar primary key'de çakışıp hata vermez.
+
+        Args:
+            user_id: Sadece bu kullanıcı (verilmezse tüm kullanıcılar)
+            sadece_eksik: Satırı olmayan kullanıcıları oluştur, mevcut satırları değiştirme
+
+        Returns:
+            Güncellenen kullanıcı sayısı
+        """
+        bugun = StatsService._bugun()
+        gun_baslangici = datetime.combine(bugun, time.min)
+
+        def sayimlar(model):
+            stmt = select(
+                model.user_id,
+                func.count(),
+                func.count(case((model.created_at >= gun_baslangici, 1)))
+            ).group_by(model.user_id)
+            if user_id is not None:
+                stmt = stmt.where(model.user_id == user_id)
+            return {row[0]: (row[1], row[2]) for row in db.execute(stmt)}
+
+        sorgular = sayimlar(Query)
+        firmalar = sayimlar(Company)
+
+        user_ids = select(User.id)
+        if user_id is not None:
+            user_ids = user_ids.where(User.id == user_id)
+
+        satirlar = []
+        for uid in db.execute(user_ids).scalars():
+            toplam_sorgu, bugun_sorgu = sorgular.get(uid, (0, 0))
+            toplam_firma, bugun_firma = firmalar.get(uid, (0, 0))
+            satirlar.append({
+                'user_id': uid,
+                'total_queries': toplam_sorgu,
+                'total_companies': toplam_firma,
+                'stats_gunu': bugun,
+                'queries_today': bugun_sorgu,
+                'companies_today': bugun_firma,
+                'updated_at': datetime.utcnow(),
+            })
+        if satirlar:
+            stmt = dialect_insert(UserStats)
+            if sadece_eksik:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[UserStats.user_id])
+            else:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[UserStats.user_id],
+                    set_={kolon: stmt.excluded[kolon] for kolon in satirlar[0] if kolon != 'user_id'}
+                )
+            db.execute(stmt, satirlar)
+
+        db.commit()
+        return len(satirlar)
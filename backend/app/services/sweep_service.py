@@ -0,0 +1,182 @@
+"""
+Çok şehirli paralel tarama servisi
+"""
+import heapq
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+import app.config as config
+from app.services.google_maps_service import DETAY_ALANLARI, GoogleMapsService
+
+logger = logging.getLogger(__name__)
+
+
+class _SehirDurumu:
+    """Taranan tek bir şehrin ara durumu"""
+
+    def __init__(self, sehir: str, query: str):
+        self.sehir = sehir
+        self.query = query
+        self.place_ids: List[str] = []
+        self.next_page_token: Optional[str] = None
+        self.detaylar: List[Optional[Dict]] = []
+        self.kalan_detay = 0
+        self.sonuclar: List[Dict] = []
+        self.hata: Optional[str] = None
+
+
+class SweepService:
+    """
+    Birden fazla şehirde aynı kategoriyi paralel arar
+
+    Her API çağrısı (Text Search sayfası veya Place Details) ayrı bir iş olarak
+    ortak worker havuzuna verilir. next_page_token beklemeleri worker içinde
+    uyunmaz; sayfa bir zamanlayıcı kuyruğuna alınır ve o sırada workerlar diğer
+    şehirlerin çağrılarını yapar. Tüm çağrılar GoogleMapsService'in rate
+    limiter'ından geçtiği için toplam hız tek bir bütçeyle sınırlanır.
+    """
+
+    def __init__(self, google_maps: GoogleMapsService,
+                 eszamanlilik: int = config.SWEEP_CONCURRENCY):
+        self.google_maps = google_maps
+        self.eszamanlilik = max(1, eszamanlilik)
+
+    def tara(self, kategori: str, ulke: str, sehirler: List[str],
+             limit_per_sehir: int = 20, telefon_filtre: bool = False,
+             ilerleme: Optional[Callable[[Dict], None]] = None,
+             alanlar: List[str] = DETAY_ALANLARI) -> List[Dict]:
+        """
+        Şehirleri paralel tara
+
+        Args:
+            kategori: İşletme kategorisi
+            ulke: Ülke adı
+            sehirler: Taranacak şehirler
+            limit_per_sehir: Her şehir için maksimum sonuç
+            telefon_filtre: Sadece telefonu olanları getir
+            ilerleme: Şehir durumu değiştikçe çağrılır. Parametre olarak
+                sehir, durum ('basladi', 'tamamlandi', 'hata'), sonuc_sayisi,
+                sonuclar, hata, tamamlanan ve toplam anahtarlarını içeren bir
+                sözlük alır.
+            alanlar: Place Details'te istenecek alanlar
+
+        Returns:
+            Şehir sırasına göre birleştirilmiş işletme bilgileri
+        """
+        durumlar = [
+            _SehirDurumu(sehir, self.google_maps._sorgu_olustur(kategori, sehir, ulke))
+            for sehir in sehirler
+        ]
+        tamamlanan = 0
+
+        def bildir(durum: _SehirDurumu, asama: str):
+            if ilerleme is None:
+                return
+            try:
+                ilerleme({
+                    'sehir': durum.sehir,
+                    'durum': asama,
+                    'sonuc_sayisi': len(durum.sonuclar),
+                    'sonuclar': durum.sonuclar,
+                    'hata': durum.hata,
+                    'tamamlanan': tamamlanan,
+                    'toplam': len(durumlar)
+                })
+            except Exception:
+                logger.exception("İlerleme bildirimi başarısız")
+
+        def sehir_bitti(durum: _SehirDurumu):
+            nonlocal tamamlanan
+            tamamlanan += 1
+            if durum.hata:
+                logger.warning(f"{durum.sehir} taranamadı: {durum.hata}")
+                bildir(durum, 'hata')
+            else:
+                bildir(durum, 'tamamlandi')
+
+        # (hazır olma zamanı, sıra, şehir) - bekleyen Text Search sayfaları
+        sayac = itertools.count()
+        zamanlanmis = [(0.0, next(sayac), durum) for durum in durumlar]
+        heapq.heapify(zamanlanmis)
+
+        with ThreadPoolExecutor(max_workers=self.eszamanlilik) as executor:
+            calisan = {}
+
+            def detaylara_gec(durum: _SehirDurumu):
+                # Text Search bitti; her place_id için ayrı detay işi oluştur
+                durum.place_ids = durum.place_ids[:limit_per_sehir]
+                durum.detaylar = [None] * len(durum.place_ids)
+                durum.kalan_detay = len(durum.place_ids)
+                if not durum.place_ids:
+                    sehir_bitti(durum)
+                for i, place_id in enumerate(durum.place_ids):
+                    future = executor.submit(self.google_maps._detay_getir, place_id, alanlar)
+                    calisan[future] = ('detay', durum, i)
+
+            while zamanlanmis or calisan:
+                simdi = time.monotonic()
+                while zamanlanmis and zamanlanmis[0][0] <= simdi:
+                    _, _, durum = heapq.heappop(zamanlanmis)
+                    if not durum.place_ids and durum.next_page_token is None:
+                        bildir(durum, 'basladi')
+                        # Önbellekte varsa Text Search ve sayfa beklemeleri atlanır
+                        cached = self.google_maps._cachedeki_place_idler(durum.query, limit_per_sehir)
+                        if cached is not None:
+                            durum.place_ids = cached
+                            detaylara_gec(durum)
+                            continue
+                    future = executor.submit(
+                        self.google_maps._text_search_sayfasi, durum.query, durum.next_page_token
+                    )
+                    calisan[future] = ('sayfa', durum, None)
+
+                bekleme = max(0.0, zamanlanmis[0][0] - simdi) if zamanlanmis else None
+                if not calisan:
+                    if bekleme is not None:
+                        time.sleep(bekleme)
+                    continue
+
+                bitenler, _ = wait(calisan, timeout=bekleme, return_when=FIRST_COMPLETED)
+                for future in bitenler:
+                    tip, durum, sira = calisan.pop(future)
+                    if durum.hata:
+                        # Şehir zaten hatalı; kalan detay sonuçları önemsiz
+                        continue
+
+                    try:
+                        sonuc = future.result()
+                    except Exception as e:
+                        durum.hata = str(e)
+                        sehir_bitti(durum)
+                        continue
+
+                    if tip == 'sayfa':
+                        sayfa, durum.next_page_token = sonuc
+                        durum.place_ids.extend(sayfa)
+
+                        if durum.next_page_token and len(durum.place_ids) < limit_per_sehir:
+                            # Token hazır olana kadar worker'ı meşgul etme
+                            hazir = time.monotonic() + self.google_maps.SAYFA_BEKLEME
+                            heapq.heappush(zamanlanmis, (hazir, next(sayac), durum))
+                            continue
+
+                        self.google_maps.text_cache.set(
+                            durum.query, 'tr', durum.place_ids,
+                            tamamlandi=durum.next_page_token is None
+                        )
+                        detaylara_gec(durum)
+                    else:
+                        durum.detaylar[sira] = sonuc
+                        durum.kalan_detay -= 1
+                        if durum.kalan_detay == 0:
+                            durum.sonuclar = self.google_maps._firmalari_olustur(
+                                durum.place_ids, durum.detaylar, durum.sehir, ulke, telefon_filtre, alanlar
+                            )
+                            sehir_bitti(durum)
+
+        tum_sonuclar = []
+        for durum in durumlar:
+            tum_sonuclar.extend(durum.sonuclar)
+        return tum_sonuclar
@@ -3,14 +3,24 @@ Authentication utilities
 """
 from datetime import datetime, timedelta
 from typing import Optional
+import itertools
+import logging
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.models.database import User, get_db
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.models.database import User, get_db, get_async_db
+from app.services.cache_service import LRUCache
 import app.config as config
 
+logger = logging.getLogger(__name__)
+
+# user_id -> oturumdan bağımsız (detached) User kopyası
+_user_cache = LRUCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -37,56 +47,124 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Mevcut kullanıcıyı token'dan al"""
-    credentials_exception = HTTPException(
+def kullanici_cache_temizle(user_id: int):
+    """
+    Kullanıcının önbellek kaydını sil
+
+    ORM ile yapılan değişiklikler commit'te otomatik temizlenir; users
+    tablosunu doğrudan UPDATE ile değiştiren kod bunu çağırmalıdır.
+    """
+    _user_cache.delete(user_id)
+
+
+def kullanici_cache_commitde_temizle(session: Session, user_id: int):
+    """
+    Kullanıcının önbellek kaydını session commit edildiğinde sil
+
+    Doğrudan UPDATE'i commit'i çağırana bırakan kod için; rollback olursa
+    kayıt silinmez.
+    """
+    session.info.setdefault('degisen_kullanicilar', set()).add(user_id)
+
+
+def _cache_kopyasi(user: User) -> User:
+    """Kullanıcının kolonlarını oturuma bağlı olmayan yeni bir nesneye kopyala"""
+    kopya = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(kopya)
+    return kopya
+
+
+# Dinleyiciler Session sınıfına bağlı: hem SessionLocal hem de AsyncSession'ların
+# içteki senkron oturumları için çalışır
+@event.listens_for(Session, "after_flush")
+def _degisen_kullanicilari_topla(session, flush_context):
+    degisen = session.info.setdefault('degisen_kullanicilar', set())
+    for obj in itertools.chain(session.dirty, session.deleted):
+        if isinstance(obj, User):
+            degisen.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _degisen_kullanicilari_temizle(session):
+    for user_id in session.info.pop('degisen_kullanicilar', ()):
+        _user_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _degisen_kullanicilari_unut(session):
+    session.info.pop('degisen_kullanicilar', None)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    # Debug log
-    import logging
-    logger = logging.getLogger(__name__)
-    
+
+
+def _token_user_id(token: str) -> int:
+    """Token'ı doğrulayıp kullanıcı ID'sini döndür"""
     if not token:
-        logger.error("❌ Token None veya boş!")
-        raise credentials_exception
-    
-    logger.info(f"✅ Token alındı, uzunluk: {len(token)}")
-    logger.info(f"Token başlangıcı: {token[:50]}...")
-    logger.info(f"SECRET_KEY var mı: {bool(config.SECRET_KEY)}")
-    logger.info(f"SECRET_KEY uzunluk: {len(config.SECRET_KEY) if config.SECRET_KEY else 0}")
-    logger.info(f"SECRET_KEY başlangıcı: {config.SECRET_KEY[:10] if config.SECRET_KEY else 'YOK'}...")
+        logger.debug("Token yok")
+        raise _credentials_exception()
     
     try:
         payload = jwt.decode(token, config.SECRET_KEY, algorithms=[config.ALGORITHM])
-        logger.info(f"✅ Token decode başarılı, payload: {payload}")
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            logger.error("❌ Token payload'da 'sub' bulunamadı")
-            raise credentials_exception
-        logger.info(f"✅ User ID: {user_id}")
-    except JWTError as e:
-        logger.error(f"❌ JWT decode hatası: {str(e)}")
-        logger.error(f"Token: {token[:50]}...")
-        logger.error(f"SECRET_KEY kullanılan: {config.SECRET_KEY[:10] if config.SECRET_KEY else 'YOK'}...")
-        raise credentials_exception
-    except Exception as e:
-        logger.error(f"❌ Beklenmeyen hata: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        raise credentials_exception
+        return int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError) as e:
+        logger.debug(f"Token doğrulanamadı: {e}")
+        raise _credentials_exception()
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Mevcut kullanıcıyı token'dan al
+
+    Senkron Session kullandığı için düz def'tir; FastAPI threadpool'da
+    çalıştırır ve önbellek ıskasındaki sorgu event loop'u bloklamaz.
+
+    Kullanıcı kısa süreli (USER_CACHE_TTL) önbellekten gelir ve sorgu
+    yapılmadan isteğin oturumuna bağlanır; route'lar nesneyi normal bir
+    ORM nesnesi gibi kullanabilir. Bakiye, tema veya admin değişikliği
+    commit edildiğinde kayıt silinir.
+    """
+    user_id = _token_user_id(token)
+    
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        # Kopyayı isteğin oturumuna SELECT yapmadan bağla (önbellekteki nesne değişmez)
+        return db.merge(cached, load=False)
     
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        logger.error(f"❌ User bulunamadı, ID: {user_id}")
-        raise credentials_exception
+        logger.debug(f"Kullanıcı bulunamadı, ID: {user_id}")
+        raise _credentials_exception()
+    
+    _user_cache.set(user_id, _cache_kopyasi(user))
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user'ın AsyncSession kullanan route'lar için karşılığı (aynı önbellek)"""
+    user_id = _token_user_id(token)
+    
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    if user is None:
+        logger.debug(f"Kullanıcı bulunamadı, ID: {user_id}")
+        raise _credentials_exception()
     
-    logger.info(f"✅ User bulundu: {user.username}")
+    _user_cache.set(user_id, _cache_kopyasi(user))
     return user
 
 
@@ -0,0 +1,89 @@
+"""
+Konum yardımcıları: geohash hücreleri ve mesafe
+
+Firmaların konumu companies.geo_hucre kolonunda tam sayı bir geohash
+(enlem/boylam bitlerinin Z-order ile birleştirilmesi) olarak tutulur.
+Yakın noktalar çoğunlukla yakın değerler aldığı için bir alan, B-tree
+index'inde birkaç ardışık aralığa karşılık gelir.
+"""
+import math
+from typing import List, Optional, Tuple
+
+# Eksen başına bit: 2^26 hücre ~ enlemde 0,3 m, boylamda 0,6 m çözünürlük
+GEO_BITS = 26
+_HUCRE_SAYISI = 1 << GEO_BITS
+
+# Bir alanı kapsarken kullanılacak en fazla hücre (index aralığı sayısının üst sınırı)
+MAX_KAPSAMA_HUCRESI = 16
+
+# Derece başına km (eşdikdörtgen yaklaşımı)
+ENLEM_KM = 110.574
+BOYLAM_KM = 111.320
+
+
+def _yay(n: int) -> int:
+    """n'in bitlerini araya birer sıfır koyarak yay (abc -> 0a0b0c)"""
+    n &= 0xFFFFFFFF
+    n = (n | (n << 16)) & 0x0000FFFF0000FFFF
+    n = (n | (n << 8)) & 0x00FF00FF00FF00FF
+    n = (n | (n << 4)) & 0x0F0F0F0F0F0F0F0F
+    n = (n | (n << 2)) & 0x3333333333333333
+    n = (n | (n << 1)) & 0x5555555555555555
+    return n
+
+
+def _eksen(deger: float, alt: float, genislik: float) -> int:
+    return min(_HUCRE_SAYISI - 1, max(0, int((deger - alt) / genislik * _HUCRE_SAYISI)))
+
+
+def _hucre_xy(lat: float, lng: float) -> Tuple[int, int]:
+    return _eksen(lng, -180.0, 360.0), _eksen(lat, -90.0, 180.0)
+
+
+def geo_hucre(lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+    """Konumun geohash değeri (konum yoksa None)"""
+    if lat is None or lng is None:
+        return None
+    x, y = _hucre_xy(lat, lng)
+    return _yay(x) | (_yay(y) << 1)
+
+
+def kapsayan_araliklar(min_lat: float, min_lng: float,
+                       max_lat: float, max_lng: float) -> List[Tuple[int, int]]:
+    """
+    Dikdörtgeni kapsayan geo_hucre aralıkları (dahil, birleştirilmiş)
+
+    En ince seviyeden başlayıp alan en fazla MAX_KAPSAMA_HUCRESI hücreye
+    sığana kadar kaba seviyelere çıkılır; her hücre, alt hücrelerinin
+    oluşturduğu ardışık bir aralıktır. Aralıklar alandan biraz büyük
+    olabilir; kesin sınır ayrıca lat/lng ile kontrol edilir.
+    """
+    x1, y1 = _hucre_xy(min_lat, min_lng)
+    x2, y2 = _hucre_xy(max_lat, max_lng)
+
+    kayma = 0
+    while ((x2 >> kayma) - (x1 >> kayma) + 1) * ((y2 >> kayma) - (y1 >> kayma) + 1) > MAX_KAPSAMA_HUCRESI:
+        kayma += 1
+
+    genislik = 1 << (2 * kayma)
+    baslangiclar = sorted(
+        (_yay(x) | (_yay(y) << 1)) * genislik
+        for x in range(x1 >> kayma, (x2 >> kayma) + 1)
+        for y in range(y1 >> kayma, (y2 >> kayma) + 1)
+    )
+
+    araliklar: List[Tuple[int, int]] = []
+    for baslangic in baslangiclar:
+        if araliklar and araliklar[-1][1] + 1 == baslangic:
+            araliklar[-1] = (araliklar[-1][0], baslangic + genislik - 1)
+        else:
+            araliklar.append((baslangic, baslangic + genislik - 1))
+    return araliklar
+
+
+def yaricap_kutusu(lat: float, lng: float, yaricap_km: float) -> Tuple[float, float, float, float]:
+    """Merkezi ve yarıçapı verilen dairenin sınır kutusu (min_lat, min_lng, max_lat, max_lng)"""
+    dlat = yaricap_km / ENLEM_KM
+    dlng = yaricap_km / (BOYLAM_KM * max(math.cos(math.radians(lat)), 1e-6))
+    return (max(-90.0, lat - dlat), max(-180.0, lng - dlng),
+            min(90.0, lat + dlat), min(180.0, lng + dlng))
@@ -0,0 +1,48 @@
+"""
+Rate limit yardımcıları
+"""
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket hız sınırlayıcı
+
+    Herhangi bir W saniyelik pencerede en fazla capacity + rate * W token
+    harcanır. Varsayılan kapasite 1'dir: çağrılar 1/rate aralıkla dağılır
+    ve 1 saniyede rate + 1'den fazla çağrı yapılmaz (kova dolu başlasa da
+    saniyedeki sınır aşılmaz).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Saniyede eklenen token sayısı (0 veya negatif: sınırsız)
+            capacity: Kovanın alabileceği maksimum token (anlık patlama payı, varsayılan 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else 1.0
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Yeterli token birikene kadar bekle ve harca"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                bekleme = (tokens - self._tokens) / self.rate
+
+            time.sleep(bekleme)
@@ -0,0 +1,18 @@
+"""
+Yanıt akışı yardımcıları
+"""
+from typing import BinaryIO, Iterator
+import app.config as config
+
+
+def dosyayi_akit(dosya: BinaryIO, parca_boyutu: int = config.EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Dosyayı baştan parça parça oku, bitince kapat"""
+    try:
+        dosya.seek(0)
+        while True:
+            parca = dosya.read(parca_boyutu)
+            if not parca:
+                break
+            yield parca
+    finally:
+        dosya.close()
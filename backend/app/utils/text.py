@@ -0,0 +1,43 @@
+"""
+Metin normalizasyon yardımcıları
+"""
+import unicodedata
+from typing import List
+
+
+def turkce_kucuk_harf(metin: str) -> str:
+    """Türkçe kurallarına göre küçük harfe çevir (I -> ı, İ -> i)"""
+    metin = unicodedata.normalize('NFC', metin)
+    return metin.replace('I', 'ı').replace('İ', 'i').casefold()
+
+
+def sorgu_normalize(sorgu: str) -> str:
+    """
+    Arama sorgusunu önbellek anahtarı için normalize et
+
+    Türkçe büyük/küçük harf farkını ve fazla boşlukları yok sayar:
+    "Emlak  İSTANBUL Türkiye" ve "emlak istanbul türkiye" aynı anahtarı üretir.
+    """
+    return ' '.join(turkce_kucuk_harf(sorgu).split())
+
+
+# Aramada eşdeğer sayılan harfler (klavyesinde Türkçe karakter olmayan kullanıcılar için)
+_ARAMA_KATLAMA = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+
+def arama_normalize(metin: str) -> str:
+    """
+    Metni tam metin index'i ve arama sorgusu için normalize et
+
+    Türkçe küçük harfe çevirir, aksanları atar ve harf/rakam dışındaki
+    karakterleri boşluk yapar: "İSTANBUL Çiçekçisi, Şişli" ->
+    "istanbul cicekcisi sisli".
+    """
+    metin = turkce_kucuk_harf(metin).translate(_ARAMA_KATLAMA)
+    metin = ''.join(c for c in unicodedata.normalize('NFKD', metin) if not unicodedata.combining(c))
+    return ' '.join(''.join(c if c.isalnum() else ' ' for c in metin).split())
+
+
+def arama_terimleri(sorgu: str) -> List[str]:
+    """Arama sorgusunun normalize edilmiş terimleri (tekrarlar atılır, sıra korunur)"""
+    return list(dict.fromkeys(arama_normalize(sorgu).split()))
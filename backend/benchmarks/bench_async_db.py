@@ -0,0 +1,146 @@
+"""
+Async DB katmanı eşzamanlılık benchmark'ı
+
+Aynı firma listesi sorgusunu (telefonu olanlar, puana göre ilk 100 satır)
+üç şekilde çalıştıran route'lara eşzamanlı istek gönderir:
+
+    eski    async def + senkron Session (sorgu event loop'u bloklar)
+    thread  def + senkron Session (FastAPI threadpool'u)
+    async   async def + AsyncSession (aiosqlite / asyncpg)
+
+Yük sürerken ayrı bir görev 5 ms'lik uykulardan ne kadar geç uyandığını
+ölçer (loop gecikmesi); bu, event loop'un ne kadar bloklandığını gösterir. "eski" modda eşzamanlılık
+bağlantı havuzunu aşınca havuz beklemesi de loop'u bloklar; bu istekler
+havuz zaman aşımıyla (30 sn) hata olarak sayılır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_async_db --firma 20000 --istek 2000 --eszamanli 50
+    python -m benchmarks.bench_async_db --mod thread --mod async --eszamanli 200
+    python -m benchmarks.bench_async_db --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+MODLAR = ('eski', 'thread', 'async')
+
+
+def yuzdelik(sureler, oran):
+    sirali = sorted(sureler)
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--firma', type=int, default=20000)
+    parser.add_argument('--istek', type=int, default=2000)
+    parser.add_argument('--eszamanli', type=int, default=50)
+    parser.add_argument('--mod', action='append', choices=MODLAR, help='Tekrarlanabilir (varsayılan: hepsi)')
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    import logging
+    logging.disable(logging.INFO)
+
+    import httpx
+    from fastapi import Depends, FastAPI
+    from fastapi.responses import ORJSONResponse
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.models.database import (
+        Company, SessionLocal, User, async_engine, engine, get_async_db, get_db, init_db
+    )
+    from app.routes.companies import SIRALAMA_IFADELERI, YANIT_KOLONLARI
+    from app.services.company_filter_service import CompanyFilter, company_filter_service
+
+    init_db()
+    db = SessionLocal()
+    user = User(email=f'bench-async-{time.time()}@example.com', username=f'bench-async-{time.time()}',
+                hashed_password='x')
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.execute(insert(Company), [
+        {'user_id': user_id, 'firma_adi': f'Firma {i}', 'sehir': f'Şehir {i % 50}', 'ilce': f'İlçe {i % 400}',
+         'telefon': f'0212 {i:07d}' if i % 3 else None, 'rating': (i % 50) / 10, 'user_ratings_total': i % 900}
+        for i in range(args.firma)
+    ])
+    db.commit()
+    db.close()
+
+    # Index'le karşılanamayan sıralama: her istek kullanıcının firmalarını tarar
+    stmt = (company_filter_service.sorgu(user_id, CompanyFilter(telefon_filtre='var'), *YANIT_KOLONLARI)
+            .order_by(SIRALAMA_IFADELERI['rating'].desc(), Company.id.desc())
+            .limit(100))
+
+    bench = FastAPI()
+
+    @bench.get('/eski')
+    async def eski(db: Session = Depends(get_db)):
+        return ORJSONResponse([dict(row) for row in db.execute(stmt).mappings()])
+
+    @bench.get('/thread')
+    def thread(db: Session = Depends(get_db)):
+        return ORJSONResponse([dict(row) for row in db.execute(stmt).mappings()])
+
+    @bench.get('/async')
+    async def async_(db: AsyncSession = Depends(get_async_db)):
+        return ORJSONResponse([dict(row) for row in (await db.execute(stmt)).mappings()])
+
+    async def calistir(yol):
+        transport = httpx.ASGITransport(app=bench)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+            # Isınma: ilk bağlantı tek başına açılır (uygulamada startup'ta yapılır),
+            # sonra bağlantı havuzu ve derlenmiş SQL önbelleği dolar
+            await client.get(yol)
+            await asyncio.gather(*(client.get(yol) for _ in range(min(args.eszamanli, 10))))
+
+            sureler, gecikmeler, hatalar = [], [], []
+            sinir = asyncio.Semaphore(args.eszamanli)
+            bitti = asyncio.Event()
+
+            async def istek():
+                async with sinir:
+                    baslangic = time.perf_counter()
+                    try:
+                        yanit = await client.get(yol)
+                        yanit.raise_for_status()
+                    except Exception as e:
+                        hatalar.append(e)
+                        return
+                    sureler.append(time.perf_counter() - baslangic)
+
+            async def loop_gecikmesi():
+                while not bitti.is_set():
+                    baslangic = time.perf_counter()
+                    await asyncio.sleep(0.005)
+                    gecikmeler.append(time.perf_counter() - baslangic - 0.005)
+
+            olcum_gorevi = asyncio.create_task(loop_gecikmesi())
+            baslangic = time.perf_counter()
+            await asyncio.gather(*(istek() for _ in range(args.istek)))
+            toplam = time.perf_counter() - baslangic
+            bitti.set()
+            await olcum_gorevi
+            return toplam, sureler, gecikmeler, hatalar
+
+    print(f"{args.firma} firma, {args.istek} istek, {args.eszamanli} eşzamanlı "
+          f"({engine.dialect.name} / {async_engine.dialect.driver})")
+    print(f"{'mod':<8} {'istek/sn':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'loop p50':>9} {'loop p95':>9} {'loop max':>9} {'hata':>5}")
+    for mod in args.mod or MODLAR:
+        toplam, sureler, gecikmeler, hatalar = asyncio.run(calistir(f'/{mod}'))
+        print(f"{mod:<8} {len(sureler) / toplam:>9.0f} {yuzdelik(sureler, 0.5):>8.1f} "
+              f"{yuzdelik(sureler, 0.95):>8.1f} {yuzdelik(gecikmeler, 0.5):>9.1f} "
+              f"{yuzdelik(gecikmeler, 0.95):>9.1f} {max(gecikmeler) * 1000:>9.1f} {len(hatalar):>5}")
+        # Her mod kendi event loop'unda çalışır; async havuz bir sonraki moda taşınmaz
+        asyncio.run(async_engine.dispose())
+
+
+if __name__ == '__main__':
+    main()
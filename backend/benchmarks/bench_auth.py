@@ -0,0 +1,98 @@
+"""
+Kimlik doğrulama hot path benchmark'ı
+
+get_current_user'ı doğrudan ve GET /api/auth/me üzerinden, kullanıcı
+önbelleği kapalı (her istekte users sorgusu) ve açık olarak ölçer.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_auth --istek 2000
+    python -m benchmarks.bench_auth --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def yuzdelikler(sureler):
+    sirali = sorted(sureler)
+    return (statistics.median(sirali) * 1e6,
+            sirali[int(len(sirali) * 0.95)] * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--istek', type=int, default=2000)
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.models.database import SessionLocal, User
+    from app.utils import auth
+    import app.config as config
+
+    db = SessionLocal()
+    user = User(email=f'bench-auth-{time.time()}@example.com', username=f'bench-auth-{time.time()}',
+                hashed_password='x')
+    db.add(user)
+    db.commit()
+    token = auth.create_access_token({'sub': str(user.id)})
+    db.close()
+
+    client = TestClient(app)
+    headers = {'Authorization': f'Bearer {token}'}
+    loop = asyncio.new_event_loop()
+
+    def dependency_olc(adet):
+        # Sadece dependency: token çözümü + kullanıcı (oturum açma/kapama dahil)
+        sureler = []
+        for _ in range(adet):
+            baslangic = time.perf_counter()
+            db = SessionLocal()
+            kullanici = loop.run_until_complete(auth.get_current_user(token, db))
+            kullanici.balance
+            db.close()
+            sureler.append(time.perf_counter() - baslangic)
+        return sureler
+
+    def endpoint_olc(adet):
+        # Uçtan uca: GET /api/auth/me
+        sureler = []
+        for _ in range(adet):
+            baslangic = time.perf_counter()
+            client.get('/api/auth/me', headers=headers)
+            sureler.append(time.perf_counter() - baslangic)
+        return sureler
+
+    modlar = {'önbellek kapalı': 0, f'önbellek açık ({config.USER_CACHE_TTL:g} sn)': config.USER_CACHE_TTL}
+    sonuclar = {(ad, olcum): [] for ad in modlar for olcum in ('dependency', 'endpoint')}
+
+    # Modlar bloklar halinde sırayla çalışır; ısınma ve GC etkisi iki moda eşit dağılır
+    blok = max(1, args.istek // 10)
+    endpoint_olc(200)
+    for _ in range(args.istek // blok):
+        for ad, ttl in modlar.items():
+            auth._user_cache.clear()
+            auth._user_cache.ttl = ttl
+            sonuclar[(ad, 'dependency')].extend(dependency_olc(blok))
+            sonuclar[(ad, 'endpoint')].extend(endpoint_olc(blok))
+
+    print(f"{args.istek} istek, p50 / p95 (µs)")
+    for (ad, olcum), sureler in sonuclar.items():
+        p50, p95 = yuzdelikler(sureler)
+        etiket = 'get_current_user' if olcum == 'dependency' else 'GET /api/auth/me'
+        print(f"  {ad:<24} {etiket:<17} {p50:8.1f} / {p95:8.1f}")
+
+    loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Firma listesi benchmark'ı
+
+N firma (varsayılan 1M) üretir ve GET /api/companies'in filtre
+kombinasyonları için sorgu süresini composite index'ler olmadan ve
+index'lerle ölçer.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_company_listing --adet 1000000
+    python -m benchmarks.bench_company_listing --database-url postgresql://... --adet 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+KULLANICI_SAYISI = 10
+ILCE_SAYISI = 20
+SEED_BATCH = 20000
+
+
+def seed(db, Company, User, adet: int):
+    """Kullanıcılara dağılmış rastgele firmalar üret"""
+    from sqlalchemy import insert
+    import app.config as config
+
+    rnd = random.Random(42)
+    users = [User(email=f'bench{i}@example.com', username=f'bench{i}', hashed_password='x')
+             for i in range(KULLANICI_SAYISI)]
+    db.add_all(users)
+    db.commit()
+    # İlk kullanıcı firmaların yarısına sahip (büyük hesap)
+    agirliklar = [KULLANICI_SAYISI] + [1] * (KULLANICI_SAYISI - 1)
+    user_ids = [u.id for u in users]
+    baslangic = datetime.utcnow() - timedelta(days=365)
+
+    for parca in range(0, adet, SEED_BATCH):
+        rows = []
+        for i in range(parca, min(parca + SEED_BATCH, adet)):
+            sehir = rnd.choice(config.TURKIYE_SEHIRLERI)
+            rows.append({
+                'user_id': rnd.choices(user_ids, agirliklar)[0],
+                'place_id': f'bench-{i}',
+                'firma_adi': f'Firma {i}',
+                'sehir': sehir,
+                'ilce': f'{sehir} İlçe {rnd.randrange(ILCE_SAYISI)}',
+                'ulke': 'Türkiye',
+                'adres': f'Adres {i}',
+                'telefon': f'0212 {i:07d}' if rnd.random() < 0.7 else '',
+                'asama': rnd.choice(config.ASAMA_SECENEKLERI),
+                'rating': round(rnd.uniform(1, 5), 1),
+                'user_ratings_total': rnd.randrange(1000),
+                'kategori': rnd.choice(config.KATEGORILER),
+                'created_at': baslangic + timedelta(seconds=rnd.randrange(365 * 86400)),
+            })
+        db.execute(insert(Company), rows)
+        db.commit()
+    return user_ids[0]
+
+
+def olc(db, sorgu, tekrar: int) -> float:
+    sureler = []
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        db.execute(sorgu).scalars().all()
+        sureler.append(time.perf_counter() - baslangic)
+    return statistics.median(sureler) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--adet', type=int, default=1_000_000)
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    parser.add_argument('--sayfa', type=int, default=100, help='Ölçülen sayfa boyutu (LIMIT)')
+    parser.add_argument('--tekrar', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    from sqlalchemy import text
+    from app.models.database import SessionLocal, Company, User, engine, init_db
+    from scripts.explain_company_filters import FILTRE_KOMBINASYONLARI, filtreli_sorgu, ornek_degerler
+
+    init_db()
+    db = SessionLocal()
+    print(f"{args.adet:,} firma üretiliyor ({engine.dialect.name})...")
+    baslangic = time.perf_counter()
+    seed(db, Company, User, args.adet)
+    print(f"  {time.perf_counter() - baslangic:.1f} s")
+
+    user_id, ornek = ornek_degerler(db)
+    db.close()
+    composite = [ix for ix in Company.__table__.indexes
+                 if ix.name.startswith('ix_companies_user_')]
+
+    sonuclar = {}
+    for asama, index_var in (('önce', False), ('sonra', True)):
+        for ix in composite:
+            if index_var:
+                ix.create(bind=engine, checkfirst=True)
+            else:
+                ix.drop(bind=engine, checkfirst=True)
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+
+        # Şema değiştiği için her aşamada yeni oturum
+        db = SessionLocal()
+        for kombinasyon in FILTRE_KOMBINASYONLARI:
+            filtreler = {k: (v if k == 'telefon' else ornek[k]) for k, v in kombinasyon.items()}
+            sorgu = filtreli_sorgu(user_id, **filtreler).limit(args.sayfa)
+            baslik = ', '.join(f"{k}={v}" if v else k for k, v in kombinasyon.items()) or 'filtre yok'
+            sonuclar.setdefault(baslik, {})[asama] = olc(db, sorgu, args.tekrar)
+        db.close()
+
+    print(f"\nİlk {args.sayfa} firma, medyan ms (user_id={user_id})")
+    print(f"{'filtreler':<30} {'önce':>10} {'sonra':>10} {'hızlanma':>9}")
+    for baslik, sure in sonuclar.items():
+        print(f"{baslik:<30} {sure['önce']:>10.2f} {sure['sonra']:>10.2f} "
+              f"{sure['önce'] / sure['sonra']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Firma tam metin arama (q) benchmark'ı
+
+Tek kullanıcıya ait çok sayıda firmada firma listesinin ilk sayfasını
+(created_at desc, 101 satır) q ile arar ve iki yöntemi karşılaştırır:
+
+    like    firma_adi/kategori/adres/ilce/sehir üzerinde ILIKE '%terim%' (index'siz tarama)
+    fts     CompanyFilter.q (SQLite FTS5 / Postgres GIN, önek eşleşmesi)
+
+Veri tekrarlanabilir rastgele ad/kategori/adres kombinasyonlarından üretilir.
+
+Örnek sonuç (SQLite 3.40, 1.000.000 firma, p50 ms; "created_at" sütunu
+sayfanın her filtrede (user_id, created_at) index'inden okunduğu önceki plan):
+
+    sorgu                    like   created_at   fts (sayfa_sorgusu)
+    Yıldız Kuaför Kadıköy    1176        136        22.6
+    yildiz kuafor            2206         25        34.8
+    ECZA                      5.5         27        11.4
+    ka                        3.4         80         6.8
+    istanbul                 2081         75        14.9
+    xq                       1706        184         4.5
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_company_search --firma 1000000
+    python -m benchmarks.bench_company_search --database-url postgresql://...
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Sorgu -> açıklama (seçicilik sırasıyla)
+SORGULAR = [
+    ('Yıldız Kuaför Kadıköy', 'çok seçici, 3 terim'),
+    ('yildiz kuafor', 'seçici, Türkçe karakterler katlanmış'),
+    ('ECZA', 'tek önek'),
+    ('ka', 'kısa önek (yazarken arama)'),
+    ('istanbul', 'geniş (şehir)'),
+    ('xq', 'eşleşme yok'),
+]
+
+ADLAR = ['Yıldız', 'Güneş', 'Deniz', 'Ak', 'Öz', 'Şahin', 'Çınar', 'Işık', 'Kartal', 'Ege', 'Anadolu', 'Doğa']
+TURLER = ['Kuaför', 'Eczane', 'Emlak', 'Oto Galeri', 'Çiçekçi', 'Kafe', 'Diş Kliniği', 'Market', 'Fırın',
+          'Nalbur', 'Veteriner', 'Kırtasiye', 'Optik', 'Terzi', 'Lokanta']
+SEHIRLER = {
+    'İstanbul': ['Kadıköy', 'Şişli', 'Beşiktaş', 'Üsküdar', 'Fatih'],
+    'Ankara': ['Çankaya', 'Keçiören', 'Yenimahalle'],
+    'İzmir': ['Karşıyaka', 'Bornova', 'Konak'],
+    'Bursa': ['Nilüfer', 'Osmangazi'],
+    'Iğdır': ['Merkez'],
+}
+SOKAKLAR = ['Atatürk Cad.', 'İnönü Sok.', 'Cumhuriyet Cad.', 'Gül Sok.', 'Bağdat Cad.', 'Menekşe Sok.']
+
+
+def yuzdelik(sureler, oran):
+    sirali = sorted(sureler)
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--firma', type=int, default=1000000)
+    parser.add_argument('--tekrar', type=int, default=20, help='Sorgu başına ölçüm')
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from datetime import datetime, timedelta
+    from sqlalchemy import and_, insert, or_
+    from app.models.database import Company, SessionLocal, User, engine, init_db
+    from app.routes.companies import YANIT_KOLONLARI
+    from app.services.company_filter_service import CompanyFilter, company_filter_service
+    from app.services.company_service import ARAMA_KOLONLARI, arama_metni_olustur
+
+    init_db()
+    db = SessionLocal()
+    user = User(email=f'bench-arama-{time.time()}@example.com', username=f'bench-arama-{time.time()}',
+                hashed_password='x')
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    rastgele = random.Random(42)
+    sehirler = list(SEHIRLER)
+    simdi = datetime.utcnow()
+    baslangic = time.perf_counter()
+    for parti in range(0, args.firma, 10000):
+        satirlar = []
+        for i in range(parti, min(args.firma, parti + 10000)):
+            sehir = rastgele.choice(sehirler)
+            tur = rastgele.choice(TURLER)
+            satir = {
+                'user_id': user_id, 'firma_adi': f'{rastgele.choice(ADLAR)} {tur} {i}',
+                'kategori': tur, 'sehir': sehir, 'ilce': rastgele.choice(SEHIRLER[sehir]),
+                'adres': f'{rastgele.choice(SOKAKLAR)} No:{rastgele.randint(1, 200)}',
+                'created_at': simdi - timedelta(seconds=i),
+            }
+            satir['arama_metni'] = arama_metni_olustur(satir)
+            satirlar.append(satir)
+        db.execute(insert(Company), satirlar)
+        db.commit()
+    print(f"{args.firma} firma yazıldı ({engine.dialect.name}, index güncellemesi dahil "
+          f"{time.perf_counter() - baslangic:.1f} sn)")
+
+    def like_sorgusu(q):
+        # Karşılaştırma: istemci tarafı aramanın sunucudaki karşılığı
+        kosullar = [
+            or_(*(getattr(Company, kolon).ilike(f'%{terim}%') for kolon in ARAMA_KOLONLARI))
+            for terim in q.split()
+        ]
+        return company_filter_service.sorgu(user_id, CompanyFilter(), *YANIT_KOLONLARI).where(and_(*kosullar)) \
+            .order_by(Company.created_at.desc(), Company.id.desc()).limit(101)
+
+    def fts_sorgusu(q):
+        # GET /api/companies ile aynı sayfa sorgusu
+        return company_filter_service.sayfa_sorgusu(
+            user_id, CompanyFilter(q=q), YANIT_KOLONLARI, Company.created_at, azalan=True, son=None, limit=101
+        )
+
+    print(f"{'sorgu':<24} {'yöntem':<6} {'satır':>6} {'p50 ms':>9} {'p95 ms':>9}  açıklama")
+    for q, aciklama in SORGULAR:
+        for yontem, sorgu_olustur in (('like', like_sorgusu), ('fts', fts_sorgusu)):
+            sureler = []
+            tekrar = args.tekrar if yontem == 'fts' else max(3, args.tekrar // 5)
+            for _ in range(tekrar):
+                baslangic = time.perf_counter()
+                satirlar = db.execute(sorgu_olustur(q)).all()
+                sureler.append(time.perf_counter() - baslangic)
+            print(f"{q:<24} {yontem:<6} {len(satirlar):>6} {yuzdelik(sureler, 0.5):>9.1f} "
+                  f"{yuzdelik(sureler, 0.95):>9.1f}  {aciklama}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
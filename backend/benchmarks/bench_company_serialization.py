@@ -0,0 +1,88 @@
+"""
+Firma listesi serileştirme benchmark'ı
+
+N firma (varsayılan 50k) üretir ve tek sayfada döndürülmüş gibi JSON
+yanıtını iki yolla oluşturur:
+    eski: ORM nesneleri + elle CompanyResponse + response_model doğrulaması
+          + jsonable_encoder + json.dumps (FastAPI'nin varsayılan yolu)
+    yeni: sadece yanıt kolonları (Row mapping) + orjson
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_company_serialization --adet 50000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def eski_yanit(db, Company, user_id: int) -> bytes:
+    import json
+    from fastapi.encoders import jsonable_encoder
+    from app.routes.companies import CompanyListResponse, CompanyResponse
+
+    companies = db.query(Company).filter(Company.user_id == user_id) \
+        .order_by(Company.created_at.desc(), Company.id.desc()).all()
+    yanit = CompanyListResponse(companies=[
+        CompanyResponse(
+            id=c.id, firma_adi=c.firma_adi, sehir=c.sehir, ilce=c.ilce, ulke=c.ulke,
+            adres=c.adres, telefon=c.telefon, web=c.web, asama=c.asama, rating=c.rating,
+            user_ratings_total=c.user_ratings_total, price_level=c.price_level,
+            business_status=c.business_status,
+            international_phone_number=c.international_phone_number, url=c.url,
+            plus_code=c.plus_code, type=c.type, types=c.types, kategori=c.kategori,
+            created_at=c.created_at.isoformat() if c.created_at else None
+        )
+        for c in companies
+    ])
+    # FastAPI response_model ile dönen değeri tekrar doğrular ve encode eder
+    dogrulanmis = CompanyListResponse.model_validate(yanit.model_dump())
+    govde = json.dumps(jsonable_encoder(dogrulanmis), ensure_ascii=False).encode('utf-8')
+    db.expunge_all()
+    return govde
+
+
+def yeni_yanit(db, Company, user_id: int) -> bytes:
+    from fastapi.responses import ORJSONResponse
+    from app.routes.companies import YANIT_KOLONLARI
+    from app.services.company_filter_service import CompanyFilter, company_filter_service
+
+    stmt = company_filter_service.sorgu(user_id, CompanyFilter(), *YANIT_KOLONLARI) \
+        .order_by(Company.created_at.desc(), Company.id.desc())
+    companies = db.execute(stmt).mappings().all()
+    return ORJSONResponse({
+        'companies': [dict(row) for row in companies],
+        'next_cursor': None
+    }).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--adet', type=int, default=50_000)
+    parser.add_argument('--tekrar', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    from app.models.database import SessionLocal, User, Company, init_db
+    from benchmarks.bench_excel_export import seed
+
+    init_db()
+    db = SessionLocal()
+    user_id = seed(db, Company, User, args.adet)
+
+    boyutlar = {}
+    for ad, fonksiyon in (('eski', eski_yanit), ('yeni', yeni_yanit)):
+        sureler = []
+        for _ in range(args.tekrar):
+            baslangic = time.perf_counter()
+            boyutlar[ad] = len(fonksiyon(db, Company, user_id))
+            sureler.append(time.perf_counter() - baslangic)
+        print(f"{ad}: medyan {statistics.median(sureler) * 1000:8.1f} ms  "
+              f"(en iyi {min(sureler) * 1000:.1f} ms, yanıt {boyutlar[ad] / 1024 / 1024:.1f} MB)")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Eşzamanlı kredi düşümü stres testi
+
+Aynı kullanıcıdan çok sayıda thread aynı anda kredi düşer; toplam istek
+bakiyeden fazladır. Sonunda şunlar kontrol edilir:
+
+    - son bakiye = başlangıç - başarılı düşüm toplamı
+    - işlem (transactions) kaydı sayısı = başarılı düşüm sayısı
+    - bakiye hiçbir zaman eksiye inmez
+
+    eski    bakiyeyi Python'da okuyup geri yazan önceki uygulama (karşılaştırma için)
+    yeni    CreditService.deduct_credit (koşullu tek UPDATE)
+    rezerv  hold_credit ile iki katı rezerve edip settle_hold ile kesinleştirme
+
+"yeni" veya "rezerv" modda kontrollerden biri tutmazsa çıkış kodu 1'dir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_credit_deduction --thread 16 --dusum 200
+    python -m benchmarks.bench_credit_deduction --database-url postgresql://...
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--thread', type=int, default=16)
+    parser.add_argument('--dusum', type=int, default=200, help='Thread başına düşüm denemesi')
+    parser.add_argument('--miktar', type=int, default=3, help='Düşüm başına kredi')
+    parser.add_argument('--bakiye', type=int, default=None,
+                        help='Başlangıç bakiyesi (varsayılan: toplam isteğin %%75\'i)')
+    parser.add_argument('--mod', action='append', choices=('eski', 'yeni', 'rezerv'), help='Tekrarlanabilir (varsayılan: hepsi)')
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from sqlalchemy import func, select
+    from sqlalchemy.exc import OperationalError
+    from app.models.database import SessionLocal, Transaction, User, init_db
+    from app.services.credit_service import CreditService
+
+    init_db()
+    toplam_istek = args.thread * args.dusum * args.miktar
+    baslangic_bakiye = args.bakiye if args.bakiye is not None else toplam_istek * 3 // 4
+
+    def eski_dus(db, user_id, amount, description):
+        # Önceki uygulama: oku, Python'da kontrol et, mutlak değeri geri yaz
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user or user.balance < amount:
+            return False
+        user.balance -= amount
+        db.add(Transaction(user_id=user_id, amount=-amount, description=description))
+        db.commit()
+        return True
+
+    def rezerv_dus(db, user_id, amount, description):
+        # Arama akışı: en yüksek ücret rezerve edilir, teslim edilen kadarı alınır
+        hold_id = CreditService.hold_credit(db, user_id, amount * 2, f'{description} (rezerve)')
+        if hold_id is None:
+            return False
+        if not CreditService.settle_hold(db, user_id, hold_id, amount, description):
+            db.rollback()
+            return False
+        db.commit()
+        return True
+
+    modlar = {'eski': eski_dus, 'yeni': CreditService.deduct_credit, 'rezerv': rezerv_dus}
+
+    def calistir(mod):
+        dus = modlar[mod]
+        db = SessionLocal()
+        user = User(email=f'bench-kredi-{mod}-{time.time()}@example.com',
+                    username=f'bench-kredi-{mod}-{time.time()}', hashed_password='x',
+                    balance=baslangic_bakiye)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        db.close()
+
+        basarili, hatali, eksi = [0], [0], [0]
+        kilit = threading.Lock()
+        hazir = threading.Barrier(args.thread)
+
+        def isci():
+            db = SessionLocal()
+            hazir.wait()
+            try:
+                for _ in range(args.dusum):
+                    try:
+                        ok = dus(db, user_id, args.miktar, f'stres {mod}')
+                    except OperationalError:
+                        db.rollback()
+                        ok = None
+                    with kilit:
+                        if ok:
+                            basarili[0] += 1
+                        elif ok is None:
+                            hatali[0] += 1
+            finally:
+                db.close()
+
+        def izle():
+            # Bakiyenin eksiye inip inmediğini yük sırasında da kontrol et
+            db = SessionLocal()
+            try:
+                while not bitti.is_set():
+                    if db.execute(select(User.balance).where(User.id == user_id)).scalar() < 0:
+                        eksi[0] += 1
+                    db.commit()
+                    time.sleep(0.005)
+            finally:
+                db.close()
+
+        bitti = threading.Event()
+        izleyici = threading.Thread(target=izle)
+        izleyici.start()
+        threadler = [threading.Thread(target=isci) for _ in range(args.thread)]
+        baslangic = time.perf_counter()
+        for t in threadler:
+            t.start()
+        for t in threadler:
+            t.join()
+        sure = time.perf_counter() - baslangic
+        bitti.set()
+        izleyici.join()
+
+        db = SessionLocal()
+        son_bakiye = db.execute(select(User.balance).where(User.id == user_id)).scalar()
+        islem_sayisi, islem_toplami = db.execute(
+            select(func.count(), func.coalesce(func.sum(Transaction.amount), 0))
+            .where(Transaction.user_id == user_id)
+        ).one()
+        db.close()
+
+        beklenen = baslangic_bakiye - basarili[0] * args.miktar
+        dogru = (son_bakiye == beklenen and islem_sayisi == basarili[0]
+                 and baslangic_bakiye + islem_toplami == son_bakiye and son_bakiye >= 0 and not eksi[0])
+        print(f"{mod:<6} {(basarili[0] + hatali[0]) / sure:>8.0f} {basarili[0]:>9} {hatali[0]:>6} "
+              f"{son_bakiye:>8} {beklenen:>9} {islem_sayisi:>8} {'evet' if dogru else 'HAYIR':>7}")
+        return dogru
+
+    print(f"{args.thread} thread x {args.dusum} düşüm x {args.miktar} kredi "
+          f"= {toplam_istek} istenen kredi, başlangıç bakiyesi {baslangic_bakiye}")
+    print(f"{'mod':<6} {'düşüm/sn':>8} {'başarılı':>9} {'hata':>6} {'bakiye':>8} {'beklenen':>9} "
+          f"{'işlem':>8} {'doğru':>7}")
+    sonuclar = {mod: calistir(mod) for mod in args.mod or modlar}
+    if sonuclar.get('yeni') is False or sonuclar.get('rezerv') is False:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Export benchmark'ı
+
+Tek kullanıcıya N firma (varsayılan 500k) üretir ve Excel export'unu eski
+(.all() + normal Workbook + BytesIO) ve yeni (yield_per + write-only
+workbook + SpooledTemporaryFile) yöntemle ölçer. Karşılaştırma için
+/api/export'un CSV, gzip CSV ve (pyarrow kuruluysa) Parquet akışları da
+ölçülür. Her yöntem ayrı bir süreçte çalışır; peak RSS ölçümleri
+birbirini etkilemez.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_excel_export --adet 500000
+    python -m benchmarks.bench_excel_export --yontem yeni --yontem csv
+    python -m benchmarks.bench_excel_export --database-url postgresql://... --adet 500000
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SEED_BATCH = 20000
+
+
+def seed(db, Company, User, adet: int) -> int:
+    from sqlalchemy import insert
+
+    user = User(email=f'bench-export-{time.time()}@example.com',
+                username=f'bench-export-{time.time()}', hashed_password='x')
+    db.add(user)
+    db.commit()
+    baslangic = datetime.utcnow() - timedelta(days=365)
+
+    for parca in range(0, adet, SEED_BATCH):
+        db.execute(insert(Company), [
+            {
+                'user_id': user.id,
+                'place_id': f'bench-export-{i}',
+                'firma_adi': f'Firma {i}',
+                'sehir': 'İstanbul',
+                'ilce': f'İlçe {i % 39}',
+                'ulke': 'Türkiye',
+                'adres': f'Örnek Mah. {i % 500}. Sok. No:{i % 120} Kadıköy/İstanbul',
+                'telefon': f'0216 {i:07d}',
+                'web': f'https://firma{i}.example.com',
+                'asama': 'Yeni',
+                'rating': 4.3,
+                'user_ratings_total': i % 1000,
+                'price_level': i % 4,
+                'kategori': 'emlak',
+                'created_at': baslangic + timedelta(seconds=i * 60),
+            }
+            for i in range(parca, min(parca + SEED_BATCH, adet))
+        ])
+        db.commit()
+    return user.id
+
+
+def eski_export(db, Company, user_id: int) -> int:
+    """Önceki implementasyon: tüm satırlar ve workbook bellekte"""
+    from openpyxl import Workbook
+
+    companies = db.query(Company).filter(Company.user_id == user_id) \
+        .order_by(Company.created_at.desc()).all()
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Sıra', 'Firma Adı', 'Şehir', 'İlçe', 'Kategori', 'Adres', 'Aşama',
+               'Telefon', 'Web', 'Rating', 'Değerlendirme Sayısı', 'Fiyat Seviyesi'])
+    for idx, c in enumerate(companies, 1):
+        ws.append([idx, c.firma_adi or '', c.sehir or '', c.ilce or '', c.kategori or '',
+                   c.adres or '', c.asama or '', c.telefon or '', c.web or '', c.rating or '',
+                   c.user_ratings_total or '', '₺' * (c.price_level + 1) if c.price_level is not None else ''])
+    output = io.BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return len(output.read())
+
+
+def yeni_export(db, Company, user_id: int) -> int:
+    """Route ile aynı akış: yield_per + write-only workbook + spooled dosya"""
+    from tempfile import SpooledTemporaryFile
+    import app.config as config
+    from app.routes.excel import excel_yaz
+    from app.services.company_filter_service import CompanyFilter, company_filter_service
+    from app.utils.stream import dosyayi_akit
+
+    stmt = company_filter_service.sorgu(user_id, CompanyFilter()) \
+        .order_by(Company.created_at.desc()) \
+        .execution_options(yield_per=config.EXPORT_BATCH_SIZE)
+    output = SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_SIZE)
+    excel_yaz(db.execute(stmt).scalars(), output)
+    # Yanıtın gönderilmesini taklit et
+    return sum(len(parca) for parca in dosyayi_akit(output))
+
+
+def csv_export(db, Company, user_id: int, gzip: bool = False) -> int:
+    """/api/export akışı: kolon projeksiyonu + CSV (isteğe bağlı gzip)"""
+    from app.routes.export import _satirlar, csv_akisi, gzip_akisi
+    from app.services.company_filter_service import CompanyFilter
+
+    akis = csv_akisi(_satirlar(user_id, CompanyFilter()))
+    if gzip:
+        akis = gzip_akisi(akis)
+    return sum(len(parca) for parca in akis)
+
+
+def parquet_export(db, Company, user_id: int) -> int:
+    from tempfile import SpooledTemporaryFile
+    import app.config as config
+    from app.routes.export import _satirlar, parquet_yaz
+    from app.services.company_filter_service import CompanyFilter
+    from app.utils.stream import dosyayi_akit
+
+    output = SpooledTemporaryFile(max_size=config.EXPORT_SPOOL_MAX_SIZE)
+    parquet_yaz(_satirlar(user_id, CompanyFilter()), output)
+    return sum(len(parca) for parca in dosyayi_akit(output))
+
+
+YONTEMLER = {
+    'eski': eski_export,
+    'yeni': yeni_export,
+    'csv': csv_export,
+    'csv.gz': lambda db, Company, user_id: csv_export(db, Company, user_id, gzip=True),
+    'parquet': parquet_export,
+}
+
+
+def calistir(yontem: str, user_id: int):
+    """Alt süreçte tek bir yöntemi çalıştır, sonucu JSON olarak yaz"""
+    from app.models.database import SessionLocal, Company
+
+    db = SessionLocal()
+    onceki_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    baslangic = time.perf_counter()
+    boyut = YONTEMLER[yontem](db, Company, user_id)
+    sure = time.perf_counter() - baslangic
+    db.close()
+    print(json.dumps({
+        'sure': sure,
+        'boyut': boyut,
+        'baslangic_rss_mb': onceki_rss / 1024,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--adet', type=int, default=500_000)
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    parser.add_argument('--yontem', action='append', choices=list(YONTEMLER),
+                        help='Ölçülecek yöntem (tekrarlanabilir, varsayılan: hepsi)')
+    parser.add_argument('--calistir', choices=list(YONTEMLER), help=argparse.SUPPRESS)
+    parser.add_argument('--user-id', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.calistir:
+        os.environ['DATABASE_URL'] = args.database_url
+        calistir(args.calistir, args.user_id)
+        return
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = database_url
+
+    from app.models.database import SessionLocal, User, Company, init_db
+
+    init_db()
+    db = SessionLocal()
+    baslangic = time.perf_counter()
+    user_id = seed(db, Company, User, args.adet)
+    db.close()
+    print(f"{args.adet} firma üretildi ({time.perf_counter() - baslangic:.1f} sn)")
+
+    yontemler = args.yontem or list(YONTEMLER)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        if 'parquet' in yontemler:
+            print("pyarrow kurulu değil, parquet atlanıyor")
+            yontemler.remove('parquet')
+
+    for yontem in yontemler:
+        cikti = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_excel_export', '--calistir', yontem,
+             '--database-url', database_url, '--user-id', str(user_id)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        sonuc = json.loads(cikti.strip().splitlines()[-1])
+        print(f"{yontem:>7}: {sonuc['sure']:7.1f} sn  "
+              f"peak RSS {sonuc['peak_rss_mb']:7.1f} MB "
+              f"(başlangıç {sonuc['baslangic_rss_mb']:.1f} MB)  "
+              f"dosya {sonuc['boyut'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Konum (yarıçap / sınır kutusu) filtresi benchmark'ı
+
+Tek kullanıcıya ait, şehir merkezlerinde kümelenmiş çok sayıda firmada
+yarıçap aramalarını iki yöntemle karşılaştırır:
+
+    tarama  lat/lng aralığı + mesafe koşulu (geohash'siz; kullanıcının tüm firmaları taranır)
+    geo     CompanyFilter yarıçap filtresi (geo_hucre aralıkları, index'ten)
+
+Her sorgu için firma listesinin ilk sayfası (created_at desc, 101 satır) ve
+eşleşen tüm firmaların sayısı (export gibi) ölçülür. Sonuç sayısı Python'da
+kaba kuvvetle hesaplanan mesafeyle de karşılaştırılır.
+
+Örnek sonuç (SQLite 3.40, 1.000.000 firma, sayfa p50 ms):
+
+    sorgu             eşleşen   tarama   geo (sayfa_sorgusu)
+    İstanbul 1 km         496     56.0        6.3
+    İstanbul 5 km       10831      4.2        8.5
+    İstanbul 25 km      69544      1.4        6.6
+    Kayseri 10 km       33831      2.9        4.0
+    İstanbul 100 km    137897      1.1        3.1
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_geo_radius --firma 1000000
+    python -m benchmarks.bench_geo_radius --database-url postgresql://...
+"""
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+# (ad, lat, lng)
+MERKEZLER = [
+    ('İstanbul', 41.015, 28.979), ('Ankara', 39.925, 32.866), ('İzmir', 38.423, 27.142),
+    ('Bursa', 40.195, 29.060), ('Antalya', 36.896, 30.713), ('Adana', 37.000, 35.321),
+    ('Konya', 37.871, 32.484), ('Gaziantep', 37.066, 37.383), ('Kayseri', 38.731, 35.478),
+    ('Trabzon', 41.002, 39.716),
+]
+
+# (merkez, yarıçap km)
+SORGULAR = [('İstanbul', 1), ('İstanbul', 5), ('İstanbul', 25), ('Kayseri', 10), ('İstanbul', 100)]
+
+
+def yuzdelik(sureler, oran):
+    sirali = sorted(sureler)
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--firma', type=int, default=1000000)
+    parser.add_argument('--tekrar', type=int, default=10, help='Sorgu başına ölçüm')
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from datetime import datetime, timedelta
+    from sqlalchemy import and_, func, insert, select
+    from app.models.database import Company, SessionLocal, User, engine, init_db
+    from app.routes.companies import YANIT_KOLONLARI
+    from app.services.company_filter_service import CompanyFilter, company_filter_service
+    from app.utils.geo import BOYLAM_KM, ENLEM_KM, geo_hucre, yaricap_kutusu
+
+    init_db()
+    db = SessionLocal()
+    user = User(email=f'bench-geo-{time.time()}@example.com', username=f'bench-geo-{time.time()}',
+                hashed_password='x')
+    db.add(user)
+    db.commit()
+    user_id = user.id
+
+    # %70 şehir merkezlerinde kümelenmiş, %30 Türkiye sınır kutusunda dağınık
+    rastgele = random.Random(42)
+    noktalar = []
+    for _ in range(args.firma):
+        if rastgele.random() < 0.7:
+            _, lat, lng = rastgele.choice(MERKEZLER)
+            noktalar.append((lat + rastgele.gauss(0, 0.08), lng + rastgele.gauss(0, 0.1)))
+        else:
+            noktalar.append((rastgele.uniform(36.0, 42.0), rastgele.uniform(26.0, 45.0)))
+
+    simdi = datetime.utcnow()
+    baslangic = time.perf_counter()
+    for parti in range(0, args.firma, 10000):
+        db.execute(insert(Company), [
+            {'user_id': user_id, 'firma_adi': f'Firma {i}', 'lat': lat, 'lng': lng,
+             'geo_hucre': geo_hucre(lat, lng), 'created_at': simdi - timedelta(seconds=i)}
+            for i, (lat, lng) in enumerate(noktalar[parti:parti + 10000], parti)
+        ])
+        db.commit()
+    print(f"{args.firma} firma yazıldı ({engine.dialect.name}, {time.perf_counter() - baslangic:.1f} sn)")
+
+    def tarama_kosulu(lat, lng, yaricap_km):
+        min_lat, min_lng, max_lat, max_lng = yaricap_kutusu(lat, lng, yaricap_km)
+        dy = (Company.lat - lat) * ENLEM_KM
+        dx = (Company.lng - lng) * (BOYLAM_KM * math.cos(math.radians(lat)))
+        return and_(Company.lat.between(min_lat, max_lat), Company.lng.between(min_lng, max_lng),
+                    dx * dx + dy * dy <= yaricap_km * yaricap_km)
+
+    def sorgu(yontem, lat, lng, yaricap_km, *kolonlar):
+        if yontem == 'geo':
+            filtre = CompanyFilter(lat=lat, lng=lng, yaricap_km=yaricap_km)
+            return company_filter_service.sorgu(user_id, filtre, *kolonlar)
+        return company_filter_service.sorgu(user_id, CompanyFilter(), *kolonlar).where(
+            tarama_kosulu(lat, lng, yaricap_km))
+
+    def olc(stmt, tekrar):
+        sureler = []
+        for _ in range(tekrar):
+            baslangic = time.perf_counter()
+            sonuc = db.execute(stmt).all()
+            sureler.append(time.perf_counter() - baslangic)
+        return sonuc, sureler
+
+    merkezler = {ad: (lat, lng) for ad, lat, lng in MERKEZLER}
+    print(f"{'sorgu':<16} {'yöntem':<7} {'sayfa p50':>10} {'sayfa p95':>10} {'sayım p50':>10} "
+          f"{'eşleşen':>8} {'doğru':>6}")
+    for ad, yaricap_km in SORGULAR:
+        lat, lng = merkezler[ad]
+        kx = BOYLAM_KM * math.cos(math.radians(lat))
+        beklenen = sum(((p_lat - lat) * ENLEM_KM) ** 2 + ((p_lng - lng) * kx) ** 2 <= yaricap_km ** 2
+                       for p_lat, p_lng in noktalar)
+        for yontem in ('tarama', 'geo'):
+            tekrar = args.tekrar if yontem == 'geo' else max(3, args.tekrar // 3)
+            sayfa_sureleri = []
+            if yontem == 'geo':
+                # GET /api/companies ile aynı sayfa sorgusu
+                sayfa = company_filter_service.sayfa_sorgusu(
+                    user_id, CompanyFilter(lat=lat, lng=lng, yaricap_km=yaricap_km), YANIT_KOLONLARI,
+                    Company.created_at, azalan=True, son=None, limit=101
+                )
+            else:
+                sayfa = sorgu(yontem, lat, lng, yaricap_km, *YANIT_KOLONLARI) \
+                    .order_by(Company.created_at.desc(), Company.id.desc()).limit(101)
+            for _ in range(tekrar):
+                baslangic = time.perf_counter()
+                db.execute(sayfa).all()
+                sayfa_sureleri.append(time.perf_counter() - baslangic)
+            sayim = sorgu(yontem, lat, lng, yaricap_km, Company.id).subquery()
+            sonuc, sayim_sureleri = olc(select(func.count()).select_from(sayim), tekrar)
+            eslesen = sonuc[0][0]
+            print(f"{f'{ad} {yaricap_km} km':<16} {yontem:<7} {yuzdelik(sayfa_sureleri, 0.5):>10.1f} "
+                  f"{yuzdelik(sayfa_sureleri, 0.95):>10.1f} {yuzdelik(sayim_sureleri, 0.5):>10.1f} "
+                  f"{eslesen:>8} {'evet' if eslesen == beklenen else 'HAYIR':>6}")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
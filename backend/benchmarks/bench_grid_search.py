@@ -0,0 +1,93 @@
+"""
+Izgara araması benchmark'ı
+
+Sorgu başına 60 sonuç sınırını taklit eden sahte bir alanda (FakeAlanClient,
+yarısı merkezde kümelenmiş işletmeler) isletme_ara'yı iki yöntemle çalıştırır:
+
+    duz     tek Text Search sorgusu, next_page_token ile sayfalama
+    izgara  şehir kutusu hücrelere bölünür, dolan hücreler alt hücrelere ayrılır
+
+Her limit için dönen firma sayısı, tekrar eden place_id, Text Search ve Place
+Details çağrıları, süre ve herhangi bir 1 saniyelik pencerede yapılan en fazla
+API çağrısı (rate limit bütçesiyle karşılaştırmak için) raporlanır. Izgarada
+firma sayısı min(limit, alandaki işletme) değilse, tekrar varsa veya bütçe
+aşıldıysa çıkış kodu 1'dir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_grid_search --isletme 3000 --limit 60 200 500 1000
+
+Örnek sonuç (3000 işletme, gecikme 5 ms, sayfa bekleme 0,5 sn, qps 200):
+
+    limit  yöntem  firma  text  süre (s)
+      200  duz        60     3      1,06
+      200  izgara    200    14      1,19
+     1000  izgara   1000    59      5,08
+     5000  izgara   3000   672     17,60   (alandaki tüm işletmeler, tekrar yok)
+"""
+import argparse
+import bisect
+import sys
+import time
+
+from app.services.cache_service import PlaceDetailsCache, TextSearchCache
+from app.services.google_maps_service import GoogleMapsService
+from app.utils.rate_limiter import TokenBucket
+from benchmarks.fake_googlemaps import FakeAlanClient
+
+# İstanbul'un yaklaşık sınır kutusu
+KUTU = (40.80, 28.50, 41.30, 29.40)
+
+
+def en_yogun_saniye(zamanlar) -> int:
+    zamanlar = sorted(zamanlar)
+    return max((bisect.bisect_left(zamanlar, t + 1.0) - i for i, t in enumerate(zamanlar)), default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--isletme', type=int, default=3000, help='Alandaki toplam işletme')
+    parser.add_argument('--limit', type=int, nargs='+', default=[60, 200, 500, 1000])
+    parser.add_argument('--gecikme', type=float, default=0.02, help='Çağrı başına gecikme (saniye)')
+    parser.add_argument('--sayfa-bekleme', type=float, default=0.5)
+    parser.add_argument('--qps', type=float, default=50, help='Global token bucket hızı')
+    args = parser.parse_args()
+
+    print(f"{args.isletme} işletme, gecikme={args.gecikme}s, sayfa bekleme={args.sayfa_bekleme}s, qps={args.qps}")
+    print(f"{'limit':>6} {'yöntem':<7} {'firma':>6} {'tekrar':>7} {'text':>5} {'detay':>6} "
+          f"{'süre (s)':>9} {'maks/sn':>8} {'doğru':>6}")
+    hatali = False
+    for limit in args.limit:
+        for yontem in ('duz', 'izgara'):
+            client = FakeAlanClient(KUTU, args.isletme, gecikme=args.gecikme)
+            service = GoogleMapsService(
+                client=client,
+                rate_limiter=TokenBucket(args.qps),
+                detay_cache=PlaceDetailsCache(ttl=0),
+                text_cache=TextSearchCache(ttl=0)
+            )
+            service.SAYFA_BEKLEME = args.sayfa_bekleme
+            if yontem == 'duz':
+                service.TEXT_SEARCH_SINIRI = sys.maxsize
+
+            baslangic = time.perf_counter()
+            firmalar = service.isletme_ara('İstanbul', 'Türkiye', 'emlak', limit=limit)
+            sure = time.perf_counter() - baslangic
+
+            place_ids = [firma['place_id'] for firma in firmalar]
+            tekrar = len(place_ids) - len(set(place_ids))
+            text = sum(tip == 'places' for _, tip in client.cagrilar)
+            detay = sum(tip == 'place' for _, tip in client.cagrilar)
+            # Kapasite 1 olan kovada 1 saniyede en fazla qps + 1 çağrı
+            maks = en_yogun_saniye([t for t, _ in client.cagrilar])
+            dogru = (len(firmalar) == min(limit, args.isletme) and not tekrar
+                     and maks <= args.qps + 1)
+            if yontem == 'izgara' and not dogru:
+                hatali = True
+            print(f"{limit:>6} {yontem:<7} {len(firmalar):>6} {tekrar:>7} {text:>5} {detay:>6} "
+                  f"{sure:>9.2f} {maks:>8} {'evet' if dogru else 'HAYIR':>6}")
+    if hatali:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
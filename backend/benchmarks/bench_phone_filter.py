@@ -0,0 +1,95 @@
+"""
+Telefon filtreli arama benchmark'ı
+
+Sahte client ile telefon_filtre=True aramasını iki yöntemle çalıştırır:
+
+    toplu  önceki akış: limit kadar Text Search sonucu, hepsinin detayı, sonra filtre
+    akis   isletme_ara: sayfalar detayları, detaylar filtreyi besler; limit kadar
+           telefonlu firma bulununca çağrılar durur
+
+Her telefon oranı için dönen firma sayısı, Text Search ve Place Details
+çağrıları ve süre raporlanır. "akis" modunda dönen firma sayısı
+min(limit, sorgudaki telefonlu işletme) değilse çıkış kodu 1'dir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_phone_filter --limit 20 --oran 1.0 0.7 0.4 0.2
+
+Örnek sonuç (limit 20, sorgu başına 60 sonuç, gecikme 50 ms, eşzamanlılık 8):
+
+    oran  yöntem  firma  text  detay  süre (s)
+     1.0  toplu      20     1     20      0.20
+     1.0  akis       20     1     20      0.20
+     0.4  toplu       8     1     20      0.20
+     0.4  akis       20     3     51      1.49
+     0.2  toplu       4     1     20      0.20
+     0.2  akis       12     3     60      1.19
+"""
+import argparse
+import sys
+import time
+
+from app.services.cache_service import PlaceDetailsCache, TextSearchCache
+from app.services.google_maps_service import GoogleMapsService, detay_alanlari
+from app.utils.rate_limiter import TokenBucket
+from benchmarks.fake_googlemaps import FakeGoogleMapsClient
+
+SEHIR, ULKE, KATEGORI = 'İstanbul', 'Türkiye', 'emlak'
+
+
+def toplu(service: GoogleMapsService, limit: int):
+    # Önceki uygulama: önce tüm place_id'ler, sonra tüm detaylar, en son filtre
+    alanlar = detay_alanlari('tam', telefon_filtre=True)
+    query = service._sorgu_olustur(KATEGORI, SEHIR, ULKE)
+    place_ids = service._place_idleri_topla(query, limit)
+    detaylar = service._detaylari_getir(place_ids, alanlar)
+    return service._firmalari_olustur(place_ids, detaylar, SEHIR, ULKE, True, alanlar)
+
+
+def akis(service: GoogleMapsService, limit: int):
+    return service.isletme_ara(SEHIR, ULKE, KATEGORI, limit=limit, telefon_filtre=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--oran', type=float, nargs='+', default=[1.0, 0.7, 0.4, 0.2],
+                        help='Telefonu olan işletme oranı')
+    parser.add_argument('--sonuc', type=int, default=60, help='Sorgu başına Text Search sonucu')
+    parser.add_argument('--gecikme', type=float, default=0.05, help='Çağrı başına gecikme (saniye)')
+    parser.add_argument('--sayfa-bekleme', type=float, default=0.5)
+    parser.add_argument('--eszamanlilik', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"limit={args.limit}, sorgu başına {args.sonuc} sonuç, gecikme={args.gecikme}s, "
+          f"sayfa bekleme={args.sayfa_bekleme}s, eşzamanlılık={args.eszamanlilik}")
+    print(f"{'oran':>5} {'yöntem':<7} {'firma':>6} {'text':>5} {'detay':>6} {'süre (s)':>9} {'doğru':>6}")
+    hatali = False
+    for oran in args.oran:
+        for ad, yontem in (('toplu', toplu), ('akis', akis)):
+            client = FakeGoogleMapsClient(sonuc_sayisi=args.sonuc, gecikme=args.gecikme, telefon_orani=oran)
+            service = GoogleMapsService(
+                client=client,
+                rate_limiter=TokenBucket(0),
+                detay_eszamanlilik=args.eszamanlilik,
+                detay_cache=PlaceDetailsCache(ttl=0),
+                text_cache=TextSearchCache(ttl=0)
+            )
+            service.SAYFA_BEKLEME = args.sayfa_bekleme
+
+            baslangic = time.perf_counter()
+            firmalar = yontem(service, args.limit)
+            sure = time.perf_counter() - baslangic
+
+            telefonlu = sum(client.telefonlu_mu(i) for i in range(args.sonuc))
+            dogru = (len(firmalar) == min(args.limit, telefonlu)
+                     and all(firma['telefon'] for firma in firmalar))
+            if ad == 'akis' and not dogru:
+                hatali = True
+            print(f"{oran:>5} {ad:<7} {len(firmalar):>6} {client.places_cagri:>5} {client.place_cagri:>6} "
+                  f"{sure:>9.2f} {'evet' if dogru else 'HAYIR':>6}")
+    if hatali:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
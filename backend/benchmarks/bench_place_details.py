@@ -0,0 +1,59 @@
+"""
+Place Details eşzamanlılık benchmark'ı
+
+Gecikme enjekte edilmiş sahte client ile isletme_ara'nın duvar saati
+süresinin detay eşzamanlılığına göre nasıl ölçeklendiğini gösterir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_place_details --limit 60 --gecikme 0.1
+"""
+import argparse
+import time
+
+from app.services.google_maps_service import GoogleMapsService
+from app.utils.rate_limiter import TokenBucket
+from app.services.cache_service import PlaceDetailsCache, TextSearchCache
+from benchmarks.fake_googlemaps import FakeGoogleMapsClient
+
+
+def calistir(limit: int, gecikme: float, eszamanlilik: int, qps: float) -> float:
+    client = FakeGoogleMapsClient(sonuc_sayisi=limit, gecikme=gecikme)
+    service = GoogleMapsService(
+        client=client,
+        rate_limiter=TokenBucket(qps),
+        detay_cache=PlaceDetailsCache(ttl=0),
+        text_cache=TextSearchCache(ttl=0),
+        detay_eszamanlilik=eszamanlilik
+    )
+    # Sayfa bekleme süresi detay aşamasını ölçmeyi gölgelemesin
+    service.SAYFA_BEKLEME = 0
+
+    baslangic = time.perf_counter()
+    sonuclar = service.isletme_ara(sehir='İstanbul', ulke='Türkiye', kategori='emlak', limit=limit)
+    sure = time.perf_counter() - baslangic
+
+    assert [s['firma_adi'] for s in sonuclar] == [
+        f'İşletme emlak İstanbul Türkiye:{i}' for i in range(limit)
+    ], "Sonuç sırası Text Search sırasıyla aynı olmalı"
+    return sure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--limit', type=int, default=60)
+    parser.add_argument('--gecikme', type=float, default=0.1, help='Çağrı başına gecikme (saniye)')
+    parser.add_argument('--qps', type=float, default=0, help='Token bucket hızı (0: sınırsız)')
+    parser.add_argument('--eszamanlilik', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"limit={args.limit} gecikme={args.gecikme}s qps={args.qps or 'sınırsız'}")
+    print(f"{'eşzamanlılık':>13} {'süre (s)':>10} {'hızlanma':>9}")
+    temel = None
+    for eszamanlilik in args.eszamanlilik:
+        sure = calistir(args.limit, args.gecikme, eszamanlilik, args.qps)
+        temel = temel or sure
+        print(f"{eszamanlilik:>13} {sure:>10.2f} {temel / sure:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Firma kaydetme benchmark'ı
+
+save_companies_to_db ile 10k firmanın ilk kaydını (insert) ve tekrar
+kaydını (update) ölçer; karşılaştırma için eski satır satır yöntemi de
+çalıştırır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_save_companies --adet 10000
+    python -m benchmarks.bench_save_companies --database-url postgresql://...
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def firma_uret(adet: int, sehir: str = 'İstanbul'):
+    return [
+        {
+            'place_id': f'ChIJ{sehir}{i}',
+            'firma_adi': f'Firma {i}',
+            'adres': f'{sehir} Cad. No:{i}',
+            'telefon': f'0212 000 {i % 10000:04d}',
+            'web': '',
+            'sehir': sehir,
+            'ilce': f'İlçe {i % 39}',
+            'ulke': 'Türkiye',
+            'rating': 4.2,
+            'user_ratings_total': i,
+            'price_level': None,
+            'business_status': 'OPERATIONAL',
+            'international_phone_number': '',
+            'url': f'https://maps.google.com/?cid={i}',
+            'plus_code': '',
+            'type': '',
+            'types': 'real_estate_agency'
+        }
+        for i in range(adet)
+    ]
+
+
+def eski_kaydet(db, Company, user_id, companies, kategori):
+    """Önceki implementasyon: her firma için ayrı SELECT"""
+    for company_data in companies:
+        existing = db.query(Company).filter(
+            Company.user_id == user_id,
+            Company.firma_adi == company_data['firma_adi'],
+            Company.adres == company_data.get('adres', '')
+        ).first()
+        if existing:
+            for key, value in company_data.items():
+                if hasattr(existing, key) and value is not None:
+                    setattr(existing, key, value)
+            if kategori:
+                existing.kategori = kategori
+        else:
+            db.add(Company(user_id=user_id, kategori=kategori,
+                           **{k: v for k, v in company_data.items() if k != 'place_id'}))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--adet', type=int, default=10000)
+    parser.add_argument('--database-url', default=None, help='Varsayılan: geçici SQLite dosyası')
+    parser.add_argument('--eski', action='store_true', help='Eski satır satır yöntemi de ölç')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    from app.models.database import SessionLocal, User, Company, init_db
+    from app.services.company_service import save_companies_to_db
+
+    init_db()
+    db = SessionLocal()
+    kullanicilar = []
+    for ad in ('yeni', 'eski'):
+        user = User(email=f'bench-{ad}-{time.time()}@example.com', username=f'bench-{ad}-{time.time()}',
+                    hashed_password='x')
+        db.add(user)
+        db.commit()
+        kullanicilar.append(user.id)
+
+    companies = firma_uret(args.adet)
+    print(f"{args.adet} firma, {os.environ['DATABASE_URL'].split('://')[0]}")
+
+    yontemler = [('toplu upsert', lambda uid: save_companies_to_db(db, uid, companies, 'emlak'))]
+    if args.eski:
+        yontemler.append(('satır satır', lambda uid: eski_kaydet(db, Company, uid, companies, 'emlak')))
+
+    for (ad, kaydet), user_id in zip(yontemler, kullanicilar):
+        for asama in ('insert', 'update'):
+            baslangic = time.perf_counter()
+            kaydet(user_id)
+            sure = time.perf_counter() - baslangic
+            print(f"{ad:>14} {asama:>7}: {sure:8.2f} s ({args.adet / sure:,.0f} firma/s)")
+
+        adet = db.query(Company).filter(Company.user_id == user_id).count()
+        assert adet == args.adet, f"{adet} != {args.adet}"
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
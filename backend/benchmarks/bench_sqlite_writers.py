@@ -0,0 +1,172 @@
+"""
+SQLite eşzamanlı yazma benchmark'ı
+
+Aynı anda çalışan kredi düşümleri (CreditService.deduct_credit), arka plan
+firma kayıtları (save_companies_to_db) ve sürekli firma listesi okuyan bir
+okuyucuyu iki engine ile karşılaştırır:
+
+    varsayilan  create_engine(url) (rollback journal, synchronous=FULL)
+    ayarli      config'teki havuz ayarları + PRAGMA'lar (WAL, NORMAL, ...)
+
+Her mod kendi geçici veritabanı dosyasında çalışır (journal modu dosyada
+kalıcıdır).
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_sqlite_writers --yazici 8 --islem 200
+    python -m benchmarks.bench_sqlite_writers --okuma-suresi 6   # export kadar uzun okuma
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def yuzdelik(sureler, oran):
+    sirali = sorted(sureler)
+    return sirali[min(len(sirali) - 1, int(len(sirali) * oran))] * 1000 if sirali else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--yazici', type=int, default=8, help='Kredi düşen thread sayısı')
+    parser.add_argument('--islem', type=int, default=200, help='Thread başına kredi düşümü')
+    parser.add_argument('--kaydedici', type=int, default=2, help='Firma kaydeden thread sayısı')
+    parser.add_argument('--parti', type=int, default=200, help='Kayıt başına firma')
+    parser.add_argument('--firma', type=int, default=20000, help='Başlangıçta okunacak firma sayısı')
+    parser.add_argument('--okuma-suresi', type=float, default=1.0,
+                        help='Okuyucunun bir taramayı yaydığı süre (saniye, akan export gibi)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'app.db')
+
+    import logging
+    logging.disable(logging.INFO)
+
+    from sqlalchemy import create_engine, func, insert, select
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+    from app.models.database import Base, Company, Transaction, User, engine_ayarlari, sqlite_ayarla
+    from app.services.company_service import save_companies_to_db
+    from app.services.credit_service import CreditService
+
+    def engine_olustur(mod, url):
+        if mod == 'varsayilan':
+            return create_engine(url, connect_args={"check_same_thread": False})
+        engine = create_engine(url, connect_args={"check_same_thread": False}, **engine_ayarlari(url))
+        sqlite_ayarla(engine)
+        return engine
+
+    def calistir(mod):
+        url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), f'{mod}.db')
+        engine = engine_olustur(mod, url)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(engine)
+
+        db = Session()
+        kullanicilar = [User(email=f'w{i}@example.com', username=f'w{i}', hashed_password='x',
+                             balance=args.islem * 10) for i in range(args.yazici + args.kaydedici)]
+        db.add_all(kullanicilar)
+        db.commit()
+        user_ids = [u.id for u in kullanicilar]
+        db.execute(insert(Company), [
+            {'user_id': user_ids[0], 'firma_adi': f'Firma {i}', 'sehir': 'İstanbul', 'telefon': '0212'}
+            for i in range(args.firma)
+        ])
+        db.commit()
+        db.close()
+
+        sureler, hatalar, okumalar = [], [], [0]
+        kilit = threading.Lock()
+        bitti = threading.Event()
+
+        def kaydet(sure=None, hata=None):
+            with kilit:
+                if hata is not None:
+                    hatalar.append(hata)
+                else:
+                    sureler.append(sure)
+
+        def kredi_dus(user_id):
+            db = Session()
+            try:
+                for _ in range(args.islem):
+                    baslangic = time.perf_counter()
+                    try:
+                        CreditService.deduct_credit(db, user_id, 1, 'bench')
+                        kaydet(sure=time.perf_counter() - baslangic)
+                    except OperationalError as e:
+                        db.rollback()
+                        kaydet(hata=e)
+            finally:
+                db.close()
+
+        def firma_kaydet(user_id):
+            db = Session()
+            try:
+                for parti in range(args.islem // 20):
+                    firmalar = [{'place_id': f'{user_id}-{parti}-{i}', 'firma_adi': f'Yeni {i}', 'adres': ''}
+                                for i in range(args.parti)]
+                    baslangic = time.perf_counter()
+                    try:
+                        save_companies_to_db(db, user_id, firmalar, 'bench')
+                        kaydet(sure=time.perf_counter() - baslangic)
+                    except OperationalError as e:
+                        db.rollback()
+                        kaydet(hata=e)
+            finally:
+                db.close()
+
+        def oku():
+            # Akan export benzeri uzun okuma: satırlar okuma süresine yayılır
+            bekleme = args.okuma_suresi / max(1, args.firma // 1000)
+            db = Session()
+            try:
+                while not bitti.is_set():
+                    for i, _ in enumerate(db.execute(
+                        select(Company.id, Company.firma_adi)
+                        .where(Company.user_id == user_ids[0])
+                        .execution_options(yield_per=1000)  # export'taki gibi imleç açık kalır
+                    )):
+                        if i % 1000 == 999:
+                            time.sleep(bekleme)
+                    db.commit()
+                    okumalar[0] += 1
+            finally:
+                db.close()
+
+        okuyucu = threading.Thread(target=oku)
+        okuyucu.start()
+        threadler = [threading.Thread(target=kredi_dus, args=(uid,)) for uid in user_ids[:args.yazici]]
+        threadler += [threading.Thread(target=firma_kaydet, args=(uid,)) for uid in user_ids[args.yazici:]]
+        baslangic = time.perf_counter()
+        for t in threadler:
+            t.start()
+        for t in threadler:
+            t.join()
+        toplam = time.perf_counter() - baslangic
+        bitti.set()
+        okuyucu.join()
+
+        db = Session()
+        islem_sayisi = db.execute(select(func.count()).select_from(Transaction)).scalar()
+        db.close()
+        engine.dispose()
+
+        kilitli = sum('locked' in str(e) for e in hatalar)
+        print(f"{mod:<11} {len(sureler) / toplam:>8.0f} {yuzdelik(sureler, 0.5):>8.1f} "
+              f"{yuzdelik(sureler, 0.95):>8.1f} {yuzdelik(sureler, 0.99):>8.1f} "
+              f"{len(hatalar):>6} {kilitli:>7} {okumalar[0]:>7} {islem_sayisi:>8}")
+        if hatalar:
+            print(f"{'':<11} ilk hata: {str(hatalar[0]).splitlines()[0]}")
+
+    print(f"{args.yazici} kredi thread'i x {args.islem} düşüm, {args.kaydedici} kayıt thread'i "
+          f"x {args.islem // 20} parti ({args.parti} firma), 1 okuyucu ({args.firma} satır / {args.okuma_suresi:g} sn)")
+    print(f"{'mod':<11} {'yazma/sn':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'hata':>6} {'kilitli':>7} {'okuma':>7} {'işlem':>8}")
+    for mod in ('varsayilan', 'ayarli'):
+        calistir(mod)
+
+
+if __name__ == '__main__':
+    main()
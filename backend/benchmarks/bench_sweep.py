@@ -0,0 +1,69 @@
+"""
+Çok şehirli tarama benchmark'ı
+
+Sahte client ile tum_sehirlerde_ara'nın duvar saati süresini farklı
+eşzamanlılık seviyelerinde ölçer. Sayfa token beklemeleri diğer şehirlerin
+çağrılarıyla örtüştüğü için süre eşzamanlılıkla yaklaşık orantılı düşmelidir.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_sweep --sehir-sayisi 81 --limit 40
+"""
+import argparse
+import time
+
+import app.config as config
+from app.services.google_maps_service import GoogleMapsService
+from app.services.sweep_service import SweepService
+from app.utils.rate_limiter import TokenBucket
+from app.services.cache_service import PlaceDetailsCache, TextSearchCache
+from benchmarks.fake_googlemaps import FakeGoogleMapsClient
+
+
+def calistir(sehirler, limit: int, gecikme: float, sayfa_bekleme: float,
+             eszamanlilik: int, qps: float) -> float:
+    client = FakeGoogleMapsClient(sonuc_sayisi=limit, gecikme=gecikme)
+    service = GoogleMapsService(
+        client=client,
+        rate_limiter=TokenBucket(qps),
+        detay_cache=PlaceDetailsCache(ttl=0),
+        text_cache=TextSearchCache(ttl=0)
+    )
+    service.SAYFA_BEKLEME = sayfa_bekleme
+    sweep = SweepService(service, eszamanlilik=eszamanlilik)
+
+    biten = []
+    baslangic = time.perf_counter()
+    sonuclar = sweep.tara(
+        kategori='emlak', ulke='Türkiye', sehirler=sehirler, limit_per_sehir=limit,
+        ilerleme=lambda olay: biten.append(olay['sehir']) if olay['durum'] == 'tamamlandi' else None
+    )
+    sure = time.perf_counter() - baslangic
+
+    assert len(sonuclar) == len(sehirler) * limit
+    assert sorted(biten) == sorted(sehirler)
+    return sure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sehir-sayisi', type=int, default=81)
+    parser.add_argument('--limit', type=int, default=40, help='Şehir başına sonuç')
+    parser.add_argument('--gecikme', type=float, default=0.05, help='Çağrı başına gecikme (saniye)')
+    parser.add_argument('--sayfa-bekleme', type=float, default=2.0)
+    parser.add_argument('--qps', type=float, default=0, help='Global token bucket hızı (0: sınırsız)')
+    parser.add_argument('--eszamanlilik', type=int, nargs='+', default=[4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    sehirler = config.TURKIYE_SEHIRLERI[:args.sehir_sayisi]
+    print(f"{len(sehirler)} şehir, şehir başına {args.limit} sonuç, gecikme={args.gecikme}s, "
+          f"sayfa bekleme={args.sayfa_bekleme}s, qps={args.qps or 'sınırsız'}")
+    print(f"{'eşzamanlılık':>13} {'süre (s)':>10} {'hızlanma':>9}")
+    temel = None
+    for eszamanlilik in args.eszamanlilik:
+        sure = calistir(sehirler, args.limit, args.gecikme, args.sayfa_bekleme, eszamanlilik, args.qps)
+        temel = temel or sure
+        print(f"{eszamanlilik:>13} {sure:>10.2f} {temel / sure:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
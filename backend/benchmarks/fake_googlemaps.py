@@ -0,0 +1,214 @@
+"""
+Benchmark'lar için sahte googlemaps.Client
+
+Gerçek API'ye gitmeden gecikme enjekte ederek Text Search ve Place Details
+çağrılarını taklit eder.
+"""
+import heapq
+import math
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Place Details alan maskesindeki ad -> yanıttaki anahtar (aynı olanlar yazılmaz)
+_YANIT_ANAHTARLARI = {'address_component': 'address_components', 'type': 'types'}
+
+
+def _alanlari_sec(sonuc: Dict, fields: Optional[List[str]]) -> Dict:
+    """Google gibi sadece istenen alanları döndür (fields verilmezse hepsi)"""
+    if not fields:
+        return sonuc
+    istenen = {_YANIT_ANAHTARLARI.get(alan, alan) for alan in fields}
+    return {anahtar: deger for anahtar, deger in sonuc.items() if anahtar in istenen}
+
+
+class FakeGoogleMapsClient:
+    """
+    googlemaps.Client'ın places() ve place() metodlarını taklit eder
+
+    place() sadece fields'ta istenen alanları döndürür; her çağrının alan
+    listesi istenen_alanlar'a kaydedilir.
+    """
+
+    SAYFA_BOYUTU = 20
+
+    def __init__(self, sonuc_sayisi: int = 60, gecikme: float = 0.05,
+                 telefon_orani: float = 1.0):
+        """
+        Args:
+            sonuc_sayisi: Her sorgu için dönecek toplam sonuç (Google'da en fazla 60)
+            gecikme: Her çağrı için enjekte edilen ağ gecikmesi (saniye)
+            telefon_orani: Telefon numarası olan işletmelerin oranı (0-1)
+        """
+        self.sonuc_sayisi = sonuc_sayisi
+        self.gecikme = gecikme
+        self.telefon_orani = telefon_orani
+        self.places_cagri = 0
+        self.place_cagri = 0
+        self.istenen_alanlar: List[Optional[List[str]]] = []
+        self._lock = threading.Lock()
+
+    def places(self, query: str, language: Optional[str] = None,
+               page_token: Optional[str] = None, **kwargs) -> Dict:
+        with self._lock:
+            self.places_cagri += 1
+        time.sleep(self.gecikme)
+
+        baslangic = int(page_token.rsplit(':', 1)[1]) if page_token else 0
+        bitis = min(baslangic + self.SAYFA_BOYUTU, self.sonuc_sayisi)
+        sonuc = {
+            'results': [
+                {'place_id': f'{query}:{i}', 'name': f'{query} #{i}'}
+                for i in range(baslangic, bitis)
+            ]
+        }
+        if bitis < self.sonuc_sayisi:
+            sonuc['next_page_token'] = f'{query}:{bitis}'
+        return sonuc
+
+    def geocode(self, address: str, **kwargs) -> List[Dict]:
+        # Konumsuz sahte: ızgara araması yerine düz arama yapılır
+        return []
+
+    def telefonlu_mu(self, sira: int) -> bool:
+        # Telefonlu işletmeler sonuç listesine eşit dağılır
+        return (sira * 37 % 100) < self.telefon_orani * 100
+
+    def place(self, place_id: str, language: Optional[str] = None,
+              fields: Optional[List[str]] = None, **kwargs) -> Dict:
+        with self._lock:
+            self.place_cagri += 1
+            self.istenen_alanlar.append(fields)
+        time.sleep(self.gecikme)
+
+        sira = int(place_id.rsplit(':', 1)[1])
+        telefonlu = self.telefonlu_mu(sira)
+        return {
+            'result': _alanlari_sec({
+                'place_id': place_id,
+                'name': f'İşletme {place_id}',
+                'formatted_address': f'{place_id} adresi',
+                'formatted_phone_number': f'0212 000 {sira:04d}' if telefonlu else None,
+                'international_phone_number': f'+90 212 000 {sira:04d}' if telefonlu else None,
+                'website': f'https://isletme{sira}.example.com',
+                'geometry': {'location': {'lat': 41.0 + sira / 10000, 'lng': 29.0 + sira / 10000}},
+                'address_components': [],
+                'rating': 4.5,
+                'user_ratings_total': sira,
+                'url': f'https://maps.google.com/?cid={sira}',
+            }, fields)
+        }
+
+
+class FakeAlanClient:
+    """
+    Konumlu işletmelerin olduğu bir alanda Text Search'ü taklit eder
+
+    Google gibi her sorgu için en fazla 60 sonuç (20'şer sayfa) döner:
+    location verilirse merkeze en yakın 60 işletme (radius yalnızca yanlılık
+    olduğu için dışındakiler de gelir), verilmezse ilk 60 işletme.
+
+    geocode() alanın sınır kutusunu viewport olarak döndürür. Her çağrının
+    zamanı rate limit kontrolü için kaydedilir.
+    """
+
+    SAYFA_BOYUTU = 20
+    SINIR = 60
+
+    def __init__(self, kutu: Tuple[float, float, float, float], isletme_sayisi: int,
+                 gecikme: float = 0.05, telefon_orani: float = 1.0, tohum: int = 42):
+        """
+        Args:
+            kutu: Alanın sınır kutusu (min_lat, min_lng, max_lat, max_lng)
+            isletme_sayisi: Alandaki toplam işletme (yarısı merkezde kümelenmiş)
+            gecikme: Her çağrı için enjekte edilen ağ gecikmesi (saniye)
+            telefon_orani: Telefon numarası olan işletmelerin oranı (0-1)
+        """
+        self.kutu = kutu
+        self.gecikme = gecikme
+        self.telefon_orani = telefon_orani
+        min_lat, min_lng, max_lat, max_lng = kutu
+        orta_lat, orta_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+        rastgele = random.Random(tohum)
+        self.isletmeler: List[Tuple[float, float]] = []
+        for i in range(isletme_sayisi):
+            if i % 2:
+                lat = min(max_lat, max(min_lat, rastgele.gauss(orta_lat, (max_lat - min_lat) / 10)))
+                lng = min(max_lng, max(min_lng, rastgele.gauss(orta_lng, (max_lng - min_lng) / 10)))
+            else:
+                lat, lng = rastgele.uniform(min_lat, max_lat), rastgele.uniform(min_lng, max_lng)
+            self.isletmeler.append((lat, lng))
+        self.cagrilar: List[Tuple[float, str]] = []
+        self._sonuclar: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _kaydet(self, tip: str):
+        with self._lock:
+            self.cagrilar.append((time.monotonic(), tip))
+        time.sleep(self.gecikme)
+
+    def geocode(self, address: str, **kwargs) -> List[Dict]:
+        self._kaydet('geocode')
+        min_lat, min_lng, max_lat, max_lng = self.kutu
+        return [{'geometry': {'viewport': {'southwest': {'lat': min_lat, 'lng': min_lng},
+                                           'northeast': {'lat': max_lat, 'lng': max_lng}}}}]
+
+    def places(self, query: str, location: Optional[Tuple[float, float]] = None,
+               radius: Optional[int] = None, language: Optional[str] = None,
+               page_token: Optional[str] = None, **kwargs) -> Dict:
+        self._kaydet('places')
+
+        if page_token:
+            anahtar, baslangic = page_token.rsplit(':', 1)
+            baslangic = int(baslangic)
+            with self._lock:
+                siralar = self._sonuclar[anahtar]
+        else:
+            baslangic = 0
+            if location is None:
+                siralar = list(range(min(self.SINIR, len(self.isletmeler))))
+            else:
+                lat, lng = location
+                kx = math.cos(math.radians(lat))
+                siralar = heapq.nsmallest(
+                    self.SINIR, range(len(self.isletmeler)),
+                    key=lambda i: (self.isletmeler[i][0] - lat) ** 2 + ((self.isletmeler[i][1] - lng) * kx) ** 2
+                )
+            with self._lock:
+                anahtar = f'sorgu{len(self._sonuclar)}'
+                self._sonuclar[anahtar] = siralar
+
+        bitis = min(baslangic + self.SAYFA_BOYUTU, len(siralar))
+        sonuc = {'results': [
+            {'place_id': f'alan:{i}', 'name': f'{query} #{i}',
+             'geometry': {'location': {'lat': self.isletmeler[i][0], 'lng': self.isletmeler[i][1]}}}
+            for i in siralar[baslangic:bitis]
+        ]}
+        if bitis < len(siralar):
+            sonuc['next_page_token'] = f'{anahtar}:{bitis}'
+        return sonuc
+
+    def telefonlu_mu(self, sira: int) -> bool:
+        # Telefonlu işletmeler sonuç listesine eşit dağılır
+        return (sira * 37 % 100) < self.telefon_orani * 100
+
+    def place(self, place_id: str, language: Optional[str] = None,
+              fields: Optional[List[str]] = None, **kwargs) -> Dict:
+        self._kaydet('place')
+        sira = int(place_id.rsplit(':', 1)[1])
+        lat, lng = self.isletmeler[sira]
+        telefonlu = self.telefonlu_mu(sira)
+        return {
+            'result': _alanlari_sec({
+                'place_id': place_id,
+                'name': f'İşletme {place_id}',
+                'formatted_address': f'{place_id} adresi',
+                'formatted_phone_number': f'0212 000 {sira:04d}' if telefonlu else None,
+                'geometry': {'location': {'lat': lat, 'lng': lng}},
+                'address_components': [],
+                'rating': 4.5,
+                'user_ratings_total': sira,
+                'url': f'https://maps.google.com/?cid={sira}',
+            }, fields)
+        }
@@ -0,0 +1,106 @@
+"""
+Firma listesi filtreleri için sorgu planlarını göster
+
+GET /api/companies ve /api/excel/export'un ürettiği filtre kombinasyonları
+ile q ve yarıçap filtreleri için veritabanının seçtiği planı yazdırır
+(SQLite: EXPLAIN QUERY PLAN, Postgres: EXPLAIN).
+
+Kullanım (backend klasöründen):
+    python -m scripts.explain_company_filters
+    DATABASE_URL=postgresql://... python -m scripts.explain_company_filters --analyze
+"""
+import argparse
+import itertools
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.database import Company, engine, init_db
+from app.services.company_filter_service import CompanyFilter, company_filter_service
+
+FILTRELER = ('sehir', 'ilce', 'asama', 'telefon')
+
+# Route'ların gönderebileceği tüm filtre kombinasyonları (telefon: var/yok)
+FILTRE_KOMBINASYONLARI = [
+    dict(zip(anahtarlar, degerler))
+    for r in range(len(FILTRELER) + 1)
+    for anahtarlar in itertools.combinations(FILTRELER, r)
+    for degerler in itertools.product(*[
+        ('var', 'yok') if anahtar == 'telefon' else (None,) for anahtar in anahtarlar
+    ])
+]
+
+
+# Kendi index'i olan filtreler (FTS/GIN, geo_hucre): örnek firmanın adı ve konumu çevresi
+SECICI_ORNEKLER = [
+    lambda ornek: {'q': ornek['q']},
+    lambda ornek: {'q': ornek['q'][:2]},
+    lambda ornek: {'lat': ornek['lat'], 'lng': ornek['lng'], 'yaricap_km': 1},
+    lambda ornek: {'lat': ornek['lat'], 'lng': ornek['lng'], 'yaricap_km': 25},
+]
+
+
+def filtreli_sorgu(user_id: int, limit=None, sehir=None, ilce=None, asama=None, telefon=None, **digerleri):
+    """Route'ların kullandığı filtre servisiyle aynı select()'i kur (limit: GET /api/companies sayfası)"""
+    filtre = CompanyFilter(sehir_filtre=sehir, ilce_filtre=ilce, asama_filtre=asama, telefon_filtre=telefon,
+                           **digerleri)
+    if limit:
+        return company_filter_service.sayfa_sorgusu(
+            user_id, filtre, [Company.id], Company.created_at, azalan=True, son=None, limit=limit
+        )
+    return company_filter_service.sorgu(user_id, filtre).order_by(Company.created_at.desc())
+
+
+def ornek_degerler(db: Session):
+    """Plan için gerçekçi değerler: en çok firması olan kullanıcı ve onun bir firması"""
+    row = db.execute(text(
+        "SELECT user_id, COUNT(*) AS n FROM companies GROUP BY user_id ORDER BY n DESC LIMIT 1"
+    )).first()
+    if row is None:
+        return 1, {'sehir': 'İstanbul', 'ilce': 'Kadıköy', 'asama': 'Yeni', 'q': 'emlak', 'lat': 41.0, 'lng': 29.0}
+    company = db.query(Company).filter(Company.user_id == row.user_id, Company.lat.isnot(None)).first()
+    company = company or db.query(Company).filter(Company.user_id == row.user_id).first()
+    return row.user_id, {
+        'sehir': company.sehir, 'ilce': company.ilce, 'asama': company.asama,
+        'q': company.firma_adi.split()[0], 'lat': company.lat or 41.0, 'lng': company.lng or 29.0,
+    }
+
+
+def plan(db: Session, stmt, analyze: bool = False) -> str:
+    """Sorgunun planını metin olarak döndür"""
+    sql = str(stmt.compile(db.bind, compile_kwargs={"literal_binds": True}))
+    if db.bind.dialect.name == 'sqlite':
+        rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return '\n'.join(f"  {row[-1]}" for row in rows)
+    onek = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+    rows = db.execute(text(f"{onek} {sql}")).all()
+    return '\n'.join(f"  {row[0]}" for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--analyze', action='store_true', help='Postgres: EXPLAIN ANALYZE çalıştır')
+    parser.add_argument('--limit', type=int, default=None, help='Sayfalı liste sorgusunun (sayfa_sorgusu) planını göster')
+    args = parser.parse_args()
+
+    init_db()
+    db = Session(bind=engine)
+    user_id, ornek = ornek_degerler(db)
+    print(f"Veritabanı: {engine.dialect.name}, user_id={user_id}, örnek={ornek}\n")
+
+    ornek_filtreler = [
+        {k: (v if k == 'telefon' else ornek[k]) for k, v in kombinasyon.items()}
+        for kombinasyon in FILTRE_KOMBINASYONLARI
+    ] + [secici(ornek) for secici in SECICI_ORNEKLER]
+    for filtreler in ornek_filtreler:
+        stmt = filtreli_sorgu(user_id, args.limit, **filtreler)
+        baslik = ', '.join(f"{k}={v}" for k, v in filtreler.items()) or 'filtre yok'
+        print(f"[{baslik}]")
+        print(plan(db, stmt, analyze=args.analyze))
+        print()
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
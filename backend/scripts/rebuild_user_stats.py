@@ -0,0 +1,35 @@
+"""
+Dashboard sayaçlarını yeniden hesapla
+
+user_stats tablosundaki toplam ve günlük sayaçları queries/companies
+tablolarından baştan hesaplar. Artırımlı güncellemelerin dışında kalan
+değişikliklerden (elle silme, eski sürümden geçiş vb.) sonra çalıştırılır.
+
+Kullanım (backend klasöründen):
+    python -m scripts.rebuild_user_stats
+    python -m scripts.rebuild_user_stats --user-id 42
+"""
+import argparse
+import time
+
+from app.models.database import SessionLocal, init_db
+from app.services.stats_service import StatsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user-id', type=int, default=None, help='Sadece bu kullanıcı')
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        baslangic = time.perf_counter()
+        adet = StatsService.yeniden_hesapla(db, args.user_id)
+        print(f"{adet} kullanıcının sayaçları güncellendi ({time.perf_counter() - baslangic:.2f} sn)")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,44 +4,107 @@ let companies = [];
 let selectedCompanyId = null;
 let sortColumn = null;
 let sortDirection = 'asc';
+let nextCursor = null;
+let loadingCompanies = false;
+// loadCompanies her çağrıldığında artar; eski listeye ait yanıtları ayırt eder
+let listGeneration = 0;
+// Yüklü listenin filtre/sıralama parametreleri (sonraki sayfalar aynı sorguyla istenir)
+let listParams = null;
+
+// Sayfa başına getirilecek firma sayısı
+const PAGE_SIZE = 100;
+// Sunucuda sıralanabilen kolonlar (diğerleri yüklenen satırlar içinde sıralanır)
+const SERVER_SORT_COLUMNS = ['firma_adi', 'rating', 'user_ratings_total'];
 
 async function loadConfig() {
     const config = await apiCall('/api/config/');
     return config;
 }
 
-async function loadCompanies() {
+function buildFilterParams() {
     const sehir = document.getElementById('filter-sehir').value;
     const ilce = document.getElementById('filter-ilce').value;
     const asama = document.getElementById('filter-asama').value;
     const telefon = document.getElementById('filter-telefon').value;
     
+    const params = new URLSearchParams();
+    if (sehir && sehir !== 'Hepsi') params.append('sehir_filtre', sehir);
+    if (ilce && ilce !== 'Hepsi') params.append('ilce_filtre', ilce);
+    if (asama && asama !== 'Hepsi') params.append('asama_filtre', asama);
+    if (telefon && telefon !== 'hepsi') params.append('telefon_filtre', telefon);
+    return params;
+}
+
+function buildListParams() {
+    const params = buildFilterParams();
+    params.append('limit', PAGE_SIZE);
+    if (SERVER_SORT_COLUMNS.includes(sortColumn)) {
+        params.append('sort', sortColumn);
+        params.append('order', sortDirection);
+    }
+    return params;
+}
+
+async function fetchCompaniesPage(queryParams, cursor) {
+    const params = new URLSearchParams(queryParams);
+    if (cursor) params.append('cursor', cursor);
+    
+    return await apiCall(`/api/companies/?${params.toString()}`);
+}
+
+async function loadCompanies() {
+    // Filtre/sıralama değişti: önceki isteklerin (ör. yarım kalan sonraki sayfa) yanıtları atılır
+    const generation = ++listGeneration;
+    
     try {
-        const params = new URLSearchParams();
-        if (sehir && sehir !== 'Hepsi') params.append('sehir_filtre', sehir);
-        if (ilce && ilce !== 'Hepsi') params.append('ilce_filtre', ilce);
-        if (asama && asama !== 'Hepsi') params.append('asama_filtre', asama);
-        if (telefon && telefon !== 'hepsi') params.append('telefon_filtre', telefon);
-        
-        companies = await apiCall(`/api/companies/?${params.toString()}`);
+        loadingCompanies = true;
+        const params = buildListParams();
+        const page = await fetchCompaniesPage(params, null);
+        if (generation !== listGeneration) return;
+        listParams = params;
+        companies = page.companies;
+        nextCursor = page.next_cursor;
         
         updateCompaniesTable();
         updateFilters();
     } catch (error) {
         console.error('Firmalar yükleme hatası:', error);
+    } finally {
+        if (generation === listGeneration) loadingCompanies = false;
+    }
+}
+
+async function loadMoreCompanies() {
+    if (!nextCursor || loadingCompanies) return;
+    const generation = listGeneration;
+    
+    try {
+        loadingCompanies = true;
+        // Sonraki sayfa, listenin yüklendiği filtre/sıralamayla istenir (formdaki güncel değerlerle değil)
+        const page = await fetchCompaniesPage(listParams, nextCursor);
+        if (generation !== listGeneration) return;
+        companies = companies.concat(page.companies);
+        nextCursor = page.next_cursor;
+        
+        updateCompaniesTable();
+    } catch (error) {
+        console.error('Firmalar yükleme hatası:', error);
+    } finally {
+        if (generation === listGeneration) loadingCompanies = false;
     }
 }
 
 function updateCompaniesTable() {
     const tbody = document.getElementById('companies-tbody');
+    document.getElementById('load-more-btn').style.display = nextCursor ? 'inline-block' : 'none';
     
     if (companies.length === 0) {
         tbody.innerHTML = '<tr><td colspan="6">Firma bulunamadı</td></tr>';
         return;
     }
     
-    // Sıralama
-    if (sortColumn) {
+    // Sıralama (sunucuda sıralanan kolonlar zaten sıralı gelir)
+    if (sortColumn && !SERVER_SORT_COLUMNS.includes(sortColumn)) {
         companies.sort((a, b) => {
             const aVal = a[sortColumn] || '';
             const bVal = b[sortColumn] || '';
@@ -231,16 +294,7 @@ async function updateFilters() {
 }
 
 async function exportExcel() {
-    const sehir = document.getElementById('filter-sehir').value;
-    const ilce = document.getElementById('filter-ilce').value;
-    const asama = document.getElementById('filter-asama').value;
-    const telefon = document.getElementById('filter-telefon').value;
-    
-    const params = new URLSearchParams();
-    if (sehir && sehir !== 'Hepsi') params.append('sehir_filtre', sehir);
-    if (ilce && ilce !== 'Hepsi') params.append('ilce_filtre', ilce);
-    if (asama && asama !== 'Hepsi') params.append('asama_filtre', asama);
-    if (telefon && telefon !== 'hepsi') params.append('telefon_filtre', telefon);
+    const params = buildFilterParams();
     
     const token = getToken();
     const url = `${API_BASE}/api/excel/export?${params.toString()}`;
@@ -273,7 +327,13 @@ function sortTable(column) {
         sortColumn = column;
         sortDirection = 'asc';
     }
-    updateCompaniesTable();
+    
+    if (SERVER_SORT_COLUMNS.includes(column)) {
+        // Sıralama değişince ilk sayfadan tekrar yükle
+        loadCompanies();
+    } else {
+        updateCompaniesTable();
+    }
 }
 
 document.addEventListener('DOMContentLoaded', () => {
@@ -285,5 +345,12 @@ document.addEventListener('DOMContentLoaded', () => {
     
     loadCompanies();
     updateFilters();
+    
+    // Liste sonuna yaklaşınca sonraki sayfayı getir
+    window.addEventListener('scroll', () => {
+        if (window.innerHeight + window.scrollY >= document.body.offsetHeight - 200) {
+            loadMoreCompanies();
+        }
+    });
 });
 
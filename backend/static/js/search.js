@@ -57,7 +57,7 @@ async function handleSearch() {
     resultsDiv.innerHTML = '';
     
     try {
-        const response = await apiCall('/api/search/', {
+        const job = await apiCall('/api/search/jobs', {
             method: 'POST',
             body: JSON.stringify({
                 sehir: tumSehirler ? null : sehir,
@@ -69,35 +69,44 @@ async function handleSearch() {
             })
         });
         
-        if (!response) return;
+        if (!job) return;
+        
+        // İş bitene kadar durumu ve gelen sonuçları takip et
+        const companies = [];
+        let offset = 0;
+        let jobInfo = job;
+        
+        while (true) {
+            const page = await apiCall(`/api/search/jobs/${job.id}/results?offset=${offset}&limit=500`);
+            if (!page) return;
+            companies.push(...page.companies);
+            offset += page.companies.length;
+            
+            // Dolu sayfa geldiyse devamını hemen iste
+            if (page.companies.length === 500) continue;
+            
+            jobInfo = await apiCall(`/api/search/jobs/${job.id}`);
+            if (!jobInfo) return;
+            if (page.status === 'done' || page.status === 'failed') break;
+            
+            renderSearchResults(resultsDiv, companies, jobInfo);
+            await new Promise(resolve => setTimeout(resolve, 2000));
+        }
+        
+        if (jobInfo.status === 'failed') {
+            errorDiv.textContent = jobInfo.error || 'Arama hatası';
+            resultsDiv.innerHTML = '';
+            return;
+        }
         
         // Kullanıcı bakiyesini güncelle
-        const user = getUser();
-        if (user) {
-            user.balance = response.remaining_balance;
-            setUser(user);
+        const me = await apiCall('/api/auth/me');
+        if (me) {
+            setUser({ ...getUser(), ...me });
             updateNavUser();
         }
         
-        // Sonuçları göster
-        if (response.companies.length === 0) {
-            resultsDiv.innerHTML = '<p>Sonuç bulunamadı</p>';
-        } else {
-            resultsDiv.innerHTML = `
-                <h2>${response.total_found} sonuç bulundu (${response.credits_used} kredi harcandı)</h2>
-                ${response.companies.map(company => `
-                    <div class="result-item">
-                        <h3>${company.firma_adi}</h3>
-                        <p><strong>Adres:</strong> ${company.adres || 'Yok'}</p>
-                        <p><strong>Şehir:</strong> ${company.sehir || 'Yok'}</p>
-                        <p><strong>İlçe:</strong> ${company.ilce || 'Yok'}</p>
-                        <p><strong>Telefon:</strong> ${company.telefon || 'Yok'}</p>
-                        <p><strong>Web:</strong> ${company.web ? `<a href="${company.web}" target="_blank">${company.web}</a>` : 'Yok'}</p>
-                        ${company.rating ? `<p><strong>Rating:</strong> ${company.rating} (${company.user_ratings_total || 0} değerlendirme)</p>` : ''}
-                    </div>
-                `).join('')}
-            `;
-        }
+        renderSearchResults(resultsDiv, companies, jobInfo);
     } catch (error) {
         errorDiv.textContent = error.message;
     } finally {
@@ -105,6 +114,34 @@ async function handleSearch() {
     }
 }
 
+function renderSearchResults(resultsDiv, companies, jobInfo) {
+    const running = jobInfo.status === 'queued' || jobInfo.status === 'running';
+    
+    if (!running && companies.length === 0) {
+        resultsDiv.innerHTML = '<p>Sonuç bulunamadı</p>';
+        return;
+    }
+    
+    const header = running
+        ? `<h2>Aranıyor... ${jobInfo.tamamlanan_sehir}/${jobInfo.toplam_sehir} şehir, ${companies.length} sonuç</h2>`
+        : `<h2>${companies.length} sonuç bulundu (${jobInfo.credits_used} kredi harcandı)</h2>`;
+    
+    resultsDiv.innerHTML = `
+        ${header}
+        ${companies.map(company => `
+            <div class="result-item">
+                <h3>${company.firma_adi}</h3>
+                <p><strong>Adres:</strong> ${company.adres || 'Yok'}</p>
+                <p><strong>Şehir:</strong> ${company.sehir || 'Yok'}</p>
+                <p><strong>İlçe:</strong> ${company.ilce || 'Yok'}</p>
+                <p><strong>Telefon:</strong> ${company.telefon || 'Yok'}</p>
+                <p><strong>Web:</strong> ${company.web ? `<a href="${company.web}" target="_blank">${company.web}</a>` : 'Yok'}</p>
+                ${company.rating ? `<p><strong>Rating:</strong> ${company.rating} (${company.user_ratings_total || 0} değerlendirme)</p>` : ''}
+            </div>
+        `).join('')}
+    `;
+}
+
 function updateNavUser() {
     const navUser = document.getElementById('nav-user');
     if (navUser) {
@@ -0,0 +1,20 @@
+"""
+Testler için ortak ayarlar
+
+Uygulama modülleri import edilirken veritabanı engine'i oluşturulduğu için
+DATABASE_URL, herhangi bir app import'undan önce geçici bir SQLite
+dosyasına yönlendirilir.
+"""
+import os
+import tempfile
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db')
+
+import pytest  # noqa: E402
+
+from app.models.database import init_db  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def veritabani():
+    init_db()
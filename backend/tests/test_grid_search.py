@@ -0,0 +1,44 @@
+"""
+Izgara araması (isletme_ara) tekilleştirme ve limit testleri
+"""
+import pytest
+
+from app.services.cache_service import PlaceDetailsCache, TextSearchCache
+from app.services.google_maps_service import GoogleMapsService
+from app.utils.rate_limiter import TokenBucket
+from benchmarks.fake_googlemaps import FakeAlanClient
+
+# İstanbul'un yaklaşık sınır kutusu
+KUTU = (40.80, 28.50, 41.30, 29.40)
+ISLETME_SAYISI = 400
+
+
+def _servis(client) -> GoogleMapsService:
+    service = GoogleMapsService(
+        client=client,
+        rate_limiter=TokenBucket(0),
+        detay_cache=PlaceDetailsCache(ttl=0),
+        text_cache=TextSearchCache(ttl=0)
+    )
+    service.SAYFA_BEKLEME = 0
+    return service
+
+
+@pytest.mark.parametrize('limit', [20, 60, 150, ISLETME_SAYISI, ISLETME_SAYISI + 200])
+def test_limit_kadar_tekil_firma(limit):
+    client = FakeAlanClient(KUTU, ISLETME_SAYISI, gecikme=0)
+    firmalar = _servis(client).isletme_ara('İstanbul', 'Türkiye', 'emlak', limit=limit)
+
+    place_ids = [firma['place_id'] for firma in firmalar]
+    assert len(place_ids) == len(set(place_ids))
+    assert len(firmalar) == min(limit, ISLETME_SAYISI)
+    # Her firma için tek Place Details çağrısı yapılır
+    assert sum(tip == 'place' for _, tip in client.cagrilar) == len(firmalar)
+
+
+def test_tek_sorgu_siniri_icinde_izgara_kurulmaz():
+    client = FakeAlanClient(KUTU, ISLETME_SAYISI, gecikme=0)
+    _servis(client).isletme_ara('İstanbul', 'Türkiye', 'emlak', limit=GoogleMapsService.TEXT_SEARCH_SINIRI)
+
+    assert sum(tip == 'places' for _, tip in client.cagrilar) <= 3
+    assert not any(tip == 'geocode' for _, tip in client.cagrilar)
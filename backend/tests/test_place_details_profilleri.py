@@ -0,0 +1,159 @@
+"""
+Place Details profil alan maskeleri ve iletişim bilgisinin sonradan tamamlanması
+"""
+import pytest
+
+from app.models.database import Company, SessionLocal, User
+from app.services.cache_service import PlaceDetailsCache, TextSearchCache
+from app.services.company_filter_service import CompanyFilter
+from app.services.company_service import (
+    eksik_iletisimleri_tamamla, filtredeki_eksik_iletisimleri_tamamla, save_companies_to_db
+)
+from app.services.google_maps_service import (
+    ALAN_KATMANLARI, DETAY_PROFILLERI, GoogleMapsService, detay_alanlari
+)
+from app.utils.rate_limiter import TokenBucket
+from benchmarks.fake_googlemaps import FakeGoogleMapsClient
+
+
+def _servis(client) -> GoogleMapsService:
+    # Önbellekler kapalı: her detay API'ye gider, istenen alanlar client'ta görülür
+    return GoogleMapsService(
+        client=client,
+        rate_limiter=TokenBucket(0),
+        detay_cache=PlaceDetailsCache(ttl=0),
+        text_cache=TextSearchCache(ttl=0)
+    )
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user_id(db, request):
+    user = User(email=f'{request.node.name}@example.com', username=request.node.name, hashed_password='x')
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def test_temel_profil_sadece_temel_katman():
+    assert set(detay_alanlari('temel')) == set(ALAN_KATMANLARI['temel'])
+
+
+def test_iletisim_profili_atmosfer_istemez():
+    alanlar = set(detay_alanlari('iletisim'))
+    assert alanlar == set(ALAN_KATMANLARI['temel']) | set(ALAN_KATMANLARI['iletisim'])
+    assert not alanlar & set(ALAN_KATMANLARI['atmosfer'])
+
+
+def test_tam_profil_tum_katmanlar():
+    assert set(detay_alanlari('tam')) == {alan for alanlar in ALAN_KATMANLARI.values() for alan in alanlar}
+
+
+def test_telefon_filtresi_temel_profili_yukseltir():
+    assert detay_alanlari('temel', telefon_filtre=True) == DETAY_PROFILLERI['iletisim']
+    assert detay_alanlari('tam', telefon_filtre=True) == DETAY_PROFILLERI['tam']
+
+
+def test_bilinmeyen_profil():
+    with pytest.raises(ValueError):
+        detay_alanlari('hepsi')
+
+
+@pytest.mark.parametrize('profil', ['temel', 'iletisim', 'tam'])
+def test_aramada_profilin_alanlari_istenir(profil):
+    client = FakeGoogleMapsClient(sonuc_sayisi=5, gecikme=0)
+    service = _servis(client)
+    firmalar = service.isletme_ara('İstanbul', 'Türkiye', 'emlak', limit=5, profil=profil)
+
+    assert len(client.istenen_alanlar) == len(firmalar) == 5
+    for alanlar in client.istenen_alanlar:
+        assert sorted(alanlar) == sorted(DETAY_PROFILLERI[profil])
+
+    # Ücretlenen katmanlar sadece profilinkiler
+    katmanlar = service.kullanim_ozeti()['place_details_katmanlari']
+    beklenen = {'temel': ['temel'], 'iletisim': ['temel', 'iletisim'], 'tam': list(ALAN_KATMANLARI)}[profil]
+    assert katmanlar == {katman: 5 if katman in beklenen else 0 for katman in ALAN_KATMANLARI}
+
+    # İstenmeyen alanlar None kalır (kayıttaki mevcut değeri ezmez)
+    for firma in firmalar:
+        assert firma['firma_adi']
+        assert (firma['telefon'] is None) == (profil == 'temel')
+        assert (firma['web'] is None) == (profil == 'temel')
+        assert (firma['rating'] is None) == (profil != 'tam')
+        assert firma['iletisim_eksik'] == (profil == 'temel')
+
+
+def test_telefon_filtresi_iletisim_alanlarini_ister():
+    client = FakeGoogleMapsClient(sonuc_sayisi=10, gecikme=0, telefon_orani=0.5)
+    firmalar = _servis(client).isletme_ara('İstanbul', 'Türkiye', 'emlak', limit=3,
+                                           telefon_filtre=True, profil='temel')
+
+    assert len(firmalar) == 3
+    assert all(firma['telefon'] for firma in firmalar)
+    assert all(sorted(alanlar) == sorted(DETAY_PROFILLERI['iletisim']) for alanlar in client.istenen_alanlar)
+
+
+def _temel_profille_kaydet(db, user_id: int, adet: int):
+    firmalar = _servis(FakeGoogleMapsClient(sonuc_sayisi=adet, gecikme=0)).isletme_ara(
+        'İstanbul', 'Türkiye', 'emlak', limit=adet, profil='temel'
+    )
+    save_companies_to_db(db, user_id, firmalar, 'emlak')
+    return [company.id for company in db.query(Company).filter(Company.user_id == user_id).order_by(Company.id)]
+
+
+def test_tamamlama_iletisim_eksik_isaretini_kaldirir(db, user_id):
+    company_ids = _temel_profille_kaydet(db, user_id, 3)
+    assert db.query(Company).filter(Company.id.in_(company_ids), Company.iletisim_eksik.is_(True)).count() == 3
+
+    client = FakeGoogleMapsClient(gecikme=0)
+    assert eksik_iletisimleri_tamamla(db, user_id, company_ids, _servis(client)) == 3
+
+    # Sadece iletişim katmanı istenir
+    assert len(client.istenen_alanlar) == 3
+    assert all(sorted(alanlar) == sorted(ALAN_KATMANLARI['iletisim']) for alanlar in client.istenen_alanlar)
+
+    db.expire_all()
+    for company in db.query(Company).filter(Company.id.in_(company_ids)):
+        assert company.iletisim_eksik is False
+        assert company.telefon
+        assert company.international_phone_number
+        assert company.web
+        # Temel alanlar korunur
+        assert company.firma_adi
+
+
+def test_tamamlanmis_firma_icin_api_cagrilmaz(db, user_id):
+    company_ids = _temel_profille_kaydet(db, user_id, 2)
+    eksik_iletisimleri_tamamla(db, user_id, company_ids, _servis(FakeGoogleMapsClient(gecikme=0)))
+
+    client = FakeGoogleMapsClient(gecikme=0)
+    assert eksik_iletisimleri_tamamla(db, user_id, company_ids, _servis(client)) == 0
+    assert client.place_cagri == 0
+
+
+def test_baska_kullanicinin_firmasi_tamamlanmaz(db, user_id):
+    company_ids = _temel_profille_kaydet(db, user_id, 1)
+
+    client = FakeGoogleMapsClient(gecikme=0)
+    assert eksik_iletisimleri_tamamla(db, user_id + 1000, company_ids, _servis(client)) == 0
+    assert client.place_cagri == 0
+    db.expire_all()
+    assert db.get(Company, company_ids[0]).iletisim_eksik is True
+
+
+def test_filtredeki_tamamlama_limiti(db, user_id):
+    _temel_profille_kaydet(db, user_id, 5)
+
+    client = FakeGoogleMapsClient(gecikme=0)
+    assert filtredeki_eksik_iletisimleri_tamamla(db, user_id, CompanyFilter(), _servis(client), limit=2) == 2
+    assert client.place_cagri == 2
+    db.expire_all()
+    assert db.query(Company).filter(Company.user_id == user_id, Company.iletisim_eksik.is_(True)).count() == 3
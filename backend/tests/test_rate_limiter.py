@@ -0,0 +1,100 @@
+"""
+TokenBucket hız sınırı testleri
+"""
+import bisect
+import threading
+import time
+
+import pytest
+
+from app.utils import rate_limiter
+from app.utils.rate_limiter import TokenBucket
+
+
+class _SahteSaat:
+    """time modülünün monotonic/sleep'ini taklit eder; sleep saati ilerletir"""
+
+    def __init__(self):
+        self.simdi = 0.0
+
+    def monotonic(self) -> float:
+        return self.simdi
+
+    def sleep(self, sure: float):
+        # Gerçek sleep gibi en az 1 µs sürer (kayan nokta artığı kadar
+        # beklemeler saati ilerletmezse döngü bitmez)
+        self.simdi += max(sure, 1e-6)
+
+
+@pytest.fixture
+def saat(monkeypatch):
+    sahte = _SahteSaat()
+    monkeypatch.setattr(rate_limiter, 'time', sahte)
+    return sahte
+
+
+def en_yogun_pencere(zamanlar, pencere: float) -> int:
+    """Herhangi bir [t, t + pencere) aralığındaki en fazla çağrı sayısı"""
+    zamanlar = sorted(zamanlar)
+    return max((bisect.bisect_left(zamanlar, t + pencere) - i for i, t in enumerate(zamanlar)), default=0)
+
+
+def _harca(bucket: TokenBucket, saat: _SahteSaat, adet: int):
+    zamanlar = []
+    for _ in range(adet):
+        bucket.acquire()
+        zamanlar.append(saat.monotonic())
+    return zamanlar
+
+
+@pytest.mark.parametrize('rate', [1, 10, 50])
+def test_saniyede_en_fazla_rate_arti_bir(saat, rate):
+    # Kova dolu başlar; yine de hiçbir 1 saniyede rate + 1'den fazla çağrı olmaz
+    zamanlar = _harca(TokenBucket(rate), saat, rate * 5)
+    assert en_yogun_pencere(zamanlar, 1.0) <= rate + 1
+
+
+@pytest.mark.parametrize('pencere', [0.1, 0.5, 1.0, 3.0])
+def test_pencere_siniri_kapasite_arti_rate_carpi_sure(saat, pencere):
+    rate, kapasite = 20, 5
+    zamanlar = _harca(TokenBucket(rate, capacity=kapasite), saat, 200)
+    assert en_yogun_pencere(zamanlar, pencere) <= kapasite + rate * pencere
+
+
+def test_uzun_surede_ortalama_hiz_rate(saat):
+    bucket = TokenBucket(10)
+    baslangic = saat.monotonic()
+    _harca(bucket, saat, 101)
+    # İlk token kovada hazırdır, kalan 100 çağrı 10 saniyeye yayılır
+    assert saat.monotonic() - baslangic == pytest.approx(10.0, abs=0.01)
+
+
+def test_sifir_rate_sinirsiz(saat):
+    bucket = TokenBucket(0)
+    baslangic = saat.monotonic()
+    _harca(bucket, saat, 1000)
+    assert saat.monotonic() == baslangic
+
+
+def test_threadler_ortak_butceyi_asmaz():
+    rate = 200
+    bucket = TokenBucket(rate)
+    zamanlar = []
+    lock = threading.Lock()
+
+    def calis():
+        for _ in range(25):
+            bucket.acquire()
+            with lock:
+                zamanlar.append(time.monotonic())
+
+    baslangic = time.monotonic()
+    threadler = [threading.Thread(target=calis) for _ in range(4)]
+    for thread in threadler:
+        thread.start()
+    for thread in threadler:
+        thread.join()
+    sure = time.monotonic() - baslangic
+
+    assert len(zamanlar) == 100
+    assert len(zamanlar) <= bucket.capacity + rate * sure